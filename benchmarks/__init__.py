@@ -0,0 +1 @@
+"""Benchmarks of harmonica on synthetic tidal models."""
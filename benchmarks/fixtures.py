@@ -0,0 +1,40 @@
+"""Write the synthetic tidal models of the benchmarks.
+
+The models are written by tests.synthetic_models, the same files the tests use at a larger scale. The default scale
+of 0.1 writes about 750 MB in total.
+
+Usage:
+
+    python -m benchmarks.fixtures DIRECTORY [--scale 0.1] [--models tpxo9 leprovost ...]
+"""
+
+# 1. Standard Python modules
+import argparse
+import os
+
+# 2. Third party modules
+from tests.synthetic_models import MODELS, write_models
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+
+
+DEFAULT_SCALE = 0.1
+
+
+def main():
+    """Write synthetic models from the command line."""
+    p = argparse.ArgumentParser(description='Write synthetic tidal models for the benchmarks.')
+    p.add_argument('data_dir', help='Directory to write the models to')
+    p.add_argument('--scale', type=float, default=DEFAULT_SCALE,
+                   help=f'Size of the grids relative to the real models, default: {DEFAULT_SCALE}')
+    p.add_argument('--models', nargs='+', choices=MODELS, default=MODELS, help='Models to write, default: all')
+    p.add_argument('--overwrite', action='store_true', help='Rewrite models that already exist')
+    args = p.parse_args()
+    for model in write_models(args.data_dir, args.models, args.scale, args.overwrite):
+        print(f'Wrote {model} to {os.path.join(args.data_dir, model)}')
+
+
+if __name__ == '__main__':
+    main()
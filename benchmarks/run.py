@@ -0,0 +1,345 @@
+"""Benchmarks of extraction, nodal factor, reconstruction, and deconstruction throughput on synthetic models.
+
+The models are written by tests.synthetic_models, so the benchmarks run without the licensed model data. Each
+benchmark is timed over a number of repeats and the best time is reported with the throughput. The peak memory is
+measured in a separate run with tracemalloc, it counts the Python and NumPy allocations but not the memory of the
+netCDF library.
+
+Usage:
+
+    python -m benchmarks.run [--data-dir DIR] [--scale 0.1] [--models tpxo9 ...] [--points 1 100 10000]
+        [--days 30 365] [--repeat 3] [--set read_mode=window ...] [--json results.json]
+"""
+
+# 1. Standard Python modules
+import argparse
+import ast
+from datetime import datetime, timedelta
+import json
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+# 2. Third party modules
+import numpy as np
+from tests.synthetic_models import ADCIRC_DOMAIN, MODELS, write_models
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import config
+from harmonica.constituent_registry import NAMES
+from harmonica.harmonica import Tide
+from harmonica.reconstruction import reconstruct
+from harmonica.tidal_constituents import Constituents
+from .fixtures import DEFAULT_SCALE
+
+
+DEFAULT_POINTS = (1, 100, 10000)
+DEFAULT_DAYS = (30, 365)
+DEFAULT_REPEAT = 3
+NODAL_FACTOR_CALLS = 100  # Calls of get_nodal_factor per timed run
+START = np.datetime64('2020-01-01T00:00:00', 's')
+
+
+def measure(func, repeat):
+    """Time a function and measure its peak memory.
+
+    Args:
+        func (callable): The function, called without arguments
+        repeat (int): Number of timed calls, the best is reported
+
+    Returns:
+        tuple(float, float): The best time in seconds and the peak traced memory in MB
+    """
+    seconds = min(_timed(func) for _ in range(max(repeat, 1)))
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak / 1.0e6
+
+
+def _timed(func):
+    """Time one call of a function.
+
+    Args:
+        func (callable): The function, called without arguments
+
+    Returns:
+        float: The wall time in seconds
+    """
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def random_locations(model, count, seed=0):
+    """Get random locations inside the domain of a model.
+
+    Args:
+        model (str): Name of the model
+        count (int): Number of locations
+        seed (int, optional): Seed of the random generator
+
+    Returns:
+        :obj:`list` of :obj:`tuple` of :obj:`float`: The (lat, lon) locations
+    """
+    rng = np.random.default_rng(seed)
+    if model == 'adcirc2015':
+        (x0, x1), (y0, y1) = ADCIRC_DOMAIN
+        lats, lons = rng.uniform(y0 + 1.0, y1 - 1.0, count), rng.uniform(x0 + 1.0, x1 - 1.0, count)
+    else:
+        lats, lons = rng.uniform(-80.0, 80.0, count), rng.uniform(-180.0, 180.0, count)
+    return [(float(lat), float(lon)) for lat, lon in zip(lats, lons)]
+
+
+def hourly_times(days):
+    """Get an hourly time series.
+
+    Args:
+        days (float): Length of the series in days
+
+    Returns:
+        :obj:`numpy.ndarray`: The datetime64 times
+    """
+    return START + np.arange(int(days * 24)) * np.timedelta64(3600, 's')
+
+
+def result(benchmark, model, points, times, seconds, peak_mb, items, unit, **extra):
+    """Make a row of the benchmark report.
+
+    Args:
+        benchmark (str): Name of the benchmark
+        model (str): Name of the model, empty if the benchmark does not use one
+        points (int): Number of locations
+        times (int): Number of times
+        seconds (float): Best time
+        peak_mb (float): Peak traced memory in MB
+        items (int): Number of items processed in the time
+        unit (str): Name of the items
+        **extra: Other values of the row
+
+    Returns:
+        dict: The row
+    """
+    row = {
+        'benchmark': benchmark,
+        'model': model,
+        'points': points,
+        'times': times,
+        'seconds': seconds,
+        'throughput': items / seconds if seconds > 0.0 else float('inf'),
+        'unit': f'{unit}/s',
+        'peak_mb': peak_mb,
+    }
+    row.update(extra)
+    return row
+
+
+def bench_get_components(model, points, repeat):
+    """Benchmark extracting all the constituents of a model at a batch of points.
+
+    The first call of a new extractor opens the model files (and builds the ADCIRC mesh index), it is reported as
+    cold_seconds.
+
+    Args:
+        model (str): Name of the model
+        points (int): Number of locations
+        repeat (int): Number of timed calls
+
+    Returns:
+        dict: The report row
+    """
+    locs = random_locations(model, points)
+    constituents = Constituents(model)
+    cold = _timed(lambda: constituents.get_components(locs))
+    seconds, peak = measure(lambda: constituents.get_components(locs), repeat)
+    constituents.close()
+    return result('get_components', model, points, 0, seconds, peak, points, 'points', cold_seconds=cold)
+
+
+def bench_get_nodal_factor(repeat):
+    """Benchmark the nodal factors and equilibrium arguments of all the constituents at a start time.
+
+    Args:
+        repeat (int): Number of timed runs of NODAL_FACTOR_CALLS calls
+
+    Returns:
+        dict: The report row
+    """
+    constituents = Constituents('leprovost')  # The model files are not opened for nodal factors
+    names = list(NAMES)
+    starts = [datetime(2020, 1, 1) + timedelta(hours=7 * i) for i in range(NODAL_FACTOR_CALLS)]
+
+    def run():
+        for start in starts:
+            constituents.get_nodal_factor(names, start, start + timedelta(days=15))
+
+    seconds, peak = measure(run, repeat)
+    return result('get_nodal_factor', '', 0, NODAL_FACTOR_CALLS, seconds, peak, NODAL_FACTOR_CALLS, 'calls')
+
+
+def bench_reconstruct(model, points, days, repeat):
+    """Benchmark reconstructing an hourly series, with reconstruct_tide for one point and reconstruct_tides for more.
+
+    The model files are opened before timing, the time includes extracting the constituents.
+
+    Args:
+        model (str): Name of the model
+        points (int): Number of locations
+        days (float): Length of the series in days
+        repeat (int): Number of timed calls
+
+    Returns:
+        dict: The report row
+    """
+    locs = random_locations(model, points)
+    times = hourly_times(days)
+    tide = Tide(model=model)
+    if points == 1:
+        def run():
+            tide.reconstruct_tide(locs[0], times)
+    else:
+        def run():
+            tide.reconstruct_tides(locs, times)
+    run()
+    seconds, peak = measure(run, repeat)
+    tide.constituents.close()
+    return result('reconstruct_tide', model, points, len(times), seconds, peak, points * len(times), 'values')
+
+
+def bench_deconstruct(days, repeat):
+    """Benchmark the harmonic analysis of an hourly series of synthetic water levels.
+
+    Args:
+        days (float): Length of the series in days
+        repeat (int): Number of timed calls
+
+    Returns:
+        dict: The report row
+    """
+    times = hourly_times(days)
+    names = ['M2', 'S2', 'N2', 'K1', 'O1', 'K2', 'P1', 'Q1']
+    amplitude = np.linspace(1.0, 0.1, len(names))
+    phase = np.linspace(0.0, 315.0, len(names))
+    water_level = reconstruct(names, amplitude, phase, times)[:, 0]
+    water_level += np.random.default_rng(0).normal(0.0, 0.05, len(times))
+    tide = Tide(model='leprovost')
+
+    def run():
+        tide.deconstruct_tide(water_level, times)
+
+    seconds, peak = measure(run, repeat)
+    return result('deconstruct_tide', '', 1, len(times), seconds, peak, len(times), 'samples')
+
+
+def run_benchmarks(models, points, days, repeat):
+    """Run the benchmarks on models that are in harmonica.config's data directories.
+
+    Models that can not be loaded, e.g. ADCIRC without xmsgrid, are skipped with a message.
+
+    Args:
+        models (:obj:`list` of :obj:`str`): The models to benchmark
+        points (:obj:`list` of :obj:`int`): The numbers of locations
+        days (:obj:`list` of :obj:`float`): The lengths of the series in days
+        repeat (int): Number of timed calls of each benchmark
+
+    Yields:
+        dict: The report rows
+    """
+    yield bench_get_nodal_factor(repeat)
+    for length in days:
+        yield bench_deconstruct(length, repeat)
+    for model in models:
+        try:
+            for count in points:
+                yield bench_get_components(model, count, repeat)
+            for count in points:
+                for length in days:
+                    yield bench_reconstruct(model, count, length, repeat)
+        except (ImportError, OSError, ValueError) as e:
+            print(f'Skipped {model}: {e}')
+
+
+def format_report(rows):
+    """Format the report as a table.
+
+    Args:
+        rows (:obj:`list` of dict): The report rows
+
+    Returns:
+        str: The table
+    """
+    header = f'{"benchmark":<18} {"model":<11} {"points":>7} {"times":>7} {"seconds":>9} {"throughput":>20} ' \
+             f'{"peak MB":>9} {"cold s":>8}'
+    lines = [header, '-' * len(header)]
+    for row in rows:
+        cold = f'{row["cold_seconds"]:8.3f}' if 'cold_seconds' in row else ' ' * 8
+        throughput = f'{row["throughput"]:.4g} {row["unit"]}'
+        lines.append(f'{row["benchmark"]:<18} {row["model"]:<11} {row["points"]:>7} {row["times"]:>7} '
+                     f'{row["seconds"]:9.4f} {throughput:>20} {row["peak_mb"]:9.1f} {cold}')
+    return '\n'.join(lines)
+
+
+def parse_setting(value):
+    """Parse a KEY=VALUE harmonica.config setting.
+
+    Args:
+        value (str): The setting, the value is a Python literal or a string
+
+    Returns:
+        tuple(str, object): The key and the value
+    """
+    key, sep, text = value.partition('=')
+    if not sep or key not in config:
+        raise argparse.ArgumentTypeError(f'Not a harmonica config setting: {value}')
+    try:
+        return key, ast.literal_eval(text)
+    except (SyntaxError, ValueError):
+        return key, text
+
+
+def main():
+    """Run the benchmarks from the command line."""
+    p = argparse.ArgumentParser(description='Benchmark harmonica on synthetic tidal models.')
+    p.add_argument('--data-dir', default=None,
+                   help='Directory of the synthetic models, written if missing and kept. Default: a temporary '
+                        'directory.')
+    p.add_argument('--scale', type=float, default=DEFAULT_SCALE,
+                   help=f'Size of the synthetic model grids relative to the real models, default: {DEFAULT_SCALE}')
+    p.add_argument('--models', nargs='+', choices=MODELS, default=MODELS, help='Models to benchmark, default: all')
+    p.add_argument('--points', nargs='+', type=int, default=DEFAULT_POINTS,
+                   help=f'Numbers of locations, default: {" ".join(map(str, DEFAULT_POINTS))}')
+    p.add_argument('--days', nargs='+', type=float, default=DEFAULT_DAYS,
+                   help=f'Lengths of the hourly series in days, default: {" ".join(map(str, DEFAULT_DAYS))}')
+    p.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                   help=f'Timed calls of each benchmark, the best is reported. Default: {DEFAULT_REPEAT}')
+    p.add_argument('--set', type=parse_setting, action='append', default=[], metavar='KEY=VALUE',
+                   help='Change a harmonica.config setting, e.g. --set read_mode=window')
+    p.add_argument('--json', default=None, help='Also write the report rows to a JSON file')
+    args = p.parse_args()
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='harmonica_benchmarks_')
+    try:
+        write_models(data_dir, args.models, args.scale)
+        config['pre_existing_data_dir'] = data_dir
+        config['data_dir'] = data_dir
+        config.update(dict(args.set))
+        rows = []
+        for row in run_benchmarks(args.models, args.points, args.days, args.repeat):
+            rows.append(row)
+            print(format_report([row]).splitlines()[-1] if len(rows) > 1 else format_report([row]), flush=True)
+    finally:
+        if args.data_dir is None:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'scale': args.scale, 'config': dict(args.set), 'results': rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
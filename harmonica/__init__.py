@@ -15,7 +15,29 @@ config = {
     # 'data_dir': os.path.join(os.path.dirname(__file__), 'data'),
     # If on Windows, use the system APPDATA directory to download resources to. The Python installation may
     # be in a protected folder. Default to the package directory if no APPDATA environment variable.
-    'data_dir': os.path.join(os.getenv('APPDATA', os.path.dirname(os.path.dirname(__file__))), 'harmonica', 'data')
+    'data_dir': os.path.join(os.getenv('APPDATA', os.path.dirname(os.path.dirname(__file__))), 'harmonica', 'data'),
+    # How gridded model values are read from the files: 'auto', 'window', 'cells', or 'full'. See
+    # tidal_database.read_cells().
+    'read_mode': 'auto',
+    # Maximum number of model files each ResourceManager keeps open between queries.
+    'max_open_datasets': 64,
+    # Save the ADCIRC point location index to a sidecar file next to the model data so new processes can load it
+    # instead of rebuilding it.
+    'mesh_index_sidecar': False,
+    # Interpolate nodal factors and corrections from a table saved in data_dir instead of computing them. See
+    # astronomy.NodalTable.
+    'nodal_table': False,
+    # Read the query optimized stores written by 'harmonica resources optimize' instead of the model resources when
+    # they exist. See ResourceManager.optimize_model().
+    'optimized_store': True,
+    # Number of model resources downloaded at the same time, and the maximum number of connections to each host.
+    'download_jobs': 4,
+    'max_host_connections': 4,
+    # Number of worker processes reading the files of the models with a file per constituent (FES2014, TPXO8) at the
+    # same time. Reads are made one file after another if less than 2. The workers are spawned and import the __main__
+    # module, so a script that enables them must guard its entry point with if __name__ == '__main__'. See
+    # tidal_database.read_files().
+    'read_workers': 0,
 }
 
 __version__ = '2.0.1'
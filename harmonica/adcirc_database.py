@@ -1,25 +1,38 @@
 """Class for managing the ADCIRC 2015 tidal database model."""
 
 # 1. Standard Python modules
-import math
+import os
 
 # 2. Third party modules
 import numpy
-import pandas as pd
 
 # 3. Aquaveo modules
-from xms.grid.geometry.tri_search import TriSearch
 
 # 4. Local modules
+from harmonica import config
+from .constituent_data import ConstituentData
+from .constituent_registry import ids, SPEED, take
+from .mesh_index import BucketMeshIndex, MeshIndex
+from .profiling import count, timer
 from .resource import ResourceManager
-from .tidal_database import convert_coords, get_complex_components, NOAA_SPEEDS, TidalDB
+from .store import is_store, store_names
+from .tidal_database import convert_coords, TidalDB
 
 
 DEFAULT_ADCIRC_RESOURCE = 'adcirc2015'
 
 
 class AdcircDB(TidalDB):
-    """The class for extracting tidal data, specifically amplitude and phases, from an ADCIRC database."""
+    """The class for extracting tidal data, specifically amplitude and phases, from an ADCIRC database.
+
+    Attributes:
+        mesh_indexes (:obj:`dict` of :obj:`harmonica.mesh_index.MeshIndex`): Point location indexes of the model
+            meshes, shared by all the extractors and keyed by model file path, modification time, and size so they
+            are only built once for each version of the file.
+
+    """
+    mesh_indexes = {}
+
     def __init__(self, model=DEFAULT_ADCIRC_RESOURCE):
         """Constructor for the ADCIRC tidal database extractor.
 
@@ -34,22 +47,25 @@ class AdcircDB(TidalDB):
             ))
         super().__init__(model)
 
-    def get_components(self, locs, cons=None, positive_ph=False):
+    def get_components(self, locs, cons=None, positive_ph=False, plan=None):
         """Get the amplitude, phase, and speed for the given constituents at the given points.
 
         Args:
             locs (:obj:`list` of :obj:`tuple` of :obj:`float`): latitude [-90, 90] and longitude [-180 180] or [0 360]
-                of the requested points.
+                of the requested points. May be None if a plan is given.
             cons (:obj:`list` of :obj:`str`, optional): List of the constituent names to get amplitude and phase for. If
                 not supplied, all valid constituents will be extracted.
             positive_ph (bool, optional): Indicate if the returned phase should be all positive [0 360] (True) or
                 [-180 180] (False, the default).
+            plan (:obj:`harmonica.interpolation_plan.InterpolationPlan`, optional): Plan built by build_plan() for
+                locs, the points are not located again
 
         Returns:
-            (:obj:`list` of :obj:`pandas.DataFrame`): A list of dataframes of constituent information including
-                amplitude (meters), phase (degrees) and speed (degrees/hour, UTC/GMT). The list is parallel with locs,
-                where each element in the return list is the constituent data for the corresponding element in locs.
-                Note that function uses fluent interface pattern.
+            :obj:`harmonica.adcirc_database.AdcircDB`: This extractor, using the fluent interface pattern. Its results
+                attribute is a :obj:`harmonica.constituent_data.ConstituentData` of the amplitude (meters), phase
+                (degrees) and speed (degrees/hour, UTC/GMT) as (points x constituents) arrays parallel with locs, empty
+                on error. Its data attribute is the legacy list of dataframes, one per element in locs, built when first
+                accessed.
         """
         # pre-allocate the return value
         if not cons:
@@ -57,75 +73,140 @@ class AdcircDB(TidalDB):
         else:
             cons = [con.upper() for con in cons]
 
-        # Make sure point locations are valid lat/lon
-        locs = convert_coords(locs)
-        if not locs:
+        # Step 1: read the file and locate the points in the mesh, unless the plan already has them:
+        plan = self.get_plan(locs, plan)
+        filenames = []
+        con_dset = self.resources.get_datasets(cons, filenames)[0][0]
+        mesh = self._locate_mesh(plan, con_dset, filenames[0][0])
+        if not mesh:
+            self.results = ConstituentData()
             return self  # ERROR: Not in latitude/longitude
+        num_pts = len(plan)
+        count('points', num_pts)
+        count('constituents', len(cons))
+        nodes, weights, valid = mesh['nodes'], mesh['weights'], mesh['valid']
+
+        # Step 2: gather the triangle node values of every constituent (constituents x points x 3). The node arrays
+        # are read into memory once and stay cached by the open dataset. The optimized store is read once for all the
+        # constituents, only the range of nodes the points need.
+        stored = is_store(con_dset)
+        with timer('adcirc.read'):
+            if stored:
+                con_idx = [store_names(con_dset).index(con) for con in cons]
+                lo, hi = (nodes.min(), nodes.max() + 1) if nodes.size else (0, 0)
+                reals = con_dset.re[:, lo:hi].values[con_idx][:, nodes - lo]
+                imags = con_dset.im[:, lo:hi].values[con_idx][:, nodes - lo]
+            else:
+                amps = numpy.stack([con_dset[f'{con}_amplitude'].values[nodes] for con in cons])
+                phases = numpy.radians(numpy.stack([con_dset[f'{con}_phase'].values[nodes] for con in cons]))
+
+        with timer('adcirc.interpolate'):
+            if not stored:
+                # Get the real and imaginary components from the amplitude and phases in the file.
+                reals = amps * numpy.cos(phases)
+                imags = amps * numpy.sin(phases)
+            # Perform area weighted interpolation.
+            ctr = (reals * weights).sum(axis=-1)
+            cti = (imags * weights).sum(axis=-1)
+            new_amp = numpy.sqrt(ctr * ctr + cti * cti)
+
+            # Compute interpolated phase
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                new_phase = numpy.degrees(numpy.arccos(numpy.clip(ctr / new_amp, -1.0, 1.0)))
+            new_phase = numpy.where(cti < 0.0, 360.0 - new_phase, new_phase)
+            new_phase[new_amp == 0.0] = 0.0
+
+        # place info into data tables
+        with timer('adcirc.assemble'):
+            amplitude = numpy.full((num_pts, len(cons)), numpy.nan)
+            phase = numpy.full((num_pts, len(cons)), numpy.nan)
+            speed = numpy.full((num_pts, len(cons)), numpy.nan)
+            amplitude[valid] = new_amp.T
+            phase[valid] = new_phase.T
+            speed[valid] = take(SPEED, ids(cons, aliases=False))
+            self.results = ConstituentData(cons, amplitude, phase, speed)
+        return self
+
+    def locate(self, plan, cons=None):
+        """Locate the points of a plan in the triangles of the model mesh and compute their barycentric weights.
+
+        Args:
+            plan (:obj:`harmonica.interpolation_plan.InterpolationPlan`): The plan to fill
+            cons (:obj:`list` of :obj:`str`, optional): Ignored, all the constituents of the model share one mesh
+        """
+        if 'mesh' not in plan.grids:
+            cons = list(self.resources.available_constituents())
+            filenames = []
+            self._locate_mesh(plan, self.resources.get_datasets(cons, filenames)[0][0], filenames[0][0])
+
+    def _locate_mesh(self, plan, dset, filename):
+        """Get the triangle nodes and weights of the points of a plan in the model mesh.
+
+        Args:
+            plan (:obj:`harmonica.interpolation_plan.InterpolationPlan`): The plan, the mesh is added if missing
+            dset (:obj:`xarray.Dataset`): The model dataset with the mesh geometry
+            filename (str): Path to the model file
 
-        self.data = [pd.DataFrame(columns=['amplitude', 'phase', 'speed']) for _ in range(len(locs))]
-
-        # Step 1: read the file and get geometry:
-        con_dsets = self.resources.get_datasets(cons)[0]
-        con_x = con_dsets[0].x.values
-        con_y = con_dsets[0].y.values
-
-        mesh_pts = [(float(con_x[idx]), float(con_y[idx]), 0.0) for idx in range(len(con_x))]
-        tri_list = con_dsets[0].element.values.flatten().tolist()
-        tri_search = TriSearch(mesh_pts, tri_list)
-
-        points_and_weights = []
-        for i, pt in enumerate(locs):
-            pt_flip = (pt[1], pt[0])
-            tri_idx = tri_search.triangle_containing_point(pt_flip)
-            if tri_idx != -1:
-                pt_1 = int(tri_list[tri_idx])
-                pt_2 = int(tri_list[tri_idx + 1])
-                pt_3 = int(tri_list[tri_idx + 2])
-                x1, y1, z1 = mesh_pts[pt_1]
-                x2, y2, z2 = mesh_pts[pt_2]
-                x3, y3, z3 = mesh_pts[pt_3]
-                x = pt_flip[0]
-                y = pt_flip[1]
+        Returns:
+            dict: The valid points' triangle nodes and weights (valid points x 3), and the mask of the valid points
+                (points). Empty if the points are not valid latitude/longitude.
+        """
+        if 'mesh' in plan.grids:
+            return plan.grids['mesh']
+
+        # Make sure point locations are valid lat/lon
+        locs = convert_coords(plan.locs)
+        if not locs:
+            plan.grids['mesh'] = {}  # ERROR: Not in latitude/longitude
+            return plan.grids['mesh']
+        with timer('adcirc.mesh_index'):
+            mesh_index = self.get_mesh_index(dset, filename)
+        with timer('adcirc.locate'):
+            xs = numpy.array([pt[1] for pt in locs], dtype=float)
+            ys = numpy.array([pt[0] for pt in locs], dtype=float)
+            tri_ids = mesh_index.locate(xs, ys)
+            valid = tri_ids != -1  # Outside domain, return NaN for all constituents
+            plan.grids['mesh'] = {
+                'nodes': mesh_index.tris[tri_ids[valid]],
                 # Compute barocentric area weights
-                ta = abs((x2 * y3 - x3 * y2) - (x1 * y3 - x3 * y1) + (x1 * y2 - x2 * y1))
-                w1 = ((x - x3) * (y2 - y3) + (x2 - x3) * (y3 - y)) / ta
-                w2 = ((x - x1) * (y3 - y1) - (y - y1) * (x3 - x1)) / ta
-                w3 = ((y - y1) * (x2 - x1) - (x - x1) * (y2 - y1)) / ta
-                points_and_weights.append((i, (pt_1, pt_2, pt_3), (w1, w2, w3)))
-            else:  # Outside domain, return NaN for all constituents
-                for con in cons:
-                    self.data[i].loc[con] = [numpy.nan, numpy.nan, numpy.nan]
-
-        for con in cons:
-            con_amp_name = con + "_amplitude"
-            con_pha_name = con + "_phase"
-            con_amp = con_dsets[0][con_amp_name]
-            con_pha = con_dsets[0][con_pha_name]
-            for i, pts, weights in points_and_weights:
-                amps = [float(con_amp[pts[0]]), float(con_amp[pts[1]]), float(con_amp[pts[2]])]
-                phases = [
-                    math.radians(float(con_pha[pts[0]])),
-                    math.radians(float(con_pha[pts[1]])),
-                    math.radians(float(con_pha[pts[2]])),
-                ]
-
-                # Get the real and imaginary components from the amplitude and phases in the file. It
-                # would be better if these values were stored in the file like TPXO.
-                components = get_complex_components(amps, phases)
-
-                # Perform area weighted interpolation
-                ctr = components[0][0] * weights[0] + components[1][0] * weights[1] + components[2][0] * weights[2]
-                cti = components[0][1] * weights[0] + components[1][1] * weights[1] + components[2][1] * weights[2]
-                new_amp = math.sqrt(ctr * ctr + cti * cti)
-
-                # Compute interpolated phase
-                if new_amp == 0.0:
-                    new_phase = 0.0
-                else:
-                    new_phase = math.degrees(math.acos(ctr / new_amp))
-                    if cti < 0.0:
-                        new_phase = 360.0 - new_phase
-                speed = NOAA_SPEEDS[con][0] if con in NOAA_SPEEDS else numpy.nan
-                self.data[i].loc[con] = [new_amp, new_phase, speed]
+                'weights': mesh_index.barycentric_weights(tri_ids[valid], xs[valid], ys[valid]),
+                'valid': valid,
+            }
+        return plan.grids['mesh']
 
-        return self
+    @classmethod
+    def get_mesh_index(cls, dset, filename):
+        """Get the point location index of a model mesh, building it only the first time it is needed for the file.
+
+        If config['mesh_index_sidecar'] is enabled, a NumPy index is loaded from a sidecar file next to the model
+        file, or built and saved there if the sidecar is missing or older than the model file.
+
+        Args:
+            dset (:obj:`xarray.Dataset`): The model dataset with the mesh geometry
+            filename (str): Path to the model file
+
+        Returns:
+            :obj:`harmonica.mesh_index.MeshIndex`: The point location index
+        """
+        path = os.path.normpath(filename)
+        stat = os.stat(path)
+        key = (path, stat.st_mtime, stat.st_size, bool(config['mesh_index_sidecar']))
+        if key in cls.mesh_indexes:
+            return cls.mesh_indexes[key]
+        for stale in [stale for stale in cls.mesh_indexes if stale[0] == path]:  # The file was replaced
+            del cls.mesh_indexes[stale]
+
+        if not config['mesh_index_sidecar']:
+            mesh_index = MeshIndex(dset.x.values, dset.y.values, dset.element.values)
+        else:
+            sidecar = os.path.splitext(filename)[0] + '.index.npz'
+            if os.path.isfile(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(filename):
+                mesh_index = BucketMeshIndex.load(sidecar)
+            else:
+                mesh_index = BucketMeshIndex.build(dset.x.values, dset.y.values, dset.element.values)
+                try:
+                    mesh_index.save(sidecar)
+                except OSError:
+                    pass  # Model data directory is read-only, keep the index in memory only.
+        cls.mesh_indexes[key] = mesh_index
+        return mesh_index
@@ -0,0 +1,61 @@
+"""Linear least squares harmonic analysis of water level time series."""
+
+# 1. Standard Python modules
+
+# 2. Third party modules
+import numpy as np
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from .astronomy import to_datetime64
+from .constituent_registry import ids, NAMES, SPEED
+from .reconstruction import astronomical_terms, supported_names
+
+
+def harmonic_analysis(water_level, times, names=None, n_period=6):
+    """Fit the amplitudes and phases of constituents with known speeds to a water level time series.
+
+    The model is the one evaluated by harmonica.reconstruction.reconstruct(), a mean level plus the sum of
+    f * (a * cos(speed * t + (V + u)) + b * sin(speed * t + (V + u))) over the constituents, where a = A * cos(g) and
+    b = A * sin(g). It is linear in the mean, a, and b, so it is solved directly with one least squares solve of the
+    cosine and sine design matrix. There is nothing to converge.
+
+    Args:
+        water_level (:obj:`numpy.ndarray`): The water levels. NaN values are ignored.
+        times (:obj:`numpy.ndarray`): The times of the water levels, see harmonica.astronomy.to_datetime64()
+        names (:obj:`list` of :obj:`str`, optional): Names of the constituents to fit. Constituents without
+            astronomical arguments (not in the constituent registry) are ignored. Defaults to all of the registry.
+        n_period (int, optional): Number of periods a constituent must complete during the series to be fit
+
+    Returns:
+        tuple: The names of the fitted constituents, their amplitudes, their phases in degrees [0 360], their
+            speeds in degrees/hour, and the mean water level
+    """
+    water_level = np.asarray(water_level, dtype=float).ravel()
+    times = to_datetime64(times)
+    measured = ~np.isnan(water_level)
+    water_level = water_level[measured]
+    times = times[measured]
+    if len(times) == 0:
+        return [], np.empty(0), np.empty(0), np.empty(0), np.nan
+
+    # Only fit constituents that complete enough periods during the series.
+    names, _ = supported_names(names if names else NAMES)
+    speeds = SPEED[ids(names)]
+    hours = (times.max() - times.min()) / np.timedelta64(1, 'h')
+    fit = 360.0 * n_period < hours * speeds
+    names = [name for name, keep in zip(names, fit) if keep]
+    speeds = speeds[fit]
+
+    # Design matrix columns: the mean, then the cosine and sine terms of each constituent
+    design = np.empty((len(times), 1 + 2 * len(names)))
+    design[:, 0] = 1.0
+    for chunk, cos_terms, sin_terms in astronomical_terms(names, times):
+        design[chunk, 1::2] = cos_terms
+        design[chunk, 2::2] = sin_terms
+    coefs = np.linalg.lstsq(design, water_level, rcond=None)[0]
+
+    amplitude = np.hypot(coefs[1::2], coefs[2::2])
+    phase = np.degrees(np.arctan2(coefs[2::2], coefs[1::2])) % 360.0
+    return names, amplitude, phase, speeds, coefs[0]
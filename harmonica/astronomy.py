@@ -0,0 +1,498 @@
+"""Vectorized astronomical arguments of the tidal constituents, ported from the tide_fac Fortran utility."""
+
+# 1. Standard Python modules
+import os
+
+# 2. Third party modules
+import numpy as np
+import pandas as pd
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import config
+from .constituent_registry import ids, NAMES, NUM_CONSTITUENTS, take
+
+
+# Coefficients of the equilibrium arguments V (table 15 of Schureman) of the constituents supported by tide_fac.f, in
+# degrees per degree of: T (hour angle of the mean sun + 180), s (mean longitude of the moon), h (mean longitude of the
+# sun), p (longitude of the lunar perigee), p1 (longitude of the solar perigee), and the constant term
+V_COEFFICIENTS = {
+    'M2': (2, -2, 2, 0, 0, 0),
+    'S2': (2, 0, 0, 0, 0, 0),
+    'N2': (2, -3, 2, 1, 0, 0),
+    'K1': (1, 0, 1, 0, 0, -90),
+    'M4': (4, -4, 4, 0, 0, 0),
+    'O1': (1, -2, 1, 0, 0, 90),
+    'M6': (6, -6, 6, 0, 0, 0),
+    'MK3': (3, -2, 3, 0, 0, -90),
+    'S4': (4, 0, 0, 0, 0, 0),
+    'MN4': (4, -5, 4, 1, 0, 0),
+    'NU2': (2, -3, 4, -1, 0, 0),
+    'S6': (6, 0, 0, 0, 0, 0),
+    'MU2': (2, -4, 4, 0, 0, 0),
+    '2N2': (2, -4, 2, 2, 0, 0),
+    'OO1': (1, 2, 1, 0, 0, -90),
+    'LAM2': (2, -1, 0, 1, 0, 180),
+    'S1': (1, 0, 0, 0, 0, 0),
+    'M1': (1, -1, 1, 0, 0, -90),
+    'J1': (1, 1, 1, -1, 0, -90),
+    'MM': (0, 1, 0, -1, 0, 0),
+    'SSA': (0, 0, 2, 0, 0, 0),
+    'SA': (0, 0, 1, 0, 0, 0),
+    'MSF': (0, 2, -2, 0, 0, 0),
+    'MF': (0, 2, 0, 0, 0, 0),
+    'RHO': (1, -3, 3, -1, 0, 90),
+    'Q1': (1, -3, 1, 1, 0, 90),
+    'T2': (2, 0, -1, 0, 1, 0),
+    'R2': (2, 0, 1, 0, -1, 180),
+    '2Q1': (1, -4, 1, 2, 0, 90),
+    'P1': (1, 0, -1, 0, 0, 90),
+    '2SM2': (2, 2, -2, 0, 0, 0),
+    'M3': (3, -3, 3, 0, 0, 0),
+    'L2': (2, -1, 2, -1, 0, 180),
+    '2MK3': (3, -4, 3, 0, 0, 90),
+    'K2': (2, 0, 2, 0, 0, 0),
+    'M8': (8, -8, 8, 0, 0, 0),
+    'MS4': (4, -2, 2, 0, 0, 0),
+}
+
+# Coefficients of the nodal corrections u (table 15 of Schureman) of the constituents supported by tide_fac.f, in
+# degrees per degree of: xi, nu, nu', 2nu'', Q (M1), and R (L2)
+U_COEFFICIENTS = {
+    'M2': (2, -2, 0, 0, 0, 0),
+    'S2': (0, 0, 0, 0, 0, 0),
+    'N2': (2, -2, 0, 0, 0, 0),
+    'K1': (0, 0, -1, 0, 0, 0),
+    'M4': (4, -4, 0, 0, 0, 0),
+    'O1': (2, -1, 0, 0, 0, 0),
+    'M6': (6, -6, 0, 0, 0, 0),
+    'MK3': (2, -2, -1, 0, 0, 0),
+    'S4': (0, 0, 0, 0, 0, 0),
+    'MN4': (4, -4, 0, 0, 0, 0),
+    'NU2': (2, -2, 0, 0, 0, 0),
+    'S6': (0, 0, 0, 0, 0, 0),
+    'MU2': (2, -2, 0, 0, 0, 0),
+    '2N2': (2, -2, 0, 0, 0, 0),
+    'OO1': (-2, -1, 0, 0, 0, 0),
+    'LAM2': (2, -2, 0, 0, 0, 0),
+    'S1': (0, 0, 0, 0, 0, 0),
+    'M1': (1, -1, 0, 0, 1, 0),
+    'J1': (0, -1, 0, 0, 0, 0),
+    'MM': (0, 0, 0, 0, 0, 0),
+    'SSA': (0, 0, 0, 0, 0, 0),
+    'SA': (0, 0, 0, 0, 0, 0),
+    'MSF': (0, 0, 0, 0, 0, 0),
+    'MF': (-2, 0, 0, 0, 0, 0),
+    'RHO': (2, -1, 0, 0, 0, 0),
+    'Q1': (2, -1, 0, 0, 0, 0),
+    'T2': (0, 0, 0, 0, 0, 0),
+    'R2': (0, 0, 0, 0, 0, 0),
+    '2Q1': (2, -1, 0, 0, 0, 0),
+    'P1': (0, 0, 0, 0, 0, 0),
+    '2SM2': (-2, 2, 0, 0, 0, 0),
+    'M3': (3, -3, 0, 0, 0, 0),
+    'L2': (2, -2, 0, 0, 0, -1),
+    '2MK3': (4, -4, 1, 0, 0, 0),
+    'K2': (0, 0, 0, -1, 0, 0),
+    'M8': (8, -8, 0, 0, 0, 0),
+    'MS4': (2, -2, 0, 0, 0, 0),
+}
+
+
+# Nodal factor and correction lookup table, see NodalTable
+NODAL_TABLE_START = np.datetime64('1900-01-01T00', 'h')
+NODAL_TABLE_END = np.datetime64('2100-01-01T00', 'h')
+NODAL_TABLE_STEP = np.timedelta64(5 * 24, 'h')
+NODAL_TABLE_FILE = 'nodal_table.npz'
+
+
+# The coefficient tables as (terms x constituents) arrays in constituent registry id order
+V_TABLE = np.array([V_COEFFICIENTS[name] for name in NAMES], dtype=float).T
+U_TABLE = np.array([U_COEFFICIENTS[name] for name in NAMES], dtype=float).T
+
+
+def to_datetime64(times):
+    """Convert times to a datetime64 array.
+
+    Args:
+        times (:obj:`list` of :obj:`datetime.datetime`): The times. Anything pandas.to_datetime understands, including
+            datetime64 arrays.
+
+    Returns:
+        :obj:`numpy.ndarray`: The times as datetime64[ns]
+    """
+    return np.asarray(pd.to_datetime(np.asarray(times).ravel()), dtype='datetime64[ns]')
+
+
+def angle(a_number):
+    """Converts angles to be within 0-360.
+
+    Args:
+        a_number (:obj:`numpy.ndarray`): The angles to convert.
+
+    Returns:
+        :obj:`numpy.ndarray`: The angles converted to be within 0-360.
+    """
+    return np.mod(a_number, 360.0)
+
+
+def orbit_variables(times):
+    """Determination of primary and secondary orbital functions.
+
+    Args:
+        times (:obj:`numpy.ndarray`): Dates and times to compute the orbit at, see to_datetime64(). Only the hour of
+            the day is used, minutes and seconds are ignored like they are in tide_fac.f.
+
+    Returns:
+        :obj:`dict` of :obj:`numpy.ndarray`: The orbital variables in degrees, keyed the same as
+            harmonica.tidal_database.OrbitVariables.astro
+    """
+    times = to_datetime64(times)
+    days = times.astype('datetime64[D]')
+    years = times.astype('datetime64[Y]')
+    hour = ((times - days) // np.timedelta64(1, 'h')).astype(float)
+    year = years.astype(int) + 1970.0
+    dayj = (days - years.astype('datetime64[D]')).astype(int) + 1.0  # ordinal day number
+
+    # Ported code from tide_fac.f
+    x = np.trunc((year - 1901.) / 4.0)
+    dyr = year - 1900.0
+    dday = dayj + x - 1.0
+    # DN IS THE MOON'S NODE (CAPITAL N, TABLE 1, SCHUREMAN)
+    dn = angle(259.1560564 - 19.328185764 * dyr - 0.0529539336 * dday - 0.0022064139 * hour)
+    n = np.radians(dn)
+    # DP IS THE LUNAR PERIGEE (SMALL P, TABLE 1)
+    dp = angle(334.3837214 + 40.66246584 * dyr + 0.111404016 * dday + 0.004641834 * hour)
+    i = np.arccos(0.9136949 - 0.0356926 * np.cos(n))
+    di = angle(np.degrees(i))
+    nu = np.arcsin(0.0897056 * np.sin(n) / np.sin(i))
+    dnu = np.degrees(nu)
+    xi = n - 2.0 * np.arctan(0.64412 * np.tan(n / 2.0)) - nu
+    dxi = np.degrees(xi)
+    dpc = angle(dp - dxi)
+    # DH IS THE MEAN LONGITUDE OF THE SUN (SMALL H, TABLE 1)
+    dh = angle(280.1895014 - 0.238724988 * dyr + 0.9856473288 * dday + 0.0410686387 * hour)
+    # DP1 IS THE SOLAR PERIGEE (SMALL P1, TABLE 1)
+    dp1 = angle(281.2208569 + 0.01717836 * dyr + 0.000047064 * dday + 0.000001961 * hour)
+    # DS IS THE MEAN LONGITUDE OF THE MOON (SMALL S, TABLE 1)
+    ds = angle(277.0256206 + 129.38482032 * dyr + 13.176396768 * dday + 0.549016532 * hour)
+    nup = np.arctan(np.sin(nu) / (np.cos(nu) + 0.334766 / np.sin(2.0 * i)))
+    dnup = np.degrees(nup)
+    nup2 = np.arctan(np.sin(2.0 * nu) / (np.cos(2.0 * nu) + 0.0726184 / np.sin(i) ** 2)) / 2.0
+    dnup2 = np.degrees(nup2)
+    return {
+        'ds': ds,
+        'dp': dp,
+        'dh': dh,
+        'dp1': dp1,
+        'dn': dn,
+        'di': di,
+        'dnu': dnu,
+        'dxi': dxi,
+        'dnup': dnup,
+        'dnup2': dnup2,
+        'dpc': dpc,
+        'hour': hour,
+    }
+
+
+def nodal_factors(names, times):
+    """Calculates node factors of constituents at arrays of times.
+
+    Args:
+        names (:obj:`list`): Names or constituent registry ids of the constituents, see constituent_registry.ids()
+        times (:obj:`numpy.ndarray`): Dates and times to compute the nodal factors at, see to_datetime64()
+
+    Returns:
+        :obj:`numpy.ndarray`: The same values as found in table 14 of Schureman (time x constituent). NaN for
+            constituents not supported by tide_fac.f. 0 for M1 and L2 (see below).
+    """
+    # Ported code from tide_fac.f
+    astro = orbit_variables(times)
+    i = np.radians(astro['di'])
+    nu = np.radians(astro['dnu'])
+    sini = np.sin(i)
+    sini2 = np.sin(i / 2.0)
+    sin2i = np.sin(2.0 * i)
+    cosi2 = np.cos(i / 2.0)
+    # VARIABLE NAMES REFER TO EQUATION NUMBERS IN SCHUREMAN
+    eq73 = (2.0 / 3.0 - sini ** 2) / 0.5021
+    eq74 = sini ** 2 / 0.1578
+    eq75 = sini * cosi2 ** 2 / 0.37988
+    eq76 = np.sin(2 * i) / 0.7214
+    eq77 = sini * sini2 ** 2 / 0.0164
+    eq78 = cosi2 ** 4 / 0.91544
+    eq149 = cosi2 ** 6 / 0.8758
+    eq227 = np.sqrt(0.8965 * sin2i ** 2 + 0.6001 * sin2i * np.cos(nu) + 0.1006)
+    eq235 = 0.001 + np.sqrt(19.0444 * sini ** 4 + 2.7702 * sini ** 2 * np.cos(2.0 * nu) + 0.0981)
+    # NODE FACTORS FOR 37 CONSTITUENTS:
+    m2 = eq78
+    k1 = eq227
+    nodfac = {
+        'M2': m2,
+        'S2': 1.0,
+        'N2': eq78,
+        'K1': k1,
+        'M4': m2 ** 2,
+        'O1': eq75,
+        'M6': m2 ** 3,
+        'MK3': m2 * k1,
+        'S4': 1.0,
+        'MN4': m2 ** 2,
+        'NU2': eq78,
+        'S6': 1.0,
+        'MU2': eq78,
+        '2N2': eq78,
+        'OO1': eq77,
+        'LAM2': eq78,
+        'S1': 1.0,
+        # EQUATION 207 NOT PRODUCING CORRECT ANSWER FOR M1
+        # SET NODE FACTOR FOR M1 = 0 UNTIL CAN FURTHER RESEARCH
+        'M1': 0.0,
+        'J1': eq76,
+        'MM': eq73,
+        'SSA': 1.0,
+        'SA': 1.0,
+        'MSF': eq78,
+        'MF': eq74,
+        'RHO': eq75,
+        'Q1': eq75,
+        'T2': 1.0,
+        'R2': 1.0,
+        '2Q1': eq75,
+        'P1': 1.0,
+        '2SM2': eq78,
+        'M3': eq149,
+        # EQUATION 215 NOT PRODUCING CORRECT ANSWER FOR L2
+        # SET NODE FACTOR FOR L2 = 0 UNTIL CAN FURTHER RESEARCH
+        'L2': 0.0,
+        '2MK3': m2 ** 2 * k1,
+        'K2': eq235,
+        'M8': m2 ** 4,
+        'MS4': eq78,
+    }
+    factors = np.stack([np.broadcast_to(nodfac[name], eq78.shape) for name in NAMES], axis=-1)
+    return take(factors, ids(names))
+
+
+def nodal_corrections(names, times):
+    """Calculates the nodal corrections u of constituents at arrays of times.
+
+    Args:
+        names (:obj:`list`): Names or constituent registry ids of the constituents, see constituent_registry.ids()
+        times (:obj:`numpy.ndarray`): Dates and times to compute the corrections at (the middle of the series), see
+            to_datetime64()
+
+    Returns:
+        :obj:`numpy.ndarray`: The nodal corrections in degrees (time x constituent). Not wrapped to [0 360]. NaN for
+            constituents not supported by tide_fac.f.
+    """
+    # Ported code from tide_fac.f
+    astro = orbit_variables(times)
+    i = np.radians(astro['di'])
+    pc = np.radians(astro['dpc'])
+    top = (5.0 * np.cos(i) - 1.0) * np.sin(pc)
+    bottom = (7.0 * np.cos(i) + 1.0) * np.cos(pc)
+    q = angle(np.degrees(np.arctan2(top, bottom)))
+    r = np.sin(2.0 * pc) / ((1.0 / 6.0) * (1.0 / np.tan(0.5 * i)) ** 2 - np.cos(2.0 * pc))
+    r = np.degrees(np.arctan(r))
+    terms = np.stack([astro['dxi'], astro['dnu'], astro['dnup'], 2.0 * astro['dnup2'], q, r], axis=-1)
+    return terms @ take(U_TABLE, ids(names))
+
+
+def equilibrium_v0(names, times):
+    """Determines the equilibrium arguments V0 of constituents, without the nodal corrections, at arrays of times.
+
+    Args:
+        names (:obj:`list`): Names or constituent registry ids of the constituents, see constituent_registry.ids()
+        times (:obj:`numpy.ndarray`): Dates and times to compute V0 at (the start of the series), see to_datetime64()
+
+    Returns:
+        :obj:`numpy.ndarray`: V0 in degrees (time x constituent). Not wrapped to [0 360]. NaN for constituents not
+            supported by tide_fac.f.
+    """
+    # Ported code from tide_fac.f
+    astro = orbit_variables(times)
+    t = angle(180.0 + astro['hour'] * (360.0 / 24.0))
+    terms = np.stack([t, astro['ds'], astro['dh'], astro['dp'], astro['dp1'], np.ones_like(t)], axis=-1)
+    return terms @ take(V_TABLE, ids(names))
+
+
+def nodal_terms(names, times):
+    """Get the nodal factors and corrections of constituents at arrays of times.
+
+    The values are interpolated from the NodalTable if config['nodal_table'] is enabled, otherwise they are computed
+    by nodal_factors() and nodal_corrections().
+
+    Args:
+        names (:obj:`list`): Names or constituent registry ids of the constituents, see constituent_registry.ids()
+        times (:obj:`numpy.ndarray`): Dates and times to get the nodal terms at, see to_datetime64()
+
+    Returns:
+        tuple(numpy.ndarray, numpy.ndarray): The nodal factors and the nodal corrections in degrees (time x
+            constituent). The corrections are not wrapped to [0 360]. NaN for constituents not supported by tide_fac.f.
+    """
+    if config['nodal_table']:
+        return NodalTable.get().lookup(names, times)
+    return nodal_factors(names, times), nodal_corrections(names, times)
+
+
+def equilibrium_arguments(names, times, times_middle):
+    """Determines the Greenwich equilibrium terms of constituents at arrays of times.
+
+    Args:
+        names (:obj:`list`): Names or constituent registry ids of the constituents, see constituent_registry.ids()
+        times (:obj:`numpy.ndarray`): Start dates and times of the series, see to_datetime64(). V0 is computed here.
+        times_middle (:obj:`numpy.ndarray`): Dates and times to consider as the middle of the series, parallel with
+            times. The nodal corrections u are computed here, see nodal_terms().
+
+    Returns:
+        :obj:`numpy.ndarray`: The same values as found in table 15 of Schureman (time x constituent), V0 + u in
+            degrees [0 360]. NaN for constituents not supported by tide_fac.f.
+    """
+    return angle(equilibrium_v0(names, times) + nodal_terms(names, times_middle)[1])
+
+
+class NodalTable(object):
+    """Lookup table of the nodal factors and corrections of all the tide_fac.f constituents.
+
+    The table has a column for each constituent of the constituent registry, in id order. The nodal factors f and
+    corrections u follow the 18.6 year cycle of the lunar node (and the 8.85 year cycle of the lunar perigee for M1
+    and L2), so they are tabulated every NODAL_TABLE_STEP from NODAL_TABLE_START to NODAL_TABLE_END and linearly
+    interpolated in between. The table is built the first time it is needed and saved to
+    config['data_dir'] so other processes load it instead. Times outside the table are computed exactly.
+
+    With the default 5 day step and the single precision values, the interpolated values are within 5e-6 of the exact
+    nodal factors and 0.005 degrees of the exact nodal corrections (the largest error is for L2), well below the
+    precision of the single precision tide_fac.f output.
+
+    Attributes:
+        names (:obj:`list` of :obj:`str`): Names of the constituents in the table
+        start (:obj:`numpy.datetime64`): Time of the first row of the table
+        step (:obj:`numpy.timedelta64`): Time between the rows of the table
+        factors (:obj:`numpy.ndarray`): The nodal factors (rows x constituents)
+        corrections (:obj:`numpy.ndarray`): The nodal corrections in degrees [0 360] (rows x constituents)
+
+    """
+    tables = {}  # Tables already loaded or built, keyed by file path
+
+    def __init__(self, names, start, step, factors, corrections):
+        """Constructor. Use build(), load(), or get() to create a table.
+
+        Args:
+            names (:obj:`list` of :obj:`str`): Names of the constituents in the table
+            start (:obj:`numpy.datetime64`): Time of the first row of the table
+            step (:obj:`numpy.timedelta64`): Time between the rows of the table
+            factors (:obj:`numpy.ndarray`): The nodal factors (rows x constituents)
+            corrections (:obj:`numpy.ndarray`): The nodal corrections in degrees [0 360] (rows x constituents)
+        """
+        self.names = [str(name) for name in names]
+        self.start = np.datetime64(start, 'h')
+        self.step = np.timedelta64(step, 'h')
+        self.factors = np.asarray(factors)
+        self.corrections = np.asarray(corrections)
+        # Values and slopes of each interval of the table side by side, so a lookup is a gather and a multiply-add.
+        # The corrections are interpolated along the shorter arc, they are wrapped to [0 360].
+        factors = self.factors.astype(float)
+        corrections = self.corrections.astype(float)
+        self._intervals = np.concatenate([
+            factors[:-1], corrections[:-1],
+            np.diff(factors, axis=0), (np.diff(corrections, axis=0) + 180.0) % 360.0 - 180.0,
+        ], axis=1)
+
+    @classmethod
+    def build(cls, start=NODAL_TABLE_START, end=NODAL_TABLE_END, step=NODAL_TABLE_STEP):
+        """Compute the table.
+
+        Args:
+            start (:obj:`numpy.datetime64`, optional): Time of the first row of the table
+            end (:obj:`numpy.datetime64`, optional): Time the table must extend to
+            step (:obj:`numpy.timedelta64`, optional): Time between the rows of the table
+
+        Returns:
+            :obj:`NodalTable`: The table
+        """
+        names = list(NAMES)
+        times = np.arange(start, end + step, step, dtype='datetime64[h]')
+        factors = nodal_factors(names, times).astype(np.float32)
+        corrections = angle(nodal_corrections(names, times)).astype(np.float32)
+        return cls(names, start, step, factors, corrections)
+
+    @classmethod
+    def load(cls, path):
+        """Load a table saved by save().
+
+        Args:
+            path (str): Path to the .npz file
+
+        Returns:
+            :obj:`NodalTable`: The table
+        """
+        with np.load(path) as npz:
+            return cls(npz['names'], npz['start'], npz['step'], npz['factors'], npz['corrections'])
+
+    def save(self, path):
+        """Save the table to a .npz file.
+
+        Args:
+            path (str): Path to the .npz file. Written to a temporary file first so readers never see a partial file.
+        """
+        tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(tmp_path, names=self.names, start=self.start, step=self.step, factors=self.factors,
+                 corrections=self.corrections)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def get(cls):
+        """Get the table in config['data_dir'], loading it or building and saving it the first time it is needed.
+
+        Returns:
+            :obj:`NodalTable`: The table
+        """
+        path = os.path.join(config['data_dir'], NODAL_TABLE_FILE)
+        if path not in cls.tables:
+            table = cls.load(path) if os.path.isfile(path) else None
+            if table is None or table.names != list(NAMES):
+                table = cls.build()
+                try:
+                    os.makedirs(config['data_dir'], exist_ok=True)
+                    table.save(path)
+                except OSError:
+                    pass  # Data directory is read-only, keep the table in memory only.
+            cls.tables[path] = table
+        return cls.tables[path]
+
+    def lookup(self, names, times):
+        """Interpolate the nodal factors and corrections of constituents at arrays of times.
+
+        Args:
+            names (:obj:`list`): Names or constituent registry ids of the constituents, see constituent_registry.ids()
+            times (:obj:`numpy.ndarray`): Dates and times to get the nodal terms at, see to_datetime64()
+
+        Returns:
+            tuple(numpy.ndarray, numpy.ndarray): The nodal factors and the nodal corrections in degrees (time x
+                constituent). The corrections are not wrapped to [0 360]. NaN for constituents not in the table.
+        """
+        times = to_datetime64(times)
+        rows = (times - self.start) / self.step
+        inside = (rows >= 0.0) & (rows <= len(self.factors) - 1)
+        lower = np.clip(np.floor(rows), 0, len(self.factors) - 2).astype(int)
+        weight = (rows - lower)[:, np.newaxis]
+        con_ids = ids(names)
+        supported = con_ids >= 0
+        cols = np.where(supported, con_ids, 0)
+        values = self._intervals[lower[:, np.newaxis], np.concatenate([cols, cols + NUM_CONSTITUENTS])]
+        slopes = self._intervals[lower[:, np.newaxis], np.concatenate([cols + 2 * NUM_CONSTITUENTS,
+                                                                       cols + 3 * NUM_CONSTITUENTS])]
+        values += weight * slopes
+        factors = values[:, :len(names)]
+        corrections = values[:, len(names):]
+
+        outside = ~inside
+        if outside.any():
+            factors[outside] = nodal_factors(cols, times[outside])
+            corrections[outside] = nodal_corrections(cols, times[outside])
+        factors[:, ~supported] = np.nan
+        corrections[:, ~supported] = np.nan
+        return factors, corrections
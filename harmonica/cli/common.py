@@ -2,6 +2,10 @@
 
 # 1. Standard Python modules
 from argparse import _HelpAction
+from contextlib import contextmanager
+import os
+import sys
+import time
 
 # 2. Third party modules
 
@@ -9,9 +13,22 @@ from argparse import _HelpAction
 
 # 4. Local modules
 from .. import __version__
+from ..profiling import Profile
 from ..resource import ResourceManager
 
 
+OUTPUT_FORMATS = ('csv', 'netcdf', 'parquet')
+# Output file extensions of the binary formats, other files are written as csv
+OUTPUT_EXTENSIONS = {
+    '.nc': 'netcdf',
+    '.nc4': 'netcdf',
+    '.netcdf': 'netcdf',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+}
+NETCDF_COMPRESSION = {'zlib': True, 'complevel': 4}  # Compression of the variables written to NetCDF
+
+
 def add_common_args(p):
     """Add the common arguments to the argument parser.
 
@@ -32,11 +49,12 @@ def add_common_args(p):
     )
 
 
-def add_loc_model_args(p):
+def add_loc_model_args(p, required=True):
     """Add the location and model option arguments to the argument parser.
 
     Args:
         p (ArgumentParser): The parser to add arguments to.
+        required (:obj:`bool`, optional): False if the location may be omitted, e.g. when points are read from a file
     """
     # Required positional arguments
     # This combined argument is preferred but there is a bug in argparse with unpacking a multi-value metavar
@@ -50,12 +68,14 @@ def add_loc_model_args(p):
     p.add_argument(
         'lat',
         type=float,
+        nargs=None if required else '?',
         help='Desired latitude location',
         metavar='LAT',
     )
     p.add_argument(
         'lon',
         type=float,
+        nargs=None if required else '?',
         help='Desired longitude location',
         metavar='LON',
     )
@@ -91,3 +111,145 @@ def add_const_out_args(p):
         default=None,
         help='Write output to specified file',
     )
+    p.add_argument(
+        '--format',
+        choices=OUTPUT_FORMATS,
+        default=None,
+        help='Format of the output; inferred from the output file extension by default (.nc: netcdf, '
+             '.parquet: parquet, otherwise csv). netcdf and parquet must be written to a file.',
+    )
+
+
+def add_points_args(p):
+    """Add the batch point input option arguments to the argument parser.
+
+    Args:
+        p (ArgumentParser): The parser to add arguments to.
+    """
+    p.add_argument(
+        '--points',
+        default=None,
+        help='Read the locations from a file instead, one latitude and longitude per line separated by a comma or '
+             'whitespace. Use - to read from stdin.',
+        metavar='FILE',
+    )
+
+
+def add_profile_args(p):
+    """Add the profiling option arguments to the argument parser.
+
+    Args:
+        p (ArgumentParser): The parser to add arguments to.
+    """
+    p.add_argument(
+        '--profile',
+        action='store_true',
+        default=False,
+        help='Print the time spent in each stage of the command to stderr',
+    )
+
+
+@contextmanager
+def profile_command(args):
+    """Collect the timings of a command and print them to stderr when it ends, if the --profile option was given.
+
+    Args:
+        args (...): The parsed command line arguments
+
+    Yields:
+        :obj:`harmonica.profiling.Profile`: The profile, None if the command is not being profiled
+    """
+    if not getattr(args, 'profile', False):
+        yield None
+        return
+    start = time.perf_counter()
+    with Profile() as profile:
+        try:
+            yield profile
+        finally:
+            profile.add_time('total', time.perf_counter() - start)
+            print(profile.report(), file=sys.stderr)
+
+
+def read_points(path):
+    """Read latitude/longitude point locations from a CSV or whitespace delimited text file.
+
+    Blank lines and lines starting with # are skipped, as is a header line before the first point. Columns after the
+    latitude and longitude are ignored.
+
+    Args:
+        path (str): Path to the file, - for stdin
+
+    Returns:
+        :obj:`list` of :obj:`tuple` of :obj:`float`: The latitude and longitude of the points
+    """
+    if path == '-':
+        return _parse_points(sys.stdin, 'stdin')
+    with open(path) as f:
+        return _parse_points(f, path)
+
+
+def _parse_points(lines, source):
+    """Parse latitude/longitude point locations from lines of text, see read_points().
+
+    Args:
+        lines (iterable): The lines of text
+        source (str): Name of the source of the lines for error messages
+
+    Returns:
+        :obj:`list` of :obj:`tuple` of :obj:`float`: The latitude and longitude of the points
+    """
+    locs = []
+    header = False
+    for line_num, line in enumerate(lines, start=1):
+        fields = line.replace(',', ' ').split()
+        if not fields or fields[0].startswith('#'):
+            continue
+        try:
+            locs.append((float(fields[0]), float(fields[1])))
+        except (IndexError, ValueError):
+            if locs or header:
+                raise RuntimeError(f'Invalid point on line {line_num} of {source}: {line.strip()}')
+            header = True
+    return locs
+
+
+def output_format(args):
+    """Get the format to write the output of a command in.
+
+    Args:
+        args (...): The parsed command line arguments with the output and format options
+
+    Returns:
+        str: One of OUTPUT_FORMATS
+    """
+    fmt = args.format
+    if fmt is None:
+        ext = os.path.splitext(args.output)[1].lower() if args.output else ''
+        fmt = OUTPUT_EXTENSIONS.get(ext, 'csv')
+    if fmt != 'csv' and args.output is None:
+        raise RuntimeError(f'\nThe {fmt} format can only be written to a file, specify one with -O.')
+    return fmt
+
+
+def write_netcdf(dataset, path):
+    """Write a Dataset to a compressed NetCDF file.
+
+    Args:
+        dataset (:obj:`xarray.Dataset`): The Dataset to write
+        path (str): Path to the file
+    """
+    dataset.to_netcdf(path, encoding={name: NETCDF_COMPRESSION for name in dataset.data_vars})
+
+
+def write_parquet(frame, path):
+    """Write a DataFrame to a compressed Parquet file.
+
+    Args:
+        frame (:obj:`pandas.DataFrame`): The DataFrame to write
+        path (str): Path to the file
+    """
+    try:
+        frame.to_parquet(path, compression='zstd')
+    except ImportError:
+        raise RuntimeError('\nParquet output requires pyarrow. Install it with: pip install harmonica[parquet]')
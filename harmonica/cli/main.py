@@ -9,11 +9,14 @@ import sys
 # 3. Aquaveo modules
 
 # 4. Local modules
-from .common import add_common_args
+from .common import add_common_args, profile_command
 from .main_constituents import config_parser as config_parser_constituents
 from .main_deconstruct import config_parser as config_parser_deconstruct
+from .main_download import config_parser as config_parser_download
 from .main_reconstruct import config_parser as config_parser_reconstruct
 from .main_resources import config_parser as config_parser_resources
+from .main_serve import config_parser as config_parser_serve
+from ..download import DownloadError
 
 
 def main():
@@ -34,13 +37,16 @@ def main():
     sps.required = True
     config_parser_constituents(sps, True)
     config_parser_deconstruct(sps, True)
+    config_parser_download(sps, True)
     config_parser_reconstruct(sps, True)
     config_parser_resources(sps, True)
+    config_parser_serve(sps, True)
 
     args = p.parse_args(sys.argv[1:])
     try:
-        sys.modules[f'harmonica.cli.main_{args.cmd}'].execute(args)
-    except RuntimeError as e:
+        with profile_command(args):
+            sys.modules[f'harmonica.cli.main_{args.cmd}'].execute(args)
+    except (DownloadError, RuntimeError) as e:
         print(str(e))
         sys.exit(1)
     return 0
@@ -9,8 +9,10 @@ import sys
 # 3. Aquaveo modules
 
 # 4. Local modules
-from .common import add_common_args, add_const_out_args, add_loc_model_args
-from ..tidal_constituents import Constituents
+from .common import (
+    add_common_args, add_const_out_args, add_loc_model_args, add_points_args, add_profile_args, output_format,
+    profile_command, read_points, write_netcdf, write_parquet
+)
 
 
 DESCR = 'Get specified tidal constituents at specified locations.'
@@ -18,6 +20,8 @@ EXAMPLE = """
 Example:
 
     harmonica constituents 38.375789 -74.943915 -C M2 K1 -M tpxo8
+    harmonica constituents --points points.csv -C M2 K1 -M tpxo8 -O constituents.txt
+    harmonica constituents --points points.csv -C M2 K1 -M tpxo8 -O constituents.nc
 """
 
 
@@ -39,8 +43,10 @@ def config_parser(p, sub=False):
         )
 
     add_common_args(p)
-    add_loc_model_args(p)
+    add_loc_model_args(p, required=False)
+    add_points_args(p)
     add_const_out_args(p)
+    add_profile_args(p)
 
 
 def parse_args(args):
@@ -67,10 +73,34 @@ def execute(args):
     Args:
         args (...): Variable length positional arguments
     """
-    cons = Constituents(model=args.model).get_components(
-        [(args.lat, args.lon)], cons=args.cons, positive_ph=args.positive_phase
-    )
-    out = cons.data[0].to_csv(args.output, sep='\t', header=True, index=True, index_label='constituent')
+    # Imported here so the other commands and --help do not load the models and their dependencies
+    from ..tidal_constituents import Constituents
+
+    fmt = output_format(args)
+    if args.points is not None:
+        locs = read_points(args.points)
+    elif args.lat is not None and args.lon is not None:
+        locs = [(args.lat, args.lon)]
+    else:
+        raise RuntimeError('\nSpecify a location with LAT LON or a file of locations with --points.')
+    # One batched extraction for all the points
+    cons = Constituents(model=args.model).get_components(locs, cons=args.cons, positive_ph=args.positive_phase)
+    if len(cons) != len(locs):
+        raise RuntimeError('\nInvalid latitude/longitude location.')
+    if fmt == 'netcdf':
+        dataset = cons.to_xarray()
+        lats, lons = zip(*locs)
+        write_netcdf(dataset.assign_coords(lat=('point', list(lats)), lon=('point', list(lons))), args.output)
+        out = None
+    elif fmt == 'parquet':
+        frame = cons.to_frame() if args.points is not None else cons.data[0].rename_axis('constituent')
+        write_parquet(frame, args.output)
+        out = None
+    elif args.points is not None:
+        # Long format table with a row per point and constituent, the point column is the index of the location
+        out = cons.to_frame().to_csv(args.output, sep='\t', header=True, index=True)
+    else:
+        out = cons.data[0].to_csv(args.output, sep='\t', header=True, index=True, index_label='constituent')
     if args.output is None:
         print(out)
     print("\nComplete.\n")
@@ -85,7 +115,9 @@ def main(args=None):
     if not args:
         args = sys.argv[1:]
     try:
-        execute(parse_args(args))
+        args = parse_args(args)
+        with profile_command(args):
+            execute(args)
     except RuntimeError as e:
         print(str(e))
         sys.exit(1)
@@ -5,13 +5,14 @@ import argparse
 import sys
 
 # 2. Third party modules
-import pandas as pd
 
 # 3. Aquaveo modules
 
 # 4. Local modules
-from .common import add_common_args, add_const_out_args
-from .. import harmonica
+from .common import (
+    add_common_args, add_const_out_args, add_profile_args, output_format, profile_command, write_netcdf,
+    write_parquet
+)
 
 
 DESCR = 'Deconstruct the signal into its tidal constituents.'
@@ -53,7 +54,7 @@ def config_parser(p, sub=False):
         '--datetime_format',
         default='%Y-%m-%d %H:%M:%S',
         help="Format of 'datetime' values in signal file, default: '%%Y-%%m-%%d %%H:%%M:%%S' (used by Pandas "
-             "datetime parser)",
+             "datetime parser); 'ISO8601' for ISO 8601 datetimes or 'epoch' for seconds since 1970-01-01 UTC",
         dest='dt_format',
     )
     p.add_argument(
@@ -83,6 +84,7 @@ def config_parser(p, sub=False):
         default=6,
         help="Number of periods a constituent must complete during signal length to be considered, default: 6",
     )
+    add_profile_args(p)
 
 
 def parse_args(args):
@@ -104,46 +106,84 @@ def parse_args(args):
     return p.parse_args(args)
 
 
-def execute(args):
-    """Execute the deconstruct CLI command.
+def parse_datetimes(columns, dt_format):
+    """Parse the datetimes of a signal, all the rows at once.
 
     Args:
-        args (...): Variable length positional arguments
+        columns (:obj:`list` of :obj:`pandas.Series`): The datetime columns of the signal. Multiple columns are joined
+            with a space before parsing.
+        dt_format (str): strftime format of the datetimes, 'ISO8601' for ISO 8601 datetimes, or 'epoch' for seconds
+            since 1970-01-01 UTC
+
+    Returns:
+        :obj:`pandas.Series`: The parsed datetimes
+    """
+    import pandas as pd
+
+    if dt_format.lower() == 'epoch':
+        return pd.to_datetime(columns[0].astype(float), unit='s')
+    text = columns[0].str.cat(columns[1:], sep=' ') if len(columns) > 1 else columns[0]
+    return pd.to_datetime(text, format='ISO8601' if dt_format.upper() == 'ISO8601' else dt_format)
+
+
+def read_signal(args):
+    """Read the datetimes and water levels of the signal file, only reading the columns that are needed.
+
+    Args:
+        args (...): The parsed command line arguments
+
+    Returns:
+        tuple(pandas.Series, pandas.Series): The datetimes and the water levels
     """
-    args.dt_cols = [int(x) if isinstance(x, str) and x.isdigit() else x for x in args.dt_cols]
-    opts = {
-        'date_parser': lambda x: [pd.datetime.strptime(d, args.dt_format) for d in x],
-        'parse_dates': {'datetimes': args.dt_cols[:-1]},
-        'header': args.header,
-        'sep': args.sep,
-    }
+    import pandas as pd
+
+    header = None if str(args.header) == 'None' else int(args.header)
+    cols = [int(x) if isinstance(x, str) and x.isdigit() else x for x in args.dt_cols]
+    if header is not None and any(isinstance(col, int) for col in cols):
+        # Look up the names of columns given by index in the header row.
+        names = pd.read_csv(args.signal, sep=args.sep, header=header, nrows=0).columns
+        cols = [names[col] if isinstance(col, int) else col for col in cols]
+    dt_cols = cols[:-1]
+    wl_col = cols[-1]
+    dtype = {col: float if args.dt_format.lower() == 'epoch' else str for col in dt_cols}
+    dtype[wl_col] = float
     try:
-        df = pd.read_csv(args.signal, **opts)
+        df = pd.read_csv(args.signal, sep=args.sep, header=header, usecols=list(dict.fromkeys(cols)), dtype=dtype)
+        times = parse_datetimes([df[col] for col in dt_cols], args.dt_format)
     except ValueError as e:
-        if 'not in list' in str(e):
-            print("\nThe column name '{}' is not recognized.".format(str(e).split("'")[1]))
+        if 'not in list' in str(e) or 'do not match columns' in str(e):
+            raise RuntimeError(f"\nThe column name(s) are not recognized: {', '.join(str(col) for col in cols)}.")
         elif 'match format' in str(e):
-            print("\nThe signal's datetime does not match the given format: {}. Verify format and/or header row "
-                  "number".format(args.dt_format))
-        else:
-            print(str(e))
-    except KeyError:
-        print("\nThe column name(s) to parse the signal's datetime are not recognized.")
-
-    wl = args.dt_cols[-1]
-    wl = df.columns[wl] if isinstance(wl, int) else wl
-    try:
-        tide = harmonica.Tide().deconstruct_tide(df[wl], df['datetimes'], cons=args.cons,
-                                                 n_period=args.num_periods, positive_ph=args.positive_phase)
-    except RuntimeWarning as w:
-        if 'Number of calls to function has reached maxfev' in str(w):
-            print("\nThe solver failed to converge to a solution. Provide a longer signal.")
-        else:
-            print(str(w))
-        print('\nFailed.\n')
-        return
-
-    out = tide.constituents.data.to_csv(args.output, sep='\t', header=True, index=True, index_label='constituent')
+            raise RuntimeError("\nThe signal's datetime does not match the given format: {}. Verify format and/or "
+                               "header row number".format(args.dt_format))
+        raise RuntimeError(str(e))
+    except (IndexError, KeyError):
+        raise RuntimeError("\nThe column name(s) to parse the signal's datetime are not recognized.")
+    return times, df[wl_col]
+
+
+def execute(args):
+    """Execute the deconstruct CLI command.
+
+    Args:
+        args (...): Variable length positional arguments
+    """
+    # Imported here so the other commands and --help do not load the models and their dependencies
+    from .. import harmonica
+
+    fmt = output_format(args)
+    times, water_level = read_signal(args)
+    tide = harmonica.Tide().deconstruct_tide(water_level.to_numpy(), times.to_numpy(), cons=args.cons,
+                                             n_period=args.num_periods, positive_ph=args.positive_phase)
+    results = tide.constituents.results
+    if fmt == 'netcdf':
+        write_netcdf(results.to_xarray(), args.output)
+        out = None
+    elif fmt == 'parquet':
+        write_parquet(results.data[0].rename_axis('constituent'), args.output)
+        out = None
+    else:
+        out = results.data[0].to_csv(args.output, sep='\t', header=True, index=True, index_label='constituent')
     if args.output is None:
         print(out)
     print('\nComplete.\n')
@@ -158,7 +198,9 @@ def main(args=None):
     if not args:
         args = sys.argv[1:]
     try:
-        execute(parse_args(args))
+        args = parse_args(args)
+        with profile_command(args):
+            execute(args)
     except RuntimeError as e:
         print(str(e))
         sys.exit(1)
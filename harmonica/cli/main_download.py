@@ -9,6 +9,8 @@ import sys
 # 3. Aquaveo modules
 
 # 4. Local modules
+from .. import config
+from ..download import DownloadError, DownloadProgress
 from ..resource import ResourceManager
 
 
@@ -17,6 +19,7 @@ EXAMPLE = """
 Example:
 
     harmonica download tpxo8
+    harmonica download fes2014 --jobs 8
 """
 
 
@@ -43,6 +46,12 @@ def config_parser(p, sub=False):
         default=ResourceManager.DEFAULT_RESOURCE,
         help='Constituent model specification, default: tpxo8',
     )
+    p.add_argument(
+        '--jobs',
+        type=int,
+        default=None,
+        help='Number of resources to download at the same time, default: {}'.format(config['download_jobs']),
+    )
 
 
 def parse_args(args):
@@ -69,7 +78,12 @@ def execute(args):
     Args:
         args (...): Variable length positional arguments
     """
-    ResourceManager(model=args.model).download_model()
+    progress = DownloadProgress(lambda p: print('\r' + p.report(), end='', file=sys.stderr, flush=True))
+    try:
+        ResourceManager(model=args.model).download_model(progress=progress, jobs=args.jobs)
+    finally:
+        if progress.resources:
+            print(file=sys.stderr)
     print('\nComplete.\n')
 
 
@@ -83,7 +97,7 @@ def main(args=None):
         args = sys.argv[1:]
     try:
         execute(parse_args(args))
-    except RuntimeError as e:
+    except (DownloadError, RuntimeError) as e:
         print(str(e))
         sys.exit(1)
     return
@@ -6,15 +6,14 @@ from datetime import date, datetime
 import sys
 
 # 2. Third party modules
-import numpy as np
-import pandas as pd
-from pytides.tide import Tide as pyTide
 
 # 3. Aquaveo modules
 
 # 4. Local modules
-from .common import add_common_args, add_const_out_args, add_loc_model_args
-from ..harmonica import Tide
+from .common import (
+    add_common_args, add_const_out_args, add_loc_model_args, add_profile_args, output_format, profile_command,
+    write_netcdf, write_parquet
+)
 
 
 DESCR = 'Reconstruct the tides at specified location and times.'
@@ -22,6 +21,7 @@ EXAMPLE = """
 Example:
 
     harmonica reconstruct 38.375789 -74.943915
+    harmonica reconstruct 38.375789 -74.943915 -S 2022-02-20 -L 30 -O water_level.nc
 """
 
 
@@ -36,7 +36,7 @@ def validate_date(value):
     """
     try:
         # return date.fromisoformat(value) # python 3.7
-        return pd.datetime.strptime(value, '%Y-%m-%d')
+        return datetime.strptime(value, '%Y-%m-%d')
     except ValueError:
         msg = "Not a valid date: '{0}'.".format(value)
         raise argparse.ArgumentTypeError(msg)
@@ -90,6 +90,7 @@ def config_parser(p, sub=False):
     )
     add_loc_model_args(p)
     add_const_out_args(p)
+    add_profile_args(p)
 
 
 def parse_args(args):
@@ -116,10 +117,28 @@ def execute(args):
     Args:
         args (...): Variable length positional arguments
     """
-    times = pyTide._times(datetime.fromordinal(args.start_date.toordinal()), np.arange(args.length * 24., dtype=float))
-    tide = Tide(model=args.model).reconstruct_tide(loc=[args.lat, args.lon], times=times, cons=args.cons,
-                                                   positive_ph=args.positive_phase)
-    out = tide.data.to_csv(args.output, sep='\t', header=True, index=False)
+    # Imported here so the other commands and --help do not load the models and their dependencies
+    import numpy as np
+    from ..harmonica import Tide
+
+    fmt = output_format(args)
+    start = np.datetime64(datetime.fromordinal(args.start_date.toordinal()), 's')
+    times = start + (np.arange(args.length * 24., dtype=float) * 3600.).astype('timedelta64[s]')
+    tide = Tide(model=args.model)
+    if fmt == 'netcdf':
+        # Written straight from the result array, with time and location coordinates
+        water_level = tide.reconstruct_tides([(args.lat, args.lon)], times, cons=args.cons,
+                                             positive_ph=args.positive_phase)
+        water_level.attrs['units'] = 'meters'
+        write_netcdf(water_level.to_dataset(), args.output)
+        out = None
+    else:
+        tide.reconstruct_tide(loc=[args.lat, args.lon], times=times, cons=args.cons, positive_ph=args.positive_phase)
+        if fmt == 'parquet':
+            write_parquet(tide.data, args.output)
+            out = None
+        else:
+            out = tide.data.to_csv(args.output, sep='\t', header=True, index=False)
     if args.output is None:
         print(out)
     print('\nComplete.\n')
@@ -134,7 +153,9 @@ def main(args=None):
     if not args:
         args = sys.argv[1:]
     try:
-        execute(parse_args(args))
+        args = parse_args(args)
+        with profile_command(args):
+            execute(args)
     except RuntimeError as e:
         print(str(e))
         sys.exit(1)
@@ -17,10 +17,12 @@ EXAMPLE = """
 Example:
 
     harmonica resources download tpxo8
+    harmonica resources optimize tpxo9
 """
 actions = {
     'download': 'download_model',
     'remove': 'remove_model',
+    'optimize': 'optimize_model',
 }
 
 
@@ -0,0 +1,118 @@
+"""The serve CLI command."""
+
+# 1. Standard Python modules
+import argparse
+import sys
+
+# 2. Third party modules
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from .common import add_common_args
+from ..resource import ResourceManager
+
+
+DESCR = 'Serve constituents, reconstructed tides, and nodal factors over HTTP/JSON, keeping the models loaded.'
+EXAMPLE = """
+Example:
+
+    harmonica serve -M tpxo9 adcirc2015 --port 8765
+    curl -d '{"model": "tpxo9", "points": [[38.375789, -74.943915]], "cons": ["M2", "K1"]}' \\
+        http://127.0.0.1:8765/constituents
+"""
+DEFAULT_HOST = '127.0.0.1'  # Same as harmonica.server.DEFAULT_HOST, which is not imported until the command runs
+DEFAULT_PORT = 8765
+
+
+def config_parser(p, sub=False):
+    """Configure the command line arguments passed the serve CLI command.
+
+    Args:
+        p (ArgumentParser): The argument parser
+        sub (Optional[bool]): True if this is a resources subparser
+    """
+    # Subparser info
+    if sub:
+        p = p.add_parser(
+            'serve',
+            description=DESCR,
+            help=DESCR,
+            epilog=EXAMPLE,
+            add_help=False,
+        )
+
+    add_common_args(p)
+    p.add_argument(
+        '--host',
+        default=DEFAULT_HOST,
+        help=f'Address to listen on, default: {DEFAULT_HOST}',
+    )
+    p.add_argument(
+        '--port',
+        type=int,
+        default=DEFAULT_PORT,
+        help=f'Port to listen on, default: {DEFAULT_PORT}',
+    )
+    p.add_argument(
+        '-M', '--models',
+        nargs='+',
+        choices=ResourceManager.RESOURCES.keys(),
+        default=None,
+        help='Models to load at startup, default: the installed models. Other models load on their first request.',
+    )
+    p.add_argument(
+        '-q', '--quiet',
+        action='store_true',
+        help='Do not log the requests',
+    )
+
+
+def parse_args(args):
+    """Parse the command line arguments passed the serve CLI command.
+
+    Args:
+        args (...): Variable length positional arguments
+
+    Returns:
+        ArgumentParser: The command line argument parser
+    """
+    p = argparse.ArgumentParser(
+        description=DESCR,
+        epilog=EXAMPLE,
+        add_help=False,
+    )
+    config_parser(p)
+    return p.parse_args(args)
+
+
+def execute(args):
+    """Execute the serve CLI command.
+
+    Args:
+        args (...): Variable length positional arguments
+    """
+    # Imported here so the other commands and --help do not load the models and their dependencies
+    from ..server import serve
+
+    try:
+        serve(args.host, args.port, args.models, args.quiet)
+    except OSError as e:
+        raise RuntimeError(f'\nCould not serve on {args.host}:{args.port}: {e}')
+    print('\nComplete.\n')
+
+
+def main(args=None):
+    """Entry point for the serve CLI command.
+
+    Args:
+        args (...): Variable length positional arguments
+    """
+    if not args:
+        args = sys.argv[1:]
+    try:
+        execute(parse_args(args))
+    except RuntimeError as e:
+        print(str(e))
+        sys.exit(1)
+    return
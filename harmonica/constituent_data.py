@@ -0,0 +1,145 @@
+"""Columnar container for the constituent data extracted from the tidal database models."""
+
+# 1. Standard Python modules
+
+# 2. Third party modules
+import numpy as np
+import pandas as pd
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+
+
+COLUMNS = ['amplitude', 'phase', 'speed']
+
+
+class ConstituentData(object):
+    """Amplitude, phase, and speed of constituents at a set of points, stored as dense (points x constituents) arrays.
+
+    The legacy list of per point DataFrames is built lazily the first time it is requested through the data attribute
+    (or by indexing the container) and cached. Edits made to those DataFrames are not reflected in the arrays.
+
+    Attributes:
+        names (:obj:`list` of :obj:`str`): Names of the constituents, parallel with the array columns
+        amplitude (:obj:`numpy.ndarray`): Amplitudes in meters (points x constituents)
+        phase (:obj:`numpy.ndarray`): Phases in degrees (points x constituents)
+        speed (:obj:`numpy.ndarray`): Speeds in degrees/hour, UTC/GMT (points x constituents)
+
+    """
+    def __init__(self, names=None, amplitude=None, phase=None, speed=None):
+        """Constructor.
+
+        Args:
+            names (:obj:`list` of :obj:`str`, optional): Names of the constituents. Defaults to no constituents.
+            amplitude (:obj:`numpy.ndarray`, optional): Amplitudes in meters (points x constituents). Defaults to no
+                points.
+            phase (:obj:`numpy.ndarray`, optional): Phases in degrees, same shape as amplitude
+            speed (:obj:`numpy.ndarray`, optional): Speeds in degrees/hour, same shape as amplitude or broadcastable
+                to it (e.g. one speed per constituent)
+        """
+        self.names = list(names) if names is not None else []
+        shape = (0, len(self.names))
+        self.amplitude = np.asarray(amplitude, dtype=float) if amplitude is not None else np.empty(shape)
+        shape = self.amplitude.shape
+        self.phase = np.asarray(phase, dtype=float).reshape(shape) if phase is not None else np.full(shape, np.nan)
+        speed = speed if speed is not None else np.nan
+        self.speed = np.array(np.broadcast_to(np.asarray(speed, dtype=float), shape))
+        self._frames = None
+
+    def __len__(self):
+        """Get the number of points.
+
+        Returns:
+            int: The number of points
+        """
+        return self.amplitude.shape[0]
+
+    def __getitem__(self, idx):
+        """Get the legacy DataFrame of a point.
+
+        Args:
+            idx (int): Index of the point
+
+        Returns:
+            :obj:`pandas.DataFrame`: The constituent data of the point, rows labeled by constituent name
+        """
+        return self.data[idx]
+
+    def __iter__(self):
+        """Iterate over the legacy DataFrames of the points.
+
+        Returns:
+            iterator: Iterator of the per point DataFrames
+        """
+        return iter(self.data)
+
+    @property
+    def data(self):
+        """:obj:`list` of :obj:`pandas.DataFrame`: The legacy list of per point constituent DataFrames."""
+        if self._frames is None:
+            self._frames = [
+                pd.DataFrame({'amplitude': self.amplitude[i], 'phase': self.phase[i], 'speed': self.speed[i]},
+                             index=list(self.names), columns=COLUMNS)
+                for i in range(len(self))
+            ]
+        return self._frames
+
+    @data.setter
+    def data(self, frames):
+        """Replace the contents of the container with a list of per point constituent DataFrames."""
+        self.__dict__.update(ConstituentData.from_frames(frames).__dict__)
+
+    @classmethod
+    def from_frames(cls, frames):
+        """Create a container from a list of per point constituent DataFrames.
+
+        Args:
+            frames (:obj:`list` of :obj:`pandas.DataFrame`): Constituent data of each point with amplitude, phase,
+                and speed columns and rows labeled by constituent name. Constituents or columns missing from a point
+                are NaN. The DataFrames are kept as the legacy view of the container.
+
+        Returns:
+            :obj:`ConstituentData`: The container
+        """
+        names = []
+        for frame in frames:
+            names.extend(name for name in frame.index if name not in names)
+        arrays = [np.full((len(frames), len(names)), np.nan) for _ in COLUMNS]
+        for i, frame in enumerate(frames):
+            cols = [names.index(name) for name in frame.index]
+            for array, column in zip(arrays, COLUMNS):
+                if column in frame:
+                    array[i, cols] = frame[column].values
+        results = cls(names, *arrays)
+        results._frames = list(frames)
+        return results
+
+    def to_frame(self):
+        """Get the data as a single long format DataFrame.
+
+        Returns:
+            :obj:`pandas.DataFrame`: DataFrame with amplitude, phase, and speed columns indexed by point and
+                constituent name
+        """
+        index = pd.MultiIndex.from_product([range(len(self)), self.names], names=['point', 'constituent'])
+        return pd.DataFrame({'amplitude': self.amplitude.ravel(), 'phase': self.phase.ravel(),
+                             'speed': self.speed.ravel()}, index=index, columns=COLUMNS)
+
+    def to_xarray(self):
+        """Get the data as an xarray Dataset.
+
+        Returns:
+            :obj:`xarray.Dataset`: Dataset with amplitude, phase, and speed variables with dimensions (point,
+                constituent)
+        """
+        import xarray as xr  # Imported on first use, it is slow to import
+        dims = ('point', 'constituent')
+        return xr.Dataset(
+            {
+                'amplitude': (dims, self.amplitude, {'units': 'meters'}),
+                'phase': (dims, self.phase, {'units': 'degrees'}),
+                'speed': (dims, self.speed, {'units': 'degrees/hour'}),
+            },
+            coords={'point': np.arange(len(self)), 'constituent': list(self.names)},
+        )
@@ -0,0 +1,128 @@
+"""Registry of the tidal constituents with astronomical arguments, with stable integer ids and array-backed metadata."""
+
+# 1. Standard Python modules
+
+# 2. Third party modules
+import numpy as np
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+
+
+# The constituents of the tide_fac Fortran utility, in its order. The index of a constituent in this list is its
+# integer id.
+# Source of the speeds, amplitudes, frequencies, and ETRFs: https://tidesandcurrents.noaa.gov
+# name: (speed, amplitude, frequency, ETRF, Doodson numbers)
+#   speed: Rate change in the phase of the constituent (degrees/hour), 360 degrees divided by the period in hours
+#   amplitude: Equilibrium amplitude of the constituent
+#   frequency: Frequency of the constituent (radians/second)
+#   ETRF: Earth tidal reduction factor
+#   Doodson numbers: Multiples of the rates of lunar time (tau), the mean longitudes of the moon (s) and the sun (h),
+#       the lunar perigee (p), the negative of the lunar node (N'), and the solar perigee (p1) making up the speed
+CONSTITUENTS = [
+    ('M2', 28.984104, 0.242334, 0.000140518902509, 0.693, (2, 0, 0, 0, 0, 0)),
+    ('S2', 30.0, 0.112841, 0.000145444104333, 0.693, (2, 2, -2, 0, 0, 0)),
+    ('N2', 28.43973, 0.046398, 0.000137879699487, 0.693, (2, -1, 0, 1, 0, 0)),
+    ('K1', 15.041069, 0.141565, 0.000072921158358, 0.736, (1, 1, 0, 0, 0, 0)),
+    ('M4', 57.96821, 0.0, 0.000281037805017, 0.069, (4, 0, 0, 0, 0, 0)),
+    ('O1', 13.943035, 0.100514, 0.000067597744151, 0.695, (1, -1, 0, 0, 0, 0)),
+    ('M6', 86.95232, 0.0, 0.000421556708011, 0.069, (6, 0, 0, 0, 0, 0)),
+    ('MK3', 44.025173, 0.0, 0.000213440061351, 0.069, (3, 1, 0, 0, 0, 0)),
+    ('S4', 60.0, 0.0, 0.000290888208666, 0.069, (4, 4, -4, 0, 0, 0)),
+    ('MN4', 57.423832, 0.0, 0.000278398601995, 0.069, (4, -1, 0, 1, 0, 0)),
+    ('NU2', 28.512583, 0.0, 0.000138232903707, 0.069, (2, -1, 2, -1, 0, 0)),
+    ('S6', 90.0, 0.0, 0.000436332312999, 0.069, (6, 6, -6, 0, 0, 0)),
+    ('MU2', 27.968208, 0.0, 0.000135593700684, 0.069, (2, -2, 2, 0, 0, 0)),
+    ('2N2', 27.895355, 0.0, 0.000135240496464, 0.069, (2, -2, 0, 2, 0, 0)),
+    ('OO1', 16.139101, 0.0, 0.00007824457305, 0.069, (1, 3, 0, 0, 0, 0)),
+    ('LAM2', 29.455626, 0.0, 0.000142804901311, 0.069, (2, 1, -2, 1, 0, 0)),
+    ('S1', 15.0, 0.0, 0.000072722052166, 0.069, (1, 1, -1, 0, 0, 0)),
+    ('M1', 14.496694, 0.0, 0.000070281955336, 0.069, (1, 0, 0, 1, 0, 0)),
+    ('J1', 15.5854435, 0.0, 0.00007556036138, 0.069, (1, 2, 0, -1, 0, 0)),
+    ('MM', 0.5443747, 0.0, 0.000002639203022, 0.069, (0, 1, 0, -1, 0, 0)),
+    ('SSA', 0.0821373, 0.0, 0.000000398212868, 0.069, (0, 0, 2, 0, 0, 0)),
+    ('SA', 0.0410686, 0.0, 0.000000199106191, 0.069, (0, 0, 1, 0, 0, 0)),
+    ('MSF', 1.0158958, 0.0, 0.000004925201824, 0.069, (0, 2, -2, 0, 0, 0)),
+    ('MF', 1.0980331, 0.0, 0.000005323414692, 0.069, (0, 2, 0, 0, 0, 0)),
+    ('RHO', 13.471515, 0.0, 0.000065311745349, 0.069, (1, -2, 2, -1, 0, 0)),
+    ('Q1', 13.398661, 0.019256, 0.000064958541129, 0.695, (1, -2, 0, 1, 0, 0)),
+    ('T2', 29.958933, 0.0, 0.000145245007353, 0.069, (2, 2, -3, 0, 0, 1)),
+    ('R2', 30.041067, 0.0, 0.000145643201313, 0.069, (2, 2, -1, 0, 0, -1)),
+    ('2Q1', 12.854286, 0.0, 0.000062319338107, 0.069, (1, -3, 0, 2, 0, 0)),
+    ('P1', 14.958931, 0.046834, 0.000072522945975, 0.706, (1, 1, -2, 0, 0, 0)),
+    ('2SM2', 31.015896, 0.0, 0.000150369306157, 0.069, (2, 4, -4, 0, 0, 0)),
+    ('M3', 43.47616, 0.0, 0.000210778353763, 0.069, (3, 0, 0, 0, 0, 0)),
+    ('L2', 29.528479, 0.0, 0.000143158105531, 0.069, (2, 1, 0, -1, 0, 0)),
+    ('2MK3', 42.92714, 0.0, 0.000208116646659, 0.069, (3, -1, 0, 0, 0, 0)),
+    ('K2', 30.082138, 0.030704, 0.000145842317201, 0.693, (2, 2, 0, 0, 0, 0)),
+    ('M8', 115.93642, 0.0, 0.000562075610519, 0.069, (8, 0, 0, 0, 0, 0)),
+    ('MS4', 58.984104, 0.0, 0.000285963006842, 0.069, (4, 2, -2, 0, 0, 0)),
+]
+
+NAMES = tuple(con[0] for con in CONSTITUENTS)
+NUM_CONSTITUENTS = len(NAMES)
+IDS = {name: con_id for con_id, name in enumerate(NAMES)}
+# Alternate constituent names used by the models mapped to the registry names
+ALIASES = {
+    'LAMBDA2': 'LAM2',
+    'RHO1': 'RHO',
+}
+
+
+def _read_only(values, dtype):
+    """Make a contiguous read-only array of constituent metadata, it is shared by the whole package.
+
+    Args:
+        values (:obj:`list`): The values of each constituent, in id order
+        dtype (:obj:`numpy.dtype`): The data type of the array
+
+    Returns:
+        :obj:`numpy.ndarray`: The array
+    """
+    values = np.ascontiguousarray(values, dtype=dtype)
+    values.flags.writeable = False
+    return values
+
+
+SPEED = _read_only([con[1] for con in CONSTITUENTS], float)  # degrees/hour
+AMPLITUDE = _read_only([con[2] for con in CONSTITUENTS], float)
+FREQUENCY = _read_only([con[3] for con in CONSTITUENTS], float)  # radians/second
+ETRF = _read_only([con[4] for con in CONSTITUENTS], float)
+DOODSON = _read_only([con[5] for con in CONSTITUENTS], np.int8)  # constituents x (tau, s, h, p, N', p1)
+
+
+def ids(names, aliases=True):
+    """Get the integer ids of constituents.
+
+    Args:
+        names (:obj:`list` of :obj:`str`): Names of the constituents, case insensitive. Alternate names in ALIASES
+            are accepted. An array of integer ids is returned as is.
+        aliases (bool, optional): If False, alternate names are not accepted
+
+    Returns:
+        :obj:`numpy.ndarray`: The ids of the constituents, -1 for constituents not in the registry
+    """
+    if isinstance(names, np.ndarray) and names.dtype.kind in 'iu':
+        return names.astype(np.intp, copy=False)
+    names = [name.upper() for name in names]
+    if aliases:
+        names = [ALIASES.get(name, name) for name in names]
+    return np.array([IDS.get(name, -1) for name in names], dtype=np.intp)
+
+
+def take(values, con_ids, fill_value=np.nan):
+    """Gather the values of constituents from an array indexed by constituent id along its last axis.
+
+    Args:
+        values (:obj:`numpy.ndarray`): The values of all the constituents (... x NUM_CONSTITUENTS), e.g. SPEED
+        con_ids (:obj:`numpy.ndarray`): Ids of the constituents to gather, see ids(). -1 gathers fill_value.
+        fill_value (:obj:`float`, optional): Value of constituents not in the registry
+
+    Returns:
+        :obj:`numpy.ndarray`: The values of the constituents (... x len(con_ids))
+    """
+    con_ids = np.asarray(con_ids, dtype=np.intp)
+    gathered = np.asarray(values)[..., np.maximum(con_ids, 0)].astype(float)
+    gathered[..., con_ids < 0] = fill_value
+    return gathered
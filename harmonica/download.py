@@ -0,0 +1,291 @@
+"""Streaming, resumable, concurrent downloads of the model resources.
+
+Files are streamed in DOWNLOAD_CHUNK_SIZE chunks to a partial file next to their destination and renamed into place
+once they are complete and verified, so a reader never sees a partial file. An interrupted download is resumed from
+the end of the partial file with an HTTP Range request, by the retries of the same call or by the next call.
+
+run_downloads() downloads several resources at once in a thread pool of config['download_jobs'] threads. No more
+than config['max_host_connections'] connections are opened to a host at a time, by all the threads of the process.
+"""
+
+# 1. Standard Python modules
+import hashlib
+import os
+import shutil
+import threading
+
+# 2. Third party modules
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import config
+
+
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # Bytes read from the connection and written to the file at a time
+DOWNLOAD_RETRIES = 3  # Number of times an interrupted download is resumed before giving up
+DOWNLOAD_TIMEOUT = 60.0  # Seconds to wait for the server to connect or send data
+PART_SUFFIX = '.part'  # Suffix of the partial files of unfinished downloads
+
+_host_slots = {}  # Semaphores limiting the connections to each host, keyed by host
+_host_lock = threading.Lock()
+
+
+class ChecksumError(IOError):
+    """A downloaded file does not match its expected checksum."""
+    pass
+
+
+class DownloadError(IOError):
+    """Downloads of one or more resources failed.
+
+    Attributes:
+        errors (:obj:`dict` of :obj:`Exception`): The error of each resource that failed, keyed by resource
+
+    """
+    def __init__(self, errors):
+        """Constructor.
+
+        Args:
+            errors (:obj:`dict` of :obj:`Exception`): The error of each resource that failed, keyed by resource
+        """
+        details = '; '.join(f'{resource}: {error}' for resource, error in errors.items())
+        super().__init__(f'Could not download {len(errors)} resource(s). {details}')
+        self.errors = errors
+
+
+class DownloadProgress(object):
+    """Aggregates the progress of concurrent downloads, pass it as the progress callback of the downloads.
+
+    Attributes:
+        resources (:obj:`dict` of :obj:`tuple`): The bytes downloaded and total bytes (None if unknown) of each
+            resource, keyed by resource
+        callback (callable): Called with this object after every update, from the downloading threads
+
+    """
+    def __init__(self, callback=None):
+        """Constructor.
+
+        Args:
+            callback (callable, optional): Called with this object after every update, e.g. to print report()
+        """
+        self.resources = {}
+        self.callback = callback
+        self._lock = threading.Lock()
+
+    def __call__(self, resource, done, total):
+        """Update the progress of a resource.
+
+        Args:
+            resource (str): The resource
+            done (int): The bytes downloaded so far
+            total (int): The total bytes, None if unknown
+        """
+        with self._lock:
+            self.resources[resource] = (done, total)
+            if self.callback is not None:
+                self.callback(self)
+
+    @property
+    def done(self):
+        """int: The bytes downloaded of all the resources."""
+        return sum(done for done, _ in list(self.resources.values()))
+
+    @property
+    def total(self):
+        """int: The total bytes of all the resources started so far, None if any of them is unknown."""
+        totals = [total for _, total in list(self.resources.values())]
+        return None if None in totals else sum(totals)
+
+    def report(self):
+        """Format the progress.
+
+        Returns:
+            str: The number of resources and megabytes downloaded
+        """
+        size = f'{self.done / 1.0e6:.1f}'
+        if self.total is not None:
+            size = f'{size} of {self.total / 1.0e6:.1f}'
+        return f'{len(self.resources)} resource(s), {size} MB'
+
+
+def host_slot(url):
+    """Get the semaphore limiting the connections to the host of a URL.
+
+    Args:
+        url (str): The URL
+
+    Returns:
+        :obj:`threading.BoundedSemaphore`: Acquire it while connected to the host. Created with
+            config['max_host_connections'] slots the first time the host is used.
+    """
+    from urllib.parse import urlsplit
+    host = urlsplit(url).netloc
+    with _host_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(config['max_host_connections'])
+        return _host_slots[host]
+
+
+def run_downloads(download, resources, jobs=None):
+    """Download resources concurrently in a bounded thread pool and wait for all of them.
+
+    A failed download does not stop the others, the errors are raised together once they are all done.
+
+    Args:
+        download (callable): Called with a resource to download it
+        resources (list[str]): The resources to download
+        jobs (:obj:`int`, optional): Maximum number of concurrent downloads. Defaults to config['download_jobs'].
+
+    Raises:
+        DownloadError: The downloads of one or more resources failed
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    if not resources:
+        return
+    jobs = jobs if jobs else config['download_jobs']
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(resources)))) as executor:
+        futures = [(resource, executor.submit(download, resource)) for resource in resources]
+        errors = {resource: future.exception() for resource, future in futures if future.exception() is not None}
+    if errors:
+        raise DownloadError(errors) from next(iter(errors.values()))
+
+
+def fetch(url, path, sha256=None, progress=None, chunk_size=DOWNLOAD_CHUNK_SIZE, retries=DOWNLOAD_RETRIES):
+    """Download a file, resuming a previous partial download of it.
+
+    Args:
+        url (str): The URL of the file
+        path (str): Path to save the file to
+        sha256 (:obj:`str`, optional): Expected SHA-256 hex digest of the file. Not verified if not provided.
+        progress (callable, optional): Called with the bytes downloaded so far and the total bytes, None if the
+            server does not send the size, after each chunk
+        chunk_size (:obj:`int`, optional): Bytes to read at a time
+        retries (:obj:`int`, optional): Number of times to resume the download after the connection fails
+
+    Returns:
+        str: The path of the file
+
+    Raises:
+        ChecksumError: The file does not match sha256. The partial file is deleted so the next call starts over.
+    """
+    import http.client
+    import urllib.error
+    import urllib.request  # Imported on first use, it is slow to import
+
+    part = path + PART_SUFFIX
+    for attempt in range(retries + 1):
+        start = os.path.getsize(part) if os.path.isfile(part) else 0
+        request = urllib.request.Request(url, headers={'Range': f'bytes={start}-'} if start else {})
+        try:
+            with host_slot(url), urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT) as response:
+                if response.status != 206:  # The server sent the whole file
+                    start = 0
+                length = response.headers.get('Content-Length')
+                total = start + int(length) if length is not None else None
+                with open(part, 'ab' if start else 'wb') as f:
+                    done = start
+                    while True:
+                        chunk = response.read(chunk_size)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        done += len(chunk)
+                        if progress is not None:
+                            progress(done, total)
+                if total is not None and done < total:
+                    raise http.client.IncompleteRead(b'', total - done)
+            break
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and start:  # Nothing left after the partial file, it is complete
+                break
+            raise
+        except (urllib.error.URLError, http.client.HTTPException, ConnectionError, TimeoutError):
+            if attempt == retries:
+                raise
+
+    if sha256 is not None and file_sha256(part) != sha256.lower():
+        os.remove(part)
+        raise ChecksumError(f'The download of {url} does not match its checksum.')
+    os.replace(part, path)
+    return path
+
+
+def file_sha256(path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Compute the SHA-256 digest of a file.
+
+    Args:
+        path (str): Path to the file
+        chunk_size (:obj:`int`, optional): Bytes to read at a time
+
+    Returns:
+        str: The hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extract_zip(archive, destination_dir):
+    """Extract the files of a zip archive a member at a time.
+
+    Args:
+        archive (str): Path to the archive
+        destination_dir (str): Folder to extract to
+
+    Returns:
+        list[str]: Paths of the extracted files
+    """
+    from zipfile import ZipFile
+    paths = []
+    with ZipFile(archive, 'r') as unzipper:
+        for info in unzipper.infolist():
+            if not info.is_dir():
+                with unzipper.open(info) as src:
+                    paths.append(_extract_member(src, destination_dir, info.filename))
+    return paths
+
+
+def extract_tar(archive, destination_dir, members=None):
+    """Extract files of a gzipped tar archive a member at a time, reading the archive once from start to end.
+
+    Args:
+        archive (str): Path to the archive
+        destination_dir (str): Folder to extract to
+        members (:obj:`set` of :obj:`str`, optional): Names of the members to extract. All the files if not provided.
+
+    Returns:
+        list[str]: Paths of the extracted files
+    """
+    import tarfile
+    paths = []
+    with tarfile.open(archive, mode='r|gz') as tar:
+        for member in tar:
+            if member.isfile() and (members is None or member.name in members):
+                with tar.extractfile(member) as src:
+                    paths.append(_extract_member(src, destination_dir, member.name))
+    return paths
+
+
+def _extract_member(src, destination_dir, name):
+    """Copy an archive member to a partial file in chunks and rename it into place.
+
+    Args:
+        src (file-like): The open archive member
+        destination_dir (str): Folder to extract to
+        name (str): Name of the member, a path relative to destination_dir
+
+    Returns:
+        str: Path of the extracted file
+    """
+    root = os.path.abspath(destination_dir)
+    path = os.path.abspath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f'Archive member is outside the destination folder: "{name}".')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + PART_SUFFIX, 'wb') as dst:
+        shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK_SIZE)
+    os.replace(path + PART_SUFFIX, path)
+    return path
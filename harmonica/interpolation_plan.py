@@ -0,0 +1,107 @@
+"""Precomputed point locations and interpolation weights for a fixed set of points."""
+
+# 1. Standard Python modules
+import os
+
+# 2. Third party modules
+import numpy as np
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+
+
+class InterpolationPlan(object):
+    """The cells or triangles containing a set of points in the grids of a model, with their interpolation weights.
+
+    A plan is built by a model's extractor, see TidalDB.build_plan(). Passing it to get_components() skips locating
+    the points, only the values of the cell corners or triangle nodes are read and weighted. The contents of each grid
+    are specific to the model, e.g. cell indices and bilinear weights for the gridded models and triangle nodes and
+    barycentric weights for the ADCIRC mesh.
+
+    Attributes:
+        model (str): Name of the model the plan was built for
+        lats (:obj:`numpy.ndarray`): Latitudes of the points
+        lons (:obj:`numpy.ndarray`): Longitudes of the points, as given
+        grids (:obj:`dict` of :obj:`dict`): The arrays of each grid of the model, keyed by grid name and then by array
+            name. Filled as the grids are needed.
+
+    """
+    def __init__(self, model, locs=None, lats=None, lons=None, grids=None):
+        """Constructor.
+
+        Args:
+            model (str): Name of the model
+            locs (:obj:`list` of :obj:`tuple` of :obj:`float`, optional): latitude [-90, 90] and longitude [-180 180]
+                or [0 360] of the points. Give either locs or lats and lons.
+            lats (:obj:`numpy.ndarray`, optional): Latitudes of the points
+            lons (:obj:`numpy.ndarray`, optional): Longitudes of the points
+            grids (:obj:`dict` of :obj:`dict`, optional): The arrays of each grid, see the grids attribute
+        """
+        self.model = model.lower()
+        if locs is not None:
+            lats = [loc[0] for loc in locs]
+            lons = [loc[1] for loc in locs]
+        self.lats = np.asarray(lats if lats is not None else [], dtype=float)
+        self.lons = np.asarray(lons if lons is not None else [], dtype=float)
+        self.grids = grids if grids is not None else {}
+
+    def __len__(self):
+        """Get the number of points.
+
+        Returns:
+            int: The number of points
+        """
+        return len(self.lats)
+
+    @property
+    def locs(self):
+        """:obj:`list` of :obj:`tuple` of :obj:`float`: The latitude and longitude of the points."""
+        return list(zip(self.lats.tolist(), self.lons.tolist()))
+
+    def matches(self, model, locs):
+        """Check if the plan was built for a model and set of points.
+
+        Args:
+            model (str): Name of the model
+            locs (:obj:`list` of :obj:`tuple` of :obj:`float`): latitude and longitude of the points
+
+        Returns:
+            bool: True if the plan can be used for the points
+        """
+        if model.lower() != self.model or len(locs) != len(self):
+            return False
+        coords = np.asarray(locs, dtype=float).reshape(len(locs), -1)
+        return np.array_equal(coords[:, 0], self.lats) and np.array_equal(coords[:, 1], self.lons)
+
+    @classmethod
+    def load(cls, path):
+        """Load a plan saved by save().
+
+        Args:
+            path (str): Path to the .npz file
+
+        Returns:
+            :obj:`InterpolationPlan`: The plan
+        """
+        grids = {}
+        with np.load(path) as npz:
+            for key in npz.files:
+                if key.startswith('grids.'):
+                    _, grid, name = key.split('.', 2)
+                    grids.setdefault(grid, {})[name] = npz[key]
+            return cls(str(npz['model']), lats=npz['lats'], lons=npz['lons'], grids=grids)
+
+    def save(self, path):
+        """Save the plan to a .npz file.
+
+        Args:
+            path (str): Path to the .npz file. Written to a temporary file first so readers never see a partial file.
+        """
+        arrays = {
+            f'grids.{grid}.{name}': values for grid, grid_arrays in self.grids.items()
+            for name, values in grid_arrays.items()
+        }
+        tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(tmp_path, model=self.model, lats=self.lats, lons=self.lons, **arrays)
+        os.replace(tmp_path, path)
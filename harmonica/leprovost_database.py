@@ -1,18 +1,20 @@
 """This module contains the tidal database extractor for the LeProvost tidal database."""
 
 # 1. Standard Python modules
-import math
 import os
 
 # 2. Third party modules
 import numpy
-import pandas as pd
 
 # 3. Aquaveo modules
 
 # 4. Local modules
+from .constituent_data import ConstituentData
+from .constituent_registry import ids, SPEED, take
+from .profiling import count, timer
 from .resource import ResourceManager
-from .tidal_database import convert_coords, get_complex_components, NOAA_SPEEDS, TidalDB
+from .store import is_store, store_names
+from .tidal_database import convert_coords, read_files, TidalDB
 
 
 DEFAULT_LEPROVOST_RESOURCE = 'leprovost'
@@ -36,22 +38,25 @@ class LeProvostDB(TidalDB):
             ))
         super().__init__(model)
 
-    def get_components(self, locs, cons=None, positive_ph=False):
+    def get_components(self, locs, cons=None, positive_ph=False, plan=None):
         """Get the amplitude, phase, and speed of specified constituents at specified point locations.
 
         Args:
             locs (:obj:`list` of :obj:`tuple` of :obj:`float`): latitude [-90, 90] and longitude [-180 180] or [0 360]
-                of the requested points.
+                of the requested points. May be None if a plan is given.
             cons (:obj:`list` of :obj:`str`, optional): List of the constituent names to get amplitude and phase for. If
                 not supplied, all valid constituents will be extracted.
             positive_ph (bool, optional): Indicate if the returned phase should be all positive [0 360] (True) or
                 [-180 180] (False, the default).
+            plan (:obj:`harmonica.interpolation_plan.InterpolationPlan`, optional): Plan built by build_plan() for
+                locs, the points are not located again
 
         Returns:
-           :obj:`list` of :obj:`pandas.DataFrame`: A list of dataframes of constituent information including
-                amplitude (meters), phase (degrees) and speed (degrees/hour, UTC/GMT). The list is parallel with locs,
-                where each element in the return list is the constituent data for the corresponding element in locs.
-                Empty list on error. Note that function uses fluent interface pattern.
+            :obj:`harmonica.leprovost_database.LeProvostDB`: This extractor, using the fluent interface pattern. Its
+                results attribute is a :obj:`harmonica.constituent_data.ConstituentData` of the amplitude (meters),
+                phase (degrees) and speed (degrees/hour, UTC/GMT) as (points x constituents) arrays parallel with locs,
+                empty on error. Its data attribute is the legacy list of dataframes, one per element in locs, built when
+                first accessed.
         """
         # If no constituents specified, extract all valid constituents.
         if not cons:
@@ -59,12 +64,114 @@ class LeProvostDB(TidalDB):
         else:  # Be case-insensitive
             cons = [con.upper() for con in cons]
 
+        plan = self.get_plan(locs, plan)
+        self.locate(plan)
+        grid = plan.grids['grid']
+        if not grid:
+            self.results = ConstituentData()
+            return self  # ERROR: Not in latitude/longitude
+        num_pts = len(plan)
+        count('points', num_pts)
+        rows, cols, in_bounds = grid['rows'], grid['cols'], grid['in_bounds']
+        weight_a, weight_b = grid['weight_a'], grid['weight_b']
+
+        con_speeds = dict(zip(cons, take(SPEED, ids(cons, aliases=False))))
+        reads = []  # (dataset, path, variables, rows, columns, lead) of each constituent
+        read_cons = []  # (constituent, read from the optimized store) of each read
+        filenames = []
+        for dset_idx, dset in enumerate(self.resources.get_datasets(cons, filenames)):
+            stored = is_store(dset[0])
+            with timer('leprovost.decode_names'):
+                if stored:  # The optimized store of the model
+                    nc_names = store_names(dset[0])
+                elif self.model == 'leprovost':  # All constituents in one file with constituent name dataset.
+                    nc_names = [x.strip().upper() for x in dset[0].spectrum.data.tolist()]
+                else:  # FES2014 has separate files for each constituent with no constituent name dataset.
+                    con_filenames = filenames[dset_idx]
+                    nc_names = [os.path.splitext(os.path.basename(filename))[0].upper() for filename in con_filenames]
+            for con in sorted(set(cons) & set(nc_names)):
+                count('constituents')
+                con_idx = nc_names.index(con)
+                if stored:  # The real and imaginary components (meters)
+                    reads.append((dset[0], filenames[dset_idx][0], ['re', 'im'], rows, cols, (con_idx,)))
+                elif self.model == 'leprovost':
+                    reads.append((dset[0], filenames[dset_idx][0], ['amplitude', 'phase'], rows, cols, (con_idx,)))
+                else:
+                    reads.append((dset[con_idx], filenames[dset_idx][con_idx], ['amplitude', 'phase'], rows, cols, ()))
+                read_cons.append((con, stored))
+
+        # Read potential contributing values of every point from the files, the FES2014 files in parallel if enabled.
+        results = {}
+        for (con, stored), (first, second) in zip(read_cons, read_files(reads)):
+            with timer('leprovost.interpolate'):
+                if stored:
+                    cell_re = first.astype(float)
+                    cell_im = second.astype(float)
+                else:
+                    # Get the real and imaginary components from the amplitude (centimeters) and phases in the file.
+                    # The optimized store has them.
+                    amps = first.astype(float)
+                    phases = numpy.radians(second.astype(float))
+                    cell_re = amps * numpy.cos(phases)
+                    cell_im = amps * numpy.sin(phases)
+
+                # Make sure we have at least one neighbor with an active amplitude and phase value.
+                active = ~numpy.isnan(cell_re) & ~numpy.isnan(cell_im)
+                found = ~numpy.isnan(cell_re).all(axis=-1) & ~numpy.isnan(cell_im).all(axis=-1)
+
+                reals = numpy.where(active, cell_re, 0.0) * weight_a * weight_b
+                imags = numpy.where(active, cell_im, 0.0) * weight_a * weight_b
+                denoms = numpy.where(active, weight_a * weight_b, 0.0)
+
+                # Perform bi-linear interpolation from the active cell corners to the target point.
+                with numpy.errstate(divide='ignore', invalid='ignore'):
+                    xcos = reals[:, 0] + reals[:, 1] + reals[:, 2] + reals[:, 3]
+                    xsin = imags[:, 0] + imags[:, 1] + imags[:, 2] + imags[:, 3]
+                    denom = denoms[:, 0] + denoms[:, 1] + denoms[:, 2] + denoms[:, 3]
+                    xcos = xcos / denom
+                    xsin = xsin / denom
+                    amp = numpy.sqrt(xcos * xcos + xsin * xsin)
+
+                    # Compute interpolated phase
+                    phase = numpy.degrees(numpy.arccos(xcos / amp))
+                if not stored:
+                    amp /= 100.0  # centimeters to meters
+                phase = numpy.where(xsin < 0.0, 360.0 - phase, phase)
+
+                # Points outside the domain or without an active neighbor are left NaN.
+                con_amp = numpy.full(num_pts, numpy.nan)
+                con_phase = numpy.full(num_pts, numpy.nan)
+                con_speed = numpy.full(num_pts, numpy.nan)
+                valid = numpy.flatnonzero(in_bounds)[found]
+                con_amp[valid] = amp[found]
+                con_phase[valid] = phase[found]
+                con_speed[valid] = con_speeds[con]
+            results[con] = (con_amp, con_phase, con_speed)
+
+        # Place info into data tables.
+        with timer('leprovost.assemble'):
+            names = list(results)
+            amps = numpy.array([results[con][0] for con in names]).reshape(len(names), num_pts)
+            phases = numpy.array([results[con][1] for con in names]).reshape(len(names), num_pts)
+            speeds = numpy.array([results[con][2] for con in names]).reshape(len(names), num_pts)
+            self.results = ConstituentData(names, amps.T, phases.T, speeds.T)
+        return self
+
+    def locate(self, plan, cons=None):
+        """Locate the points of a plan in the grid of the model and compute their bilinear weights.
+
+        Args:
+            plan (:obj:`harmonica.interpolation_plan.InterpolationPlan`): The plan to fill
+            cons (:obj:`list` of :obj:`str`, optional): Ignored, all the constituents of the model share one grid
+        """
+        if 'grid' in plan.grids:
+            return
         # Make sure point locations are valid lat/lon
-        locs = convert_coords(locs, self.model == "fes2014")
+        locs = convert_coords(plan.locs, self.model == "fes2014")
         if not locs:
-            return self  # ERROR: Not in latitude/longitude
+            plan.grids['grid'] = {}  # ERROR: Not in latitude/longitude
+            return
 
-        self.data = [pd.DataFrame(columns=['amplitude', 'phase', 'speed']) for _ in range(len(locs))]
         dataset_atts = self.resources.model_atts.dataset_attributes()
 
         n_lat = dataset_atts['num_lats']
@@ -74,108 +181,27 @@ class LeProvostDB(TidalDB):
         d_lat = 180.0 / (n_lat - 1)
         d_lon = 360.0 / n_lon
 
-        filenames = []
-        for dset_idx, dset in enumerate(self.resources.get_datasets(cons, filenames)):
-            if self.model == 'leprovost':  # All constituents in one file with constituent name dataset.
-                nc_names = [x.strip().upper() for x in dset[0].spectrum.data.tolist()]
-            else:  # FES2014 has separate files for each constituent with no constituent name dataset.
-                con_filenames = filenames[dset_idx]
-                nc_names = [os.path.splitext(os.path.basename(filename))[0].upper() for filename in con_filenames]
-            for con_idx, con in enumerate(sorted(set(cons) & set(nc_names))):
-                for i, pt in enumerate(locs):
-                    y_lat, x_lon = pt  # lat,lon not x,y
-                    xlo = int((x_lon - lon_min) / d_lon) + 1
-                    xlonlo = lon_min + (xlo - 1) * d_lon
-                    xhi = xlo + 1
-                    if xlo == n_lon:
-                        xhi = 1
-                    ylo = int((y_lat - lat_min) / d_lon) + 1
-                    ylatlo = lat_min + (ylo - 1) * d_lat
-                    yhi = ylo + 1
-                    xlo -= 1
-                    xhi -= 1
-                    ylo -= 1
-                    yhi -= 1
-                    skip = False
-
-                    # Make sure lat/lon coordinate is in the domain.
-                    out_of_bounds = xlo > n_lon or xhi > n_lon or yhi > n_lat or ylo > n_lat
-                    out_of_bounds = out_of_bounds or xlo < 0 or xhi < 0 or yhi < 0 or ylo < 0
-                    if out_of_bounds:
-                        skip = True
-                    else:  # Make sure we have at least one neighbor with an active amplitude value.
-                        con_idx = nc_names.index(con)
-                        if self.model == 'leprovost':
-                            amp_dset = dset[0].amplitude[con_idx]
-                            phase_dset = dset[0].phase[con_idx]
-                        else:
-                            amp_dset = dset[con_idx].amplitude
-                            phase_dset = dset[con_idx].phase
-
-                        # Read potential contributing amplitudes from the file.
-                        xlo_yhi_amp = amp_dset[yhi][xlo]
-                        xlo_ylo_amp = amp_dset[ylo][xlo]
-                        xhi_yhi_amp = amp_dset[yhi][xhi]
-                        xhi_ylo_amp = amp_dset[ylo][xhi]
-                        hi_nan = numpy.isnan(xlo_yhi_amp) and numpy.isnan(xhi_yhi_amp)
-                        lo_nan = numpy.isnan(xlo_ylo_amp) and numpy.isnan(xhi_ylo_amp)
-                        if hi_nan and lo_nan:
-                            skip = True
-                        else:  # Make sure we have at least one neighbor with an active phase value.
-                            # Read potential contributing phases from the file.
-                            xlo_yhi_phase = math.radians(phase_dset[yhi][xlo])
-                            xlo_ylo_phase = math.radians(phase_dset[ylo][xlo])
-                            xhi_yhi_phase = math.radians(phase_dset[yhi][xhi])
-                            xhi_ylo_phase = math.radians(phase_dset[ylo][xhi])
-                            hi_nan = numpy.isnan(xlo_yhi_phase) and numpy.isnan(xhi_yhi_phase)
-                            lo_nan = numpy.isnan(xlo_ylo_phase) and numpy.isnan(xhi_ylo_phase)
-                            if hi_nan and lo_nan:
-                                skip = True
-
-                    if skip:
-                        self.data[i].loc[con] = [numpy.nan, numpy.nan, numpy.nan]
-                    else:
-                        xratio = (x_lon - xlonlo) / d_lon
-                        yratio = (y_lat - ylatlo) / d_lat
-
-                        # Get the real and imaginary components from the amplitude and phases in the file. It
-                        # would be better if these values were stored in the file like TPXO.
-                        complex_comps = get_complex_components(
-                            amps=[xlo_yhi_amp, xhi_yhi_amp, xlo_ylo_amp, xhi_ylo_amp],
-                            phases=[xlo_yhi_phase, xhi_yhi_phase, xlo_ylo_phase, xhi_ylo_phase],
-                        )
-
-                        # Perform bi-linear interpolation from the four cell corners to the target point.
-                        xcos = 0.0
-                        xsin = 0.0
-                        denom = 0.0
-                        if not numpy.isnan(xlo_yhi_amp) and not numpy.isnan(xlo_yhi_phase):
-                            xcos = xcos + complex_comps[0][0] * (1.0 - xratio) * yratio
-                            xsin = xsin + complex_comps[0][1] * (1.0 - xratio) * yratio
-                            denom = denom + (1.0 - xratio) * yratio
-                        if not numpy.isnan(xhi_yhi_amp) and not numpy.isnan(xhi_yhi_phase):
-                            xcos = xcos + complex_comps[1][0] * xratio * yratio
-                            xsin = xsin + complex_comps[1][1] * xratio * yratio
-                            denom = denom + xratio * yratio
-                        if not numpy.isnan(xlo_ylo_amp) and not numpy.isnan(xlo_ylo_phase):
-                            xcos = xcos + complex_comps[2][0] * (1.0 - xratio) * (1 - yratio)
-                            xsin = xsin + complex_comps[2][1] * (1.0 - xratio) * (1 - yratio)
-                            denom = denom + (1.0 - xratio) * (1.0 - yratio)
-                        if not numpy.isnan(xhi_ylo_amp) and not numpy.isnan(xhi_ylo_phase):
-                            xcos = xcos + complex_comps[3][0] * (1.0 - yratio) * xratio
-                            xsin = xsin + complex_comps[3][1] * (1.0 - yratio) * xratio
-                            denom = denom + (1.0 - yratio) * xratio
-                        xcos = xcos / denom
-                        xsin = xsin / denom
-                        amp = math.sqrt(xcos * xcos + xsin * xsin)
-
-                        # Compute interpolated phase
-                        phase = math.degrees(math.acos(xcos / amp))
-                        amp /= 100.0
-                        if xsin < 0.0:
-                            phase = 360.0 - phase
-                        phase += (360. if positive_ph and phase < 0 else 0)
-                        speed = NOAA_SPEEDS[con][0] if con in NOAA_SPEEDS else numpy.nan
-                        self.data[i].loc[con] = [amp, phase, speed]
-
-        return self
+        # Locate every point in the grid at once.
+        with timer('leprovost.locate'):
+            y_lat = numpy.array([pt[0] for pt in locs], dtype=float)  # lat,lon not x,y
+            x_lon = numpy.array([pt[1] for pt in locs], dtype=float)
+            xlo = ((x_lon - lon_min) / d_lon).astype(int)
+            xlonlo = lon_min + xlo * d_lon
+            xhi = numpy.where(xlo == n_lon - 1, 0, xlo + 1)
+            ylo = ((y_lat - lat_min) / d_lon).astype(int)
+            ylatlo = lat_min + ylo * d_lat
+            yhi = ylo + 1
+            # Make sure lat/lon coordinate is in the domain.
+            in_bounds = (xlo >= 0) & (xlo < n_lon) & (xhi >= 0) & (xhi < n_lon)
+            in_bounds = in_bounds & (ylo >= 0) & (ylo < n_lat) & (yhi >= 0) & (yhi < n_lat)
+            xratio = ((x_lon - xlonlo) / d_lon)[in_bounds, numpy.newaxis]
+            yratio = ((y_lat - ylatlo) / d_lat)[in_bounds, numpy.newaxis]
+            # Cell corners of each point in the order: xlo_yhi, xhi_yhi, xlo_ylo, xhi_ylo
+            plan.grids['grid'] = {
+                'rows': numpy.stack([yhi, yhi, ylo, ylo], axis=-1)[in_bounds],
+                'cols': numpy.stack([xlo, xhi, xlo, xhi], axis=-1)[in_bounds],
+                # Bi-linear weights of the corners, kept as two factors to match the order of the scalar computation.
+                'weight_a': numpy.hstack([1.0 - xratio, xratio, 1.0 - xratio, 1.0 - yratio]),
+                'weight_b': numpy.hstack([yratio, yratio, 1.0 - yratio, xratio]),
+                'in_bounds': in_bounds,
+            }
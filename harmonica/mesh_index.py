@@ -0,0 +1,240 @@
+"""Point location indexes for the triangles of unstructured model meshes."""
+
+# 1. Standard Python modules
+import os
+
+# 2. Third party modules
+import numpy as np
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+
+
+LOCATE_CHUNK_SIZE = 65536  # Number of points located at once by the bucket index
+TRIS_PER_BUCKET = 2.0  # Target average number of triangles per bucket of the bucket index
+CONTAINS_TOLERANCE = 1.0e-10  # Barycentric coordinate tolerance for a point on a triangle edge
+
+
+class MeshIndex(object):
+    """Point location index for a triangular mesh, backed by xmsgrid's TriSearch.
+
+    Attributes:
+        x (:obj:`numpy.ndarray`): x coordinates (longitude) of the mesh nodes
+        y (:obj:`numpy.ndarray`): y coordinates (latitude) of the mesh nodes
+        tris (:obj:`numpy.ndarray`): Node indices of the mesh triangles (triangles x 3)
+
+    """
+    def __init__(self, x, y, tris):
+        """Constructor.
+
+        Args:
+            x (:obj:`numpy.ndarray`): x coordinates (longitude) of the mesh nodes
+            y (:obj:`numpy.ndarray`): y coordinates (latitude) of the mesh nodes
+            tris (:obj:`numpy.ndarray`): Node indices of the mesh triangles (triangles x 3)
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.tris = np.asarray(tris).reshape(-1, 3)
+        self._tri_search = None
+
+    def locate(self, xs, ys):
+        """Find the triangles containing points.
+
+        Args:
+            xs (:obj:`numpy.ndarray`): x coordinates (longitude) of the points
+            ys (:obj:`numpy.ndarray`): y coordinates (latitude) of the points
+
+        Returns:
+            :obj:`numpy.ndarray`: Index of the triangle containing each point, -1 if the point is outside the mesh
+        """
+        if self._tri_search is None:
+            # Imported on first use so xmsgrid is only loaded by the queries that need it
+            from xms.grid.geometry.tri_search import TriSearch
+            mesh_pts = [(float(x), float(y), 0.0) for x, y in zip(self.x, self.y)]
+            self._tri_search = TriSearch(mesh_pts, self.tris.flatten().tolist())
+        # TriSearch returns the offset of the triangle's first node in the flat triangle list
+        offsets = np.array([self._tri_search.triangle_containing_point((x, y)) for x, y in zip(xs, ys)], dtype=int)
+        return np.where(offsets < 0, -1, offsets // 3)
+
+    def barycentric_weights(self, tri_ids, xs, ys):
+        """Compute the barycentric area weights of points in the triangles containing them.
+
+        Args:
+            tri_ids (:obj:`numpy.ndarray`): Index of the triangle containing each point
+            xs (:obj:`numpy.ndarray`): x coordinates (longitude) of the points
+            ys (:obj:`numpy.ndarray`): y coordinates (latitude) of the points
+
+        Returns:
+            :obj:`numpy.ndarray`: The weights of the triangle nodes for each point (points x 3), parallel with
+                self.tris[tri_ids]
+        """
+        nodes = self.tris[tri_ids]
+        x1, x2, x3 = self.x[nodes].T
+        y1, y2, y3 = self.y[nodes].T
+        x = np.asarray(xs, dtype=float)
+        y = np.asarray(ys, dtype=float)
+        ta = np.abs((x2 * y3 - x3 * y2) - (x1 * y3 - x3 * y1) + (x1 * y2 - x2 * y1))
+        w1 = ((x - x3) * (y2 - y3) + (x2 - x3) * (y3 - y)) / ta
+        w2 = ((x - x1) * (y3 - y1) - (y - y1) * (x3 - x1)) / ta
+        w3 = ((y - y1) * (x2 - x1) - (x - x1) * (y2 - y1)) / ta
+        return np.stack([w1, w2, w3], axis=-1)
+
+
+class BucketMeshIndex(MeshIndex):
+    """Point location index for a triangular mesh using a uniform grid of buckets and NumPy arrays only.
+
+    Each bucket lists the triangles whose bounding box overlaps it, so the index is a handful of compact arrays that
+    can be saved to and loaded from a .npz file much faster than the index can be rebuilt.
+
+    """
+    def __init__(self, x, y, tris, origin, bucket_size, shape, bucket_start, bucket_tris):
+        """Constructor. Use build() or load() to create an index.
+
+        Args:
+            x (:obj:`numpy.ndarray`): x coordinates (longitude) of the mesh nodes
+            y (:obj:`numpy.ndarray`): y coordinates (latitude) of the mesh nodes
+            tris (:obj:`numpy.ndarray`): Node indices of the mesh triangles (triangles x 3)
+            origin (:obj:`tuple` of :obj:`float`): x and y coordinates of the lower left corner of the bucket grid
+            bucket_size (:obj:`tuple` of :obj:`float`): Width and height of a bucket
+            shape (:obj:`tuple` of :obj:`int`): Number of buckets in the x and y directions
+            bucket_start (:obj:`numpy.ndarray`): Offset of each bucket's first triangle in bucket_tris (buckets + 1)
+            bucket_tris (:obj:`numpy.ndarray`): Triangles overlapping the buckets, sorted by bucket
+        """
+        super().__init__(x, y, tris)
+        self.origin = tuple(float(v) for v in origin)
+        self.bucket_size = tuple(float(v) for v in bucket_size)
+        self.shape = tuple(int(v) for v in shape)
+        self.bucket_start = np.asarray(bucket_start)
+        self.bucket_tris = np.asarray(bucket_tris)
+
+    @classmethod
+    def build(cls, x, y, tris):
+        """Build the index for a mesh.
+
+        Args:
+            x (:obj:`numpy.ndarray`): x coordinates (longitude) of the mesh nodes
+            y (:obj:`numpy.ndarray`): y coordinates (latitude) of the mesh nodes
+            tris (:obj:`numpy.ndarray`): Node indices of the mesh triangles (triangles x 3)
+
+        Returns:
+            :obj:`BucketMeshIndex`: The index
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        tris = np.asarray(tris, dtype=np.int32).reshape(-1, 3)
+        origin = (x.min(), y.min())
+        width = max(x.max() - origin[0], np.finfo(float).eps)
+        height = max(y.max() - origin[1], np.finfo(float).eps)
+        num_buckets = max(len(tris) / TRIS_PER_BUCKET, 1.0)
+        nx = int(np.clip(np.ceil(np.sqrt(num_buckets * width / height)), 1, num_buckets))
+        ny = int(max(np.ceil(num_buckets / nx), 1))
+        bucket_size = (width / nx, height / ny)
+        index = cls(x, y, tris, origin, bucket_size, (nx, ny), np.zeros(nx * ny + 1, dtype=np.int64), [])
+
+        # Expand each triangle into the buckets overlapped by its bounding box.
+        tri_x = x[tris]
+        tri_y = y[tris]
+        bx0, by0 = index._bucket(tri_x.min(axis=1), tri_y.min(axis=1))
+        bx1, by1 = index._bucket(tri_x.max(axis=1), tri_y.max(axis=1))
+        span_x = bx1 - bx0 + 1
+        counts = span_x * (by1 - by0 + 1)
+        tri_rep = np.repeat(np.arange(len(tris), dtype=np.int32), counts)
+        local = np.arange(len(tri_rep)) - np.repeat(np.cumsum(counts) - counts, counts)
+        buckets = (by0[tri_rep] + local // span_x[tri_rep]) * nx + bx0[tri_rep] + local % span_x[tri_rep]
+        order = np.argsort(buckets, kind='stable')
+        index.bucket_tris = tri_rep[order]
+        index.bucket_start[1:] = np.cumsum(np.bincount(buckets, minlength=nx * ny))
+        return index
+
+    @classmethod
+    def load(cls, path):
+        """Load an index saved by save().
+
+        Args:
+            path (str): Path to the .npz file
+
+        Returns:
+            :obj:`BucketMeshIndex`: The index
+        """
+        with np.load(path) as npz:
+            return cls(npz['x'], npz['y'], npz['tris'], npz['origin'], npz['bucket_size'], npz['shape'],
+                       npz['bucket_start'], npz['bucket_tris'])
+
+    def save(self, path):
+        """Save the index to a .npz file.
+
+        Args:
+            path (str): Path to the .npz file. Written to a temporary file first so readers never see a partial file.
+        """
+        tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(tmp_path, x=self.x, y=self.y, tris=self.tris, origin=self.origin, bucket_size=self.bucket_size,
+                 shape=self.shape, bucket_start=self.bucket_start, bucket_tris=self.bucket_tris)
+        os.replace(tmp_path, path)
+
+    def locate(self, xs, ys):
+        """Find the triangles containing points.
+
+        Args:
+            xs (:obj:`numpy.ndarray`): x coordinates (longitude) of the points
+            ys (:obj:`numpy.ndarray`): y coordinates (latitude) of the points
+
+        Returns:
+            :obj:`numpy.ndarray`: Index of the triangle containing each point, -1 if the point is outside the mesh
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        tri_ids = np.full(len(xs), -1, dtype=int)
+        for start in range(0, len(xs), LOCATE_CHUNK_SIZE):
+            chunk = slice(start, start + LOCATE_CHUNK_SIZE)
+            tri_ids[chunk] = self._locate_chunk(xs[chunk], ys[chunk])
+        return tri_ids
+
+    def _bucket(self, xs, ys):
+        """Get the bucket grid column and row of coordinates, clamped to the grid.
+
+        Args:
+            xs (:obj:`numpy.ndarray`): x coordinates
+            ys (:obj:`numpy.ndarray`): y coordinates
+
+        Returns:
+            tuple(numpy.ndarray, numpy.ndarray): The bucket columns and rows
+        """
+        bx = np.clip(np.floor((xs - self.origin[0]) / self.bucket_size[0]), 0, self.shape[0] - 1).astype(np.int64)
+        by = np.clip(np.floor((ys - self.origin[1]) / self.bucket_size[1]), 0, self.shape[1] - 1).astype(np.int64)
+        return bx, by
+
+    def _locate_chunk(self, xs, ys):
+        """Find the triangles containing a chunk of points.
+
+        Args:
+            xs (:obj:`numpy.ndarray`): x coordinates of the points
+            ys (:obj:`numpy.ndarray`): y coordinates of the points
+
+        Returns:
+            :obj:`numpy.ndarray`: Index of the triangle containing each point, -1 if the point is outside the mesh
+        """
+        bx, by = self._bucket(xs, ys)
+        buckets = by * self.shape[0] + bx
+        first = self.bucket_start[buckets]
+        counts = self.bucket_start[buckets + 1] - first
+        # Test every point against every candidate triangle in its bucket.
+        pt_rep = np.repeat(np.arange(len(xs)), counts)
+        candidates = self.bucket_tris[np.repeat(first - (np.cumsum(counts) - counts), counts) + np.arange(len(pt_rep))]
+        nodes = self.tris[candidates]
+        x1, x2, x3 = self.x[nodes].T
+        y1, y2, y3 = self.y[nodes].T
+        x = xs[pt_rep]
+        y = ys[pt_rep]
+        det = (y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            l1 = ((y2 - y3) * (x - x3) + (x3 - x2) * (y - y3)) / det
+            l2 = ((y3 - y1) * (x - x3) + (x1 - x3) * (y - y3)) / det
+        l3 = 1.0 - l1 - l2
+        inside = (l1 >= -CONTAINS_TOLERANCE) & (l2 >= -CONTAINS_TOLERANCE) & (l3 >= -CONTAINS_TOLERANCE)
+        # Take the first containing triangle of each point (lowest index if the point is on a shared edge).
+        hits = np.flatnonzero(inside)
+        pts, first_hits = np.unique(pt_rep[hits], return_index=True)
+        tri_ids = np.full(len(xs), -1, dtype=int)
+        tri_ids[pts] = candidates[hits[first_hits]]
+        return tri_ids
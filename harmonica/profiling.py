@@ -0,0 +1,160 @@
+"""Named timers and counters around the stages of the extraction and reconstruction pipeline.
+
+The stages are only timed while a Profile is active. When none is, timer() returns a shared do nothing context
+manager and count() returns immediately, so the instrumentation costs one list check per stage.
+
+For example, to report the stages of a reconstruction:
+
+    with Profile() as profile:
+        Tide(model='tpxo9').reconstruct_tides(locs, times)
+    print(profile.report())
+"""
+
+# 1. Standard Python modules
+from contextlib import contextmanager, nullcontext
+import threading
+import time
+
+# 2. Third party modules
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+
+
+_active = []  # The active profiles, every stage is reported to all of them
+_lock = threading.Lock()
+_DISABLED = nullcontext()
+
+
+class Profile(object):
+    """Collects the time spent in each stage and the counters while it is active.
+
+    Profiles are global to the process, stages run by any thread while a profile is active are collected by it.
+
+    Attributes:
+        timings (:obj:`dict` of :obj:`list`): Total seconds and number of calls of each stage, keyed by stage name
+        counters (:obj:`dict` of :obj:`int`): The counters keyed by name
+        callback (callable): Called with the name and seconds of each stage as it ends, and with the name and amount
+            of each count. The seconds are None for counts.
+
+    """
+    def __init__(self, callback=None):
+        """Constructor.
+
+        Args:
+            callback (callable, optional): Called with (name, seconds, amount) after each stage or count, e.g. to log
+                them. seconds is None for counts and amount is None for stages.
+        """
+        self.timings = {}
+        self.counters = {}
+        self.callback = callback
+
+    def __enter__(self):
+        """Start collecting.
+
+        Returns:
+            Profile: This profile
+        """
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop collecting."""
+        self.stop()
+
+    def start(self):
+        """Start collecting the stages and counters."""
+        with _lock:
+            if self not in _active:
+                _active.append(self)
+
+    def stop(self):
+        """Stop collecting the stages and counters, what was collected is kept."""
+        with _lock:
+            if self in _active:
+                _active.remove(self)
+
+    def add_time(self, name, seconds):
+        """Add the time of a call of a stage.
+
+        Args:
+            name (str): Name of the stage
+            seconds (float): The time spent in the stage
+        """
+        timing = self.timings.setdefault(name, [0.0, 0])
+        timing[0] += seconds
+        timing[1] += 1
+        if self.callback is not None:
+            self.callback(name, seconds, None)
+
+    def add_count(self, name, amount):
+        """Add to a counter.
+
+        Args:
+            name (str): Name of the counter
+            amount (int): The amount to add
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+        if self.callback is not None:
+            self.callback(name, None, amount)
+
+    def report(self):
+        """Format the collected timings and counters as a table.
+
+        Returns:
+            str: The report, stages in the order they were first run
+        """
+        width = max([len(name) for name in list(self.timings) + list(self.counters)] + [5])
+        lines = [f'{"stage":<{width}} {"seconds":>10} {"calls":>8}']
+        for name, (seconds, calls) in self.timings.items():
+            lines.append(f'{name:<{width}} {seconds:10.4f} {calls:8d}')
+        if self.counters:
+            lines.append('')
+            lines.append(f'{"counter":<{width}} {"count":>10}')
+            for name, amount in self.counters.items():
+                lines.append(f'{name:<{width}} {amount:10d}')
+        return '\n'.join(lines)
+
+
+@contextmanager
+def _timed(name):
+    """Time a stage and report it to the active profiles.
+
+    Args:
+        name (str): Name of the stage
+
+    Yields:
+        None
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        for profile in list(_active):
+            profile.add_time(name, seconds)
+
+
+def timer(name):
+    """Get a context manager that times a stage of the pipeline if a profile is active.
+
+    Args:
+        name (str): Name of the stage, e.g. 'tpxo.locate'
+
+    Returns:
+        A context manager, a shared do nothing one if no profile is active
+    """
+    return _timed(name) if _active else _DISABLED
+
+
+def count(name, amount=1):
+    """Add to a counter if a profile is active.
+
+    Args:
+        name (str): Name of the counter, e.g. 'points'
+        amount (int, optional): The amount to add
+    """
+    if _active:
+        for profile in list(_active):
+            profile.add_count(name, int(amount))
@@ -0,0 +1,130 @@
+"""Vectorized reconstruction of tide water levels from harmonic constituents."""
+
+# 1. Standard Python modules
+
+# 2. Third party modules
+import numpy as np
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from .astronomy import angle, equilibrium_v0, nodal_terms, to_datetime64
+from .constituent_registry import ALIASES, ids, NAMES, SPEED
+
+
+TIME_CHUNK_SIZE = 65536  # Largest number of times evaluated at once, bounds memory to about chunk x constituents
+TIME_CHUNK_SPAN = np.timedelta64(31, 'D')  # Longest time span sharing one set of nodal factors and arguments
+
+CON_ALIASES = ALIASES  # Alternate constituent names used by the models, see constituent_registry.ALIASES
+
+
+def time_chunks(times):
+    """Split times into contiguous chunks of at most TIME_CHUNK_SIZE times within a TIME_CHUNK_SPAN period.
+
+    Args:
+        times (:obj:`numpy.ndarray`): The datetime64 times
+
+    Returns:
+        :obj:`list` of :obj:`slice`: The chunks of the times array
+    """
+    if len(times) == 0:
+        return []
+    periods = (times - times.min()) // TIME_CHUNK_SPAN
+    bounds = np.concatenate([[0], np.flatnonzero(np.diff(periods)) + 1, [len(times)]])
+    return [
+        slice(start, min(start + TIME_CHUNK_SIZE, stop))
+        for begin, stop in zip(bounds[:-1], bounds[1:])
+        for start in range(begin, stop, TIME_CHUNK_SIZE)
+    ]
+
+
+def astronomical_arguments(names, starts, middles):
+    """Get the speeds, nodal factors, and equilibrium arguments of constituents for time series.
+
+    Args:
+        names (:obj:`list`): Names or constituent registry ids of the constituents, must be in the registry
+        starts (:obj:`numpy.ndarray`): Starts of the series, on the hour. The equilibrium arguments are at these times.
+        middles (:obj:`numpy.ndarray`): Middles of the series, the nodal factors and corrections are at these times.
+
+    Returns:
+        tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray): The speeds (degrees/hour) of the constituents, and the
+            nodal factors and equilibrium arguments V+u (degrees) of the constituents for each series (series x
+            constituents)
+    """
+    speeds = SPEED[ids(names)]
+    factors, corrections = nodal_terms(names, middles)
+    # The tide_fac port has no nodal factor for M1 and L2 (they are 0), leave those constituents unmodulated.
+    factors[factors == 0.0] = 1.0
+    return speeds, factors, angle(equilibrium_v0(names, starts) + corrections)
+
+
+def astronomical_terms(names, times):
+    """Compute the astronomical terms of constituents at a series of times, one chunk of times at a time.
+
+    The terms are f * cos(speed * t + (V + u)) and f * sin(speed * t + (V + u)). Times are processed in chunks (see
+    time_chunks()) with t measured in hours from the first hour of the chunk. The nodal factors and corrections are
+    evaluated at the middle of each chunk. The astronomy of all the chunks is computed up front in one call.
+
+    Args:
+        names (:obj:`list`): Names or constituent registry ids of the constituents, must be in the registry
+        times (:obj:`numpy.ndarray`): The datetime64 times
+
+    Yields:
+        tuple(slice, numpy.ndarray, numpy.ndarray): The chunk of the times array and the cosine and sine terms of
+            the chunk (chunk times x constituents)
+    """
+    chunks = time_chunks(times)
+    starts = np.array([times[chunk].min() for chunk in chunks], dtype='datetime64[h]')
+    middles = starts + (np.array([times[chunk].max() for chunk in chunks], dtype=times.dtype) - starts) / 2
+    speeds, factors, eq_args = astronomical_arguments(names, starts, middles)
+    for chunk, start, nodal_factor, eq_arg in zip(chunks, starts, factors, eq_args):
+        hours = (times[chunk] - start) / np.timedelta64(1, 'h')
+        args = np.radians(hours[:, np.newaxis] * speeds + eq_arg)
+        yield chunk, nodal_factor * np.cos(args), nodal_factor * np.sin(args)
+
+
+def supported_names(names):
+    """Get the registry names of constituents, mapping alternate names and dropping unsupported constituents.
+
+    Args:
+        names (:obj:`list` of :obj:`str`): Names of the constituents. Alternate names in CON_ALIASES are accepted.
+
+    Returns:
+        tuple(list, list): The registry names of the supported constituents and their indices in names
+    """
+    con_ids = ids(names)
+    keep = np.flatnonzero(con_ids >= 0).tolist()
+    return [NAMES[con_id] for con_id in con_ids[keep]], keep
+
+
+def reconstruct(names, amplitude, phase, times, offset=0.0):
+    """Reconstruct the water levels of one or more locations at a series of times.
+
+    Evaluates the sum of f * A * cos(speed * t + (V + u) - g) over the constituents, see astronomical_terms(). The
+    sum is computed for all the locations at once as two matrix products of the (times x constituents) astronomical
+    terms with the (constituents x locations) harmonic constants.
+
+    Args:
+        names (:obj:`list` of :obj:`str`): Names of the constituents. Alternate names in CON_ALIASES are accepted.
+            Constituents without astronomical arguments (not in the constituent registry) are ignored.
+        amplitude (:obj:`numpy.ndarray`): Constituent amplitudes (locations x constituents). Locations with a NaN
+            amplitude or phase reconstruct as NaN.
+        phase (:obj:`numpy.ndarray`): Constituent phase lags in degrees (locations x constituents)
+        times (:obj:`numpy.ndarray`): The times, see to_datetime64()
+        offset (float, optional): Constant water level added to the tide
+
+    Returns:
+        :obj:`numpy.ndarray`: The water levels (times x locations)
+    """
+    num_names = len(names)
+    names, keep = supported_names(names)
+    amplitude = np.asarray(amplitude, dtype=float).reshape(-1, num_names)[:, keep]
+    phase = np.radians(np.asarray(phase, dtype=float).reshape(-1, num_names)[:, keep])
+    # cos(arg - g) = cos(arg) * cos(g) + sin(arg) * sin(g)
+    cos_g = (amplitude * np.cos(phase)).T
+    sin_g = (amplitude * np.sin(phase)).T
+    times = to_datetime64(times)
+    water_level = np.empty((len(times), amplitude.shape[0]))
+    for chunk, cos_terms, sin_terms in astronomical_terms(names, times):
+        water_level[chunk] = cos_terms @ cos_g + sin_terms @ sin_g
+    return water_level + offset
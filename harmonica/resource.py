@@ -2,21 +2,23 @@
 
 # 1. Standard Python modules
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+import functools
 import os
-import shutil
-import urllib.request
-from zipfile import ZipFile
+import threading
 
 # 2. Third party modules
-import xarray as xr
 
 # 3. Aquaveo modules
 
 # 4. Local modules
 from harmonica import config
+from .download import extract_tar, extract_zip, fetch, run_downloads
+from .profiling import count, timer
 
 
 MAX_NUM_CONS = 37  # Maximum number of constituents in all available models
+STORE_DIR = 'optimized'  # Folder of the optimized stores in a model's data folder, see ResourceManager.optimize_model()
 
 
 class Resources(object):
@@ -31,6 +33,8 @@ class Resources(object):
     def resource_attributes(self):
         """Get the resource attributes of a model (e.g. web url, compression type).
 
+        An optional 'checksums' attribute maps the base names of the downloaded files to their SHA-256 hex digests.
+
         Returns:
             dict: Dictionary of model resource attributes
         """
@@ -370,6 +374,84 @@ class Adcirc2015Resources(Resources):
             return None
 
 
+class DatasetPool(object):
+    """Pool of open xarray Datasets keyed by file path, closing the least recently used when it gets too big."""
+    def __init__(self, max_open=None):
+        """Constructor.
+
+        Args:
+            max_open (:obj:`int`, optional): Maximum number of files to keep open. Defaults to
+                config['max_open_datasets']. The limit is exceeded only if a single acquire() needs more files.
+        """
+        self.max_open = max_open
+        self._datasets = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        """Returns the number of open files."""
+        return len(self._datasets)
+
+    def __contains__(self, path):
+        """Returns True if the file is open in the pool."""
+        return os.path.normpath(path) in self._datasets
+
+    def __enter__(self):
+        """Enter the context, returns the pool."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the context, closes all the open files."""
+        self.close()
+
+    def acquire(self, paths):
+        """Get open Datasets for files, opening the ones that are not already in the pool.
+
+        Args:
+            paths (list[str]): Paths to the NetCDF files
+
+        Returns:
+            list[Dataset]: The open Datasets, parallel with paths
+        """
+        keys = [os.path.normpath(path) for path in paths]
+        with self._lock:
+            datasets = []
+            for key in keys:
+                if key in self._datasets:
+                    self._datasets.move_to_end(key)
+                else:
+                    import xarray as xr  # Imported on first use, it is slow to import
+                    self._datasets[key] = xr.open_dataset(key)
+                    count('datasets.opened')
+                datasets.append(self._datasets[key])
+            self._evict(set(keys))
+        return datasets
+
+    def close(self, path=None):
+        """Close open files.
+
+        Args:
+            path (:obj:`str`, optional): Path of the file to close. Closes all the files if not provided.
+        """
+        with self._lock:
+            keys = list(self._datasets) if path is None else [os.path.normpath(path)]
+            for key in keys:
+                dset = self._datasets.pop(key, None)
+                if dset is not None:
+                    dset.close()
+
+    def _evict(self, keep):
+        """Close least recently used files until the pool is no larger than its maximum.
+
+        Args:
+            keep (set[str]): Paths that must stay open
+        """
+        max_open = self.max_open if self.max_open is not None else config['max_open_datasets']
+        for key in [key for key in self._datasets if key not in keep]:
+            if len(self._datasets) <= max_open:
+                break
+            self._datasets.pop(key).close()
+
+
 class ResourceManager(object):
     """Harmonica resource manager to retrieve and access tide models."""
 
@@ -385,24 +467,41 @@ class ResourceManager(object):
     ADCIRC_MODELS = {'adcirc2015'}
     DEFAULT_RESOURCE = 'tpxo9'
 
-    def __init__(self, model=DEFAULT_RESOURCE):
+    def __init__(self, model=DEFAULT_RESOURCE, pool=None):
         """Constructor.
 
         Args:
             model (str): Name of the model to use initially.  See the constants defined in ResourceManager for valid
                 values.
+            pool (:obj:`DatasetPool`, optional): Pool of open files to share with other managers. The manager creates
+                and owns its own pool if not provided.
         """
         if model not in self.RESOURCES:
             raise ValueError('Model not recognized.')
         self.model = model
         self.model_atts = self.RESOURCES[self.model]
         self.datasets = []
+        self.pool = pool if pool is not None else DatasetPool()
+        self._owns_pool = pool is None
 
     def __del__(self):
         """Deleter - closes Dataset file handles."""
-        for d in self.datasets:
-            for dset in d:
-                dset.close()
+        if hasattr(self, 'pool'):
+            self.close()
+
+    def __enter__(self):
+        """Enter the context, returns the resource manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the context, closes Dataset file handles."""
+        self.close()
+
+    def close(self):
+        """Close the Dataset file handles of this manager's pool. A pool shared with other managers is left open."""
+        self.datasets = []
+        if self._owns_pool:
+            self.pool.close()
 
     @staticmethod
     def data_dir_exists(model):
@@ -440,10 +539,22 @@ class ResourceManager(object):
         """Returns the units multiplier for the current model."""
         return self.model_atts.dataset_attributes()['units_multiplier']
 
-    def download(self, resource, destination_dir):
-        """Download a specified model resource."""
-        if not os.path.isdir(destination_dir):
-            os.makedirs(destination_dir)
+    def download(self, resource, destination_dir, progress=None):
+        """Download a specified model resource.
+
+        The file is streamed to disk in chunks and resumed if a previous download of it was interrupted, see
+        harmonica.download. Archives are extracted a member at a time and deleted.
+
+        Args:
+            resource (str): Name of the resource, see Resources.constituent_resource()
+            destination_dir (str): Folder to download the resource to
+            progress (callable, optional): Called with the resource, the bytes downloaded so far, and the total bytes
+                (None if unknown) after each chunk
+
+        Returns:
+            str: Path of the resource
+        """
+        os.makedirs(destination_dir, exist_ok=True)  # Downloads of the model's resources may run at the same time
 
         rsrc_atts = self.model_atts.resource_attributes()
         url = rsrc_atts['url']
@@ -457,52 +568,68 @@ class ResourceManager(object):
         print('Downloading resource: {}'.format(url))
 
         path = os.path.join(destination_dir, resource)
-        with urllib.request.urlopen(url) as response:
-            if rsrc_atts['archive'] is not None:
-                if rsrc_atts['archive'] == 'gz':
-                    import tarfile
-                    try:
-                        tar = tarfile.open(mode='r:{}'.format(rsrc_atts['archive']), fileobj=response)
-                    except IOError as e:
-                        print(str(e))
-                    else:
-                        rsrcs = set(
-                            self.model_atts.constituent_resource(con) for con in
-                            self.model_atts.available_constituents()
-                        )
-                        tar.extractall(path=destination_dir, members=[m for m in tar.getmembers() if m.name in rsrcs])
-                        tar.close()
-                elif rsrc_atts['archive'] == 'zip':  # Unzip .zip files
-                    zip_file = os.path.join(destination_dir, os.path.basename(resource) + '.zip')
-                    with open(zip_file, 'wb') as out_file:
-                        shutil.copyfileobj(response, out_file)
-                    # Unzip the files
-                    print("Unzipping files to: {}".format(destination_dir))
-                    with ZipFile(zip_file, 'r') as unzipper:
-                        # Extract all the files in the archive
-                        unzipper.extractall(path=destination_dir)
-                    print("Deleting zip file: {}".format(zip_file))
-                    os.remove(zip_file)  # delete the zip file
-            else:
-                with open(path, 'wb') as f:
-                    f.write(response.read())
-
+        sha256 = rsrc_atts.get('checksums', {}).get(os.path.basename(url))
+        progress = functools.partial(progress, resource) if progress is not None else None
+        if rsrc_atts['archive'] is None:
+            return fetch(url, path, sha256, progress)
+
+        archive = os.path.join(destination_dir, '{}.{}'.format(os.path.basename(resource), rsrc_atts['archive']))
+        fetch(url, archive, sha256, progress)
+        print("Extracting files to: {}".format(destination_dir))
+        if rsrc_atts['archive'] == 'gz':
+            rsrcs = set(
+                self.model_atts.constituent_resource(con) for con in self.model_atts.available_constituents()
+            )
+            extract_tar(archive, destination_dir, rsrcs)
+        elif rsrc_atts['archive'] == 'zip':  # Unzip .zip files
+            extract_zip(archive, destination_dir)
+        print("Deleting archive: {}".format(archive))
+        os.remove(archive)
         return path
 
-    def download_model(self, resource_dir=None):
-        """Download all of the model's resources for later use."""
+    def download_model(self, resource_dir=None, progress=None, jobs=None):
+        """Download all of the model's resources for later use.
+
+        Args:
+            resource_dir (:obj:`str`, optional): Folder to download the resources to. Defaults to the model's folder
+                in config['data_dir'].
+            progress (callable, optional): Called with the resource, the bytes downloaded so far, and the total bytes
+                (None if unknown) after each chunk, see download_resources()
+            jobs (:obj:`int`, optional): Maximum number of concurrent downloads. Defaults to config['download_jobs'].
+
+        Returns:
+            str: The folder of the resources
+        """
         resources = set(
             self.model_atts.constituent_resource(con) for con in
             self.model_atts.available_constituents()
         )
         if not resource_dir:
             resource_dir = os.path.join(config['data_dir'], self.model)
-        for r in resources:
-            path = os.path.join(resource_dir, r)
-            if not os.path.exists(path):
-                self.download(r, resource_dir)
+        missing = [r for r in sorted(resources) if not os.path.exists(os.path.join(resource_dir, r))]
+        self.download_resources(missing, resource_dir, progress, jobs)
         return resource_dir
 
+    def download_resources(self, resources, destination_dir, progress=None, jobs=None):
+        """Download resources concurrently, see harmonica.download.run_downloads().
+
+        Args:
+            resources (list[str]): Names of the resources to download
+            destination_dir (str): Folder to download the resources to
+            progress (callable, optional): Called with the resource, the bytes downloaded so far, and the total bytes
+                (None if unknown) after each chunk, from the downloading threads. Pass a
+                harmonica.download.DownloadProgress to aggregate them.
+            jobs (:obj:`int`, optional): Maximum number of concurrent downloads. Defaults to config['download_jobs'].
+
+        Raises:
+            DownloadError: The downloads of one or more resources failed, after all of them were attempted
+        """
+        if resources and self.model_atts.resource_attributes()['url'] is None:
+            raise ValueError("Automatic fetching of resources is not available for the {} model.".format(self.model))
+        if resources and self.model_atts.resource_attributes()['archive'] is not None:
+            resources = sorted(resources)[:1]  # The archive has all of the model's resources
+        run_downloads(lambda r: self.download(r, destination_dir, progress), resources, jobs)
+
     def remove_model(self):
         """Remove all of the model's resources."""
         resource_dir = os.path.join(config['data_dir'], self.model)
@@ -511,22 +638,70 @@ class ResourceManager(object):
 
             shutil.rmtree(resource_dir, ignore_errors=True)
 
-    def get_datasets(self, constituents, filenames=None):
-        """Returns a list of xarray datasets.
+    def optimize_model(self):
+        """Rewrite the model's resources into query optimized stores, downloading them first if needed.
+
+        Each group of compatible constituents is written to one store, see harmonica.store. get_datasets() reads the
+        stores instead of the resources once they exist, unless config['optimized_store'] is disabled. Optimize the
+        model again after replacing its resources.
+
+        Returns:
+            str: The folder of the stores
+        """
+        from .store import write_store  # Imported on first use, it imports numpy
+        for group_idx, group in enumerate(self.model_atts.constituent_groups()):
+            paths = self.resource_paths(sorted(group))[0]
+            path = self.store_path(group_idx, config['data_dir'])
+            self.pool.close(path)  # The store is replaced
+            write_store(self.model, self.model_atts, self.pool.acquire(paths), paths, path)
+        return os.path.dirname(path)
+
+    def store_path(self, group_idx, data_dir):
+        """Get the path of the optimized store of a constituent group.
 
         Args:
-            constituents (list[str]): List of the constiuent names to retrieve datasets for
-            filenames (Optional[list[list[str]]]): Paths to the NetCDF files, parallel with return value if provided.
-                Only needed by the FES2014 model currently.
+            group_idx (int): Index of the group in constituent_groups()
+            data_dir (str): The data folder, e.g. config['data_dir']
 
         Returns:
-            list[list[Dataset]]: The xarray Datasets for the requested constituents
+            str: Path of the store file
+        """
+        return os.path.join(data_dir, self.model, STORE_DIR, f'group{group_idx}.nc')
+
+    def store_paths(self, constituents):
+        """Get the paths of the optimized stores of constituents.
+
+        Args:
+            constituents (list[str]): List of the constituent names
+
+        Returns:
+            list[list[str]]: The store of each group with requested constituents, None if any of them is missing
+        """
+        group_paths = []
+        for group_idx, const_group in enumerate(self.model_atts.constituent_groups()):
+            if not set(constituents) & set(const_group):
+                continue
+            data_dirs = [data_dir for data_dir in (config['pre_existing_data_dir'], config['data_dir']) if data_dir]
+            paths = [self.store_path(group_idx, data_dir) for data_dir in data_dirs]
+            paths = [path for path in paths if os.path.exists(path)]
+            if not paths:
+                return None
+            group_paths.append(paths[:1])
+        return group_paths
+
+    def resource_paths(self, constituents):
+        """Get the paths of the resources of constituents, downloading the missing ones.
+
+        Args:
+            constituents (list[str]): List of the constituent names
+
+        Returns:
+            list[list[str]]: The resources of each group with requested constituents
         """
-        available = self.available_constituents()
-        if any(const not in available for const in constituents):
-            raise ValueError('Constituent not recognized.')
         # handle compatible files together
-        self.datasets = []
+        group_paths = []
+        missing_rsrcs = set()
+        resource_dir = os.path.join(config['data_dir'], self.model)
         for const_group in self.model_atts.constituent_groups():
             rsrcs = set(self.model_atts.constituent_resource(const) for const in set(constituents) & set(const_group))
 
@@ -538,23 +713,46 @@ class ResourceManager(object):
                     paths.add(path) if os.path.exists(path) else missing.add(r)
                 rsrcs = missing
                 if not rsrcs and paths:
-                    paths_list = list(paths)  # If the caller wants filenames, give them as parallel list with return.
-                    self.datasets.append([xr.open_dataset(path) for path in paths_list])
-                    if filenames is not None:
-                        filenames.append(paths_list)
+                    group_paths.append(list(paths))
                     continue
 
-            resource_dir = os.path.join(config['data_dir'], self.model)
             for r in rsrcs:
                 path = os.path.join(resource_dir, r)
                 if not os.path.exists(path):
-                    self.download(r, resource_dir)
+                    missing_rsrcs.add(r)
                 paths.add(path)
 
             if paths:
-                paths_list = list(paths)
-                self.datasets.append([xr.open_dataset(path) for path in paths_list])
-                if filenames is not None:  # If the caller wants the filenames, give them as parallel list with return.
-                    filenames.append(paths_list)
+                group_paths.append(list(paths))
+
+        if missing_rsrcs:  # download the missing files of all the groups at once
+            with timer('resources.download'):
+                self.download_resources(sorted(missing_rsrcs), resource_dir)
+        return group_paths
+
+    def get_datasets(self, constituents, filenames=None):
+        """Returns a list of xarray datasets.
 
+        Args:
+            constituents (list[str]): List of the constiuent names to retrieve datasets for
+            filenames (Optional[list[list[str]]]): Paths to the NetCDF files, parallel with return value if provided.
+                Only needed by the FES2014 model currently.
+
+        Returns:
+            list[list[Dataset]]: The xarray Datasets for the requested constituents. The optimized stores of the
+                model if it was optimized, see optimize_model() and harmonica.store.is_store().
+        """
+        available = self.available_constituents()
+        if any(const not in available for const in constituents):
+            raise ValueError('Constituent not recognized.')
+        group_paths = self.store_paths(constituents) if config['optimized_store'] else None
+        if group_paths is None:
+            group_paths = self.resource_paths(constituents)
+
+        # reuse the files that are already open, acquire them all at once so none of them get evicted
+        with timer('resources.get_datasets'):
+            datasets = iter(self.pool.acquire([path for paths in group_paths for path in paths]))
+        self.datasets = [[next(datasets) for _ in paths] for paths in group_paths]
+        if filenames is not None:  # If the caller wants the filenames, give them as parallel list with return.
+            filenames.extend(group_paths)
         return self.datasets
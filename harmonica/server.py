@@ -0,0 +1,347 @@
+"""HTTP/JSON server that keeps the tidal models warm between requests."""
+
+# 1. Standard Python modules
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+# 2. Third party modules
+import numpy as np
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from .astronomy import equilibrium_arguments, nodal_terms, to_datetime64
+from .constituent_registry import ids, NAMES
+from .harmonica import Tide
+from .resource import ResourceManager
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_REQUEST_SIZE = 16 * 1024 * 1024  # Largest request body accepted, in bytes
+WARM_POINT = (0.0, 0.0)  # Location extracted when warming a model, opens its files and builds its index
+
+
+def _to_json(values):
+    """Convert an array to nested lists for JSON, NaN is null.
+
+    Args:
+        values (:obj:`numpy.ndarray`): The float values
+
+    Returns:
+        list: The values as nested lists
+    """
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isfinite(values), values, None).tolist()
+
+
+def _points(request):
+    """Get the locations of a request.
+
+    Args:
+        request (dict): The request, with a list of [lat, lon] pairs in 'points'
+
+    Returns:
+        list[tuple(float, float)]: The locations
+    """
+    points = request.get('points')
+    if not isinstance(points, list) or not points:
+        raise ValueError('Specify the locations as a list of [lat, lon] pairs in "points".')
+    try:
+        return [(float(lat), float(lon)) for lat, lon in points]
+    except (TypeError, ValueError):
+        raise ValueError('Specify the locations as a list of [lat, lon] pairs in "points".')
+
+
+def _times(request):
+    """Get the times of a request.
+
+    Args:
+        request (dict): The request, with a list of ISO 8601 times in 'times' or a series of 'length' days (default
+            1) every 'interval' seconds (default 3600) from 'start'
+
+    Returns:
+        :obj:`numpy.ndarray`: The datetime64 times
+    """
+    if 'times' in request:
+        return to_datetime64(request['times'])
+    if 'start' not in request:
+        raise ValueError('Specify "times" or a "start" time.')
+    start = to_datetime64([request['start']])[0]
+    interval = np.timedelta64(int(request.get('interval', 3600)), 's')
+    length = np.timedelta64(int(float(request.get('length', 1.0)) * 86400), 's')
+    if interval <= np.timedelta64(0, 's'):
+        raise ValueError('The "interval" must be positive.')
+    return np.arange(start, start + length, interval)
+
+
+class TideService(object):
+    """The tidal models of the server, kept open between requests.
+
+    Each model has its own extractor that keeps its files, indexes, and caches open. Requests for the same model are
+    serialized, requests for different models run concurrently.
+
+    Attributes:
+        models (:obj:`list` of :obj:`str`): The models loaded when the service is warmed
+    """
+    def __init__(self, models=None):
+        """Constructor.
+
+        Args:
+            models (:obj:`list` of :obj:`str`, optional): Models to load when warmed. Defaults to the installed models,
+                see ResourceManager.available_models(). Other models are loaded on their first request.
+        """
+        if models is None:
+            models = [model for model, installed in ResourceManager.available_models().items() if installed]
+        self.models = [self._check_model(model) for model in models]
+        self._tides = {}
+        self._locks = {model: threading.Lock() for model in ResourceManager.RESOURCES}
+
+    @staticmethod
+    def _check_model(model):
+        """Check the name of a model.
+
+        Args:
+            model (str): Name of the model
+
+        Returns:
+            str: The name of the model in lower case
+        """
+        model = str(model).lower()
+        if model not in ResourceManager.RESOURCES:
+            raise ValueError(f'Model not supported: "{model}". Must be one of: {", ".join(ResourceManager.RESOURCES)}.')
+        return model
+
+    def _tide(self, model):
+        """Get the tide of a model, the caller must hold the lock of the model.
+
+        Args:
+            model (str): Name of the model
+
+        Returns:
+            :obj:`harmonica.harmonica.Tide`: The tide of the model
+        """
+        if model not in self._tides:
+            self._tides[model] = Tide(model=model)
+        return self._tides[model]
+
+    def warm(self):
+        """Load the models, opening their files and building their indexes.
+
+        Returns:
+            dict: Error messages of the models that could not be loaded, keyed by model. Those models are dropped
+                from models and are loaded again on their next request.
+        """
+        errors = {}
+        for model in self.models:
+            with self._locks[model]:
+                try:
+                    self._tide(model).constituents.get_components([WARM_POINT])
+                except (ImportError, OSError, RuntimeError, ValueError) as e:
+                    tide = self._tides.pop(model, None)  # None if the Tide could not be created
+                    if tide is not None:
+                        tide.constituents.close()
+                    errors[model] = str(e).strip()
+        self.models = [model for model in self.models if model not in errors]
+        return errors
+
+    def close(self):
+        """Close the files of the models."""
+        for model, tide in list(self._tides.items()):
+            with self._locks[model]:
+                tide.constituents.close()
+        self._tides = {}
+
+    def status(self, request=None):
+        """Get the status of the service.
+
+        Args:
+            request (dict, optional): Ignored
+
+        Returns:
+            dict: The installed models and the models that are loaded
+        """
+        return {
+            'models': ResourceManager.available_models(),
+            'loaded': sorted(self._tides),
+        }
+
+    def constituents(self, request):
+        """Get the constituents of a model at a batch of points.
+
+        Args:
+            request (dict): 'points': list of [lat, lon] pairs; 'model' (optional): name of the model, defaults to
+                ResourceManager.DEFAULT_RESOURCE; 'cons' (optional): names of the constituents, defaults to all;
+                'positive_phase' (optional): true for phases in [0 360] instead of [-180 180]
+
+        Returns:
+            dict: The constituent names and their amplitude (meters), phase (degrees), and speed (degrees/hour) as
+                (points x constituents) lists. Points outside of the model domain are null.
+        """
+        model = self._check_model(request.get('model', ResourceManager.DEFAULT_RESOURCE))
+        locs = _points(request)
+        with self._locks[model]:
+            results = self._tide(model).constituents.get_components(locs, request.get('cons') or None,
+                                                                    bool(request.get('positive_phase', False)))
+        if len(results) != len(locs):
+            raise ValueError('Invalid latitude/longitude location.')
+        return {
+            'model': model,
+            'constituents': list(results.names),
+            'amplitude': _to_json(results.amplitude),
+            'phase': _to_json(results.phase),
+            'speed': _to_json(results.speed),
+        }
+
+    def reconstruct(self, request):
+        """Reconstruct the tides of a model at a batch of points.
+
+        Args:
+            request (dict): 'points', 'model', and 'cons' like constituents(); the times, see _times(); 'offset'
+                (optional): constant water level added to the tide
+
+        Returns:
+            dict: The ISO 8601 times and the water levels (meters) as a (times x points) list
+        """
+        model = self._check_model(request.get('model', ResourceManager.DEFAULT_RESOURCE))
+        locs = _points(request)
+        times = _times(request)
+        with self._locks[model]:
+            water_level = self._tide(model).reconstruct_tides(locs, times, cons=request.get('cons') or None,
+                                                              offset=request.get('offset'))
+        return {
+            'model': model,
+            'times': np.datetime_as_string(times, unit='s').tolist(),
+            'water_level': _to_json(water_level.values),
+        }
+
+    def nodal_factors(self, request):
+        """Get the nodal factors and equilibrium arguments of constituents.
+
+        Args:
+            request (dict): The times, see _times(); 'cons' (optional): names of the constituents, defaults to all
+                the constituents with astronomical arguments; 'middles' (optional): ISO 8601 times parallel with the
+                times that are the middles of the series, defaults to the times
+
+        Returns:
+            dict: The constituent names, the ISO 8601 times, and the nodal factors and equilibrium arguments V0+u
+                (degrees) as (times x constituents) lists. Unknown constituents are null.
+        """
+        names = [str(name).upper() for name in request.get('cons') or NAMES]
+        times = _times(request)
+        middles = to_datetime64(request['middles']) if 'middles' in request else times
+        if len(middles) != len(times):
+            raise ValueError('The "middles" must be parallel with the times.')
+        con_ids = ids(names)
+        return {
+            'constituents': names,
+            'times': np.datetime_as_string(times, unit='s').tolist(),
+            'factor': _to_json(nodal_terms(con_ids, middles)[0]),
+            'equilibrium_argument': _to_json(equilibrium_arguments(con_ids, times, middles)),
+        }
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Handles the requests of a TideServer.
+
+    GET / returns the status of the service. POST /constituents, /reconstruct, and /nodal_factors take a JSON object,
+    see the methods of TideService. Errors are returned as a JSON object with an 'error' message.
+    """
+    ROUTES = {
+        '/constituents': 'constituents',
+        '/reconstruct': 'reconstruct',
+        '/nodal_factors': 'nodal_factors',
+    }
+
+    def _send(self, status, body):
+        """Send a JSON response.
+
+        Args:
+            status (int): The HTTP status code
+            body (dict): The response
+        """
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):  # noqa: N802
+        """Handle a status request."""
+        if self.path.split('?')[0] not in ('/', '/status'):
+            self._send(404, {'error': f'Not found: {self.path}'})
+            return
+        self._send(200, self.server.service.status())
+
+    def do_POST(self):  # noqa: N802
+        """Handle a constituents, reconstruct, or nodal factors request."""
+        route = self.ROUTES.get(self.path.split('?')[0])
+        if route is None:
+            self._send(404, {'error': f'Not found: {self.path}'})
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        if length > MAX_REQUEST_SIZE:
+            self._send(413, {'error': f'Request larger than {MAX_REQUEST_SIZE} bytes.'})
+            return
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(request, dict):
+                raise ValueError('The request must be a JSON object.')
+            response = getattr(self.server.service, route)(request)
+        except (KeyError, RuntimeError, TypeError, ValueError) as e:
+            self._send(400, {'error': str(e).strip()})
+            return
+        except OSError as e:  # The model files are missing, could not be downloaded, or could not be read
+            self._send(503, {'error': str(e).strip()})
+            return
+        except Exception as e:
+            self._send(500, {'error': f'{type(e).__name__}: {str(e).strip()}'})
+            return
+        self._send(200, response)
+
+    def log_message(self, format, *args):
+        """Log a request unless the server is quiet."""
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class TideServer(ThreadingHTTPServer):
+    """Threaded HTTP server of a TideService."""
+    daemon_threads = True
+
+    def __init__(self, service, host=DEFAULT_HOST, port=DEFAULT_PORT, quiet=False):
+        """Constructor.
+
+        Args:
+            service (:obj:`TideService`): The models to serve
+            host (str, optional): Address to listen on
+            port (int, optional): Port to listen on, 0 picks a free port
+            quiet (bool, optional): True to not log the requests
+        """
+        super().__init__((host, port), RequestHandler)
+        self.service = service
+        self.quiet = quiet
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, models=None, quiet=False):
+    """Warm the models and serve requests until interrupted.
+
+    Args:
+        host (str, optional): Address to listen on
+        port (int, optional): Port to listen on
+        models (:obj:`list` of :obj:`str`, optional): Models to load up front, defaults to the installed models
+        quiet (bool, optional): True to not log the requests
+    """
+    service = TideService(models)
+    for model, error in service.warm().items():
+        print(f'Could not load {model}: {error}')
+    with TideServer(service, host, port, quiet) as server:
+        print(f'Serving {", ".join(service.models) or "no models"} on http://{host}:{server.server_address[1]}/')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            service.close()
@@ -0,0 +1,218 @@
+"""Query optimized local copies of the tidal models, written by ResourceManager.optimize_model().
+
+The distributed model files are laid out for distribution: a file per constituent, amplitudes and phases in model
+specific units, or constituents stacked as the slowest varying dimension. A store holds the same values as real and
+imaginary components in meters (amplitude * cos(phase), amplitude * sin(phase)), as float32, compressed, and chunked
+in spatial tiles that each hold every constituent, so the values around a point are read and decompressed once for
+all the constituents.
+
+Gridded models are stored on their own grid with (con, lat, lon) variables. ADCIRC is stored with (con, node)
+variables and the mesh geometry of the model file.
+"""
+
+# 1. Standard Python modules
+import os
+
+# 2. Third party modules
+import numpy as np
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+
+
+STORE_ATTRIBUTE = 'harmonica_store'  # Global attribute of the store files, the version of the layout
+STORE_VERSION = 1
+STORE_TILE_SIZE = 64  # Size of the square grid tiles of the gridded models
+STORE_NODE_CHUNK = 65536  # Number of mesh nodes per chunk of the ADCIRC model
+STORE_COMPRESSION = {'zlib': True, 'complevel': 4, 'shuffle': True}
+
+
+def is_store(dset):
+    """Check if a dataset is a store written by write_store().
+
+    Args:
+        dset (:obj:`xarray.Dataset`): The open dataset
+
+    Returns:
+        bool: True if the dataset is a store
+    """
+    return STORE_ATTRIBUTE in dset.attrs
+
+
+def store_names(dset):
+    """Get the constituent names of a store.
+
+    Args:
+        dset (:obj:`xarray.Dataset`): The open store
+
+    Returns:
+        :obj:`list` of :obj:`str`: The upper case constituent names, parallel with the con dimension
+    """
+    return [str(name).upper() for name in dset.con.values]
+
+
+def write_store(model, resources, datasets, filenames, path):
+    """Write the store of a group of constituents of a model.
+
+    Args:
+        model (str): Name of the model
+        resources (:obj:`harmonica.resource.Resources`): The resources of the model
+        datasets (:obj:`list` of :obj:`xarray.Dataset`): The open model files of the group
+        filenames (:obj:`list` of :obj:`str`): Paths of the model files, parallel with datasets
+        path (str): Path of the store file. Written to a temporary file first so readers never see a partial file.
+    """
+    if model in ('tpxo8', 'tpxo9'):
+        grid_source = _tpxo_source(model, resources, datasets)
+    elif model in ('leprovost', 'fes2014'):
+        grid_source = _leprovost_source(model, resources, datasets, filenames)
+    else:  # The ADCIRC mesh
+        grid_source = None
+
+    import netCDF4
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with netCDF4.Dataset(tmp_path, 'w') as nc:
+            nc.setncattr(STORE_ATTRIBUTE, STORE_VERSION)
+            nc.setncattr('model', model)
+            if grid_source is not None:
+                _write_grid(nc, *grid_source)
+            else:
+                _write_mesh(nc, datasets[0], sorted(resources.available_constituents()))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_grid(nc, names, lon, lat, read_band):
+    """Write the variables of a gridded model, a band of STORE_TILE_SIZE latitudes at a time.
+
+    Args:
+        nc (:obj:`netCDF4.Dataset`): The store being written
+        names (:obj:`list` of :obj:`str`): The constituent names
+        lon (:obj:`numpy.ndarray`): Longitudes of the grid columns
+        lat (:obj:`numpy.ndarray`): Latitudes of the grid rows
+        read_band (callable): Called with a constituent index and a slice of latitudes, returns the real and imaginary
+            components in meters (latitudes x longitudes)
+    """
+    nc.createDimension('con', len(names))
+    nc.createDimension('lat', len(lat))
+    nc.createDimension('lon', len(lon))
+    nc.createVariable('con', str, ('con',))[:] = np.array(names, dtype=object)
+    nc.createVariable('lat', 'f8', ('lat',))[:] = lat
+    nc.createVariable('lon', 'f8', ('lon',))[:] = lon
+    chunks = (len(names), min(STORE_TILE_SIZE, len(lat)), min(STORE_TILE_SIZE, len(lon)))
+    variables = [
+        nc.createVariable(name, 'f4', ('con', 'lat', 'lon'), chunksizes=chunks, fill_value=False, **STORE_COMPRESSION)
+        for name in ('re', 'im')
+    ]
+    for start in range(0, len(lat), STORE_TILE_SIZE):
+        band = slice(start, min(start + STORE_TILE_SIZE, len(lat)))
+        re = np.empty((len(names), band.stop - band.start, len(lon)), dtype=np.float32)
+        im = np.empty_like(re)
+        for con_idx in range(len(names)):
+            re[con_idx], im[con_idx] = read_band(con_idx, band)
+        variables[0][:, band, :] = re
+        variables[1][:, band, :] = im
+
+
+def _write_mesh(nc, dset, names):
+    """Write the variables of the ADCIRC model.
+
+    Args:
+        nc (:obj:`netCDF4.Dataset`): The store being written
+        dset (:obj:`xarray.Dataset`): The model file
+        names (:obj:`list` of :obj:`str`): The constituent names
+    """
+    nc.createDimension('con', len(names))
+    nc.createDimension('node', dset.sizes['node'])
+    nc.createDimension('nele', dset.sizes['nele'])
+    nc.createDimension('nvertex', dset.sizes['nvertex'])
+    nc.createVariable('con', str, ('con',))[:] = np.array(names, dtype=object)
+    nc.createVariable('x', 'f8', ('node',))[:] = dset.x.values
+    nc.createVariable('y', 'f8', ('node',))[:] = dset.y.values
+    nc.createVariable('element', 'i4', ('nele', 'nvertex'), **STORE_COMPRESSION)[:] = dset.element.values
+    chunks = (len(names), min(STORE_NODE_CHUNK, dset.sizes['node']))
+    variables = [
+        nc.createVariable(name, 'f4', ('con', 'node'), chunksizes=chunks, fill_value=False, **STORE_COMPRESSION)
+        for name in ('re', 'im')
+    ]
+    for con_idx, con in enumerate(names):
+        amplitude = dset[f'{con}_amplitude'].values
+        phase = np.radians(dset[f'{con}_phase'].values)
+        variables[0][con_idx, :] = amplitude * np.cos(phase)
+        variables[1][con_idx, :] = amplitude * np.sin(phase)
+
+
+def _tpxo_source(model, resources, datasets):
+    """Get the grid and a band reader of a group of TPXO constituents.
+
+    The TPXO files store the real and imaginary components in (lon, lat) order with the phase lag convention, the
+    imaginary components are negated.
+
+    Args:
+        model (str): Name of the model
+        resources (:obj:`harmonica.resource.Resources`): The resources of the model
+        datasets (:obj:`list` of :obj:`xarray.Dataset`): The open model files of the group
+
+    Returns:
+        tuple: The constituent names, longitudes, latitudes, and band reader, see _write_grid()
+    """
+    multiplier = resources.dataset_attributes()['units_multiplier']
+    dset = datasets[0]
+    lon = dset.lon_z.values
+    lat = dset.lat_z.values
+    lon = lon[:, 0] if lon.ndim > 1 else lon
+    lat = lat[0, :] if lat.ndim > 1 else lat
+    sources = []  # The (dataset, leading index) of each constituent
+    for dset in datasets:
+        if model == 'tpxo9':
+            names = [x.tobytes().decode('utf-8').strip().upper() for x in dset.con.values]
+            sources.extend((name, dset, (con_idx,)) for con_idx, name in enumerate(names))
+        else:
+            sources.append((dset.con.item().decode('utf-8').strip().upper(), dset, ()))
+    sources.sort(key=lambda source: source[0])
+
+    def read_band(con_idx, band):
+        _, dset, lead = sources[con_idx]
+        re = dset.hRe[lead + (slice(None), band)].values.T * multiplier
+        im = dset.hIm[lead + (slice(None), band)].values.T * -multiplier
+        return re, im
+
+    return [source[0] for source in sources], lon, lat, read_band
+
+
+def _leprovost_source(model, resources, datasets, filenames):
+    """Get the grid and a band reader of the LeProvost or FES2014 constituents.
+
+    The files store amplitudes in centimeters and phases in degrees in (lat, lon) order.
+
+    Args:
+        model (str): Name of the model
+        resources (:obj:`harmonica.resource.Resources`): The resources of the model
+        datasets (:obj:`list` of :obj:`xarray.Dataset`): The open model files of the group
+        filenames (:obj:`list` of :obj:`str`): Paths of the model files, parallel with datasets
+
+    Returns:
+        tuple: The constituent names, longitudes, latitudes, and band reader, see _write_grid()
+    """
+    atts = resources.dataset_attributes()
+    lon = atts['min_lon'] + np.arange(atts['num_lons']) * 360.0 / atts['num_lons']
+    lat = np.linspace(-90.0, 90.0, atts['num_lats'])
+    if model == 'leprovost':  # All constituents in one file with constituent name dataset.
+        names = [x.strip().upper() for x in datasets[0].spectrum.data.tolist()]
+        sources = [(name, datasets[0], (con_idx,)) for con_idx, name in enumerate(names)]
+    else:  # FES2014 has separate files for each constituent with no constituent name dataset.
+        names = [os.path.splitext(os.path.basename(filename))[0].upper() for filename in filenames]
+        sources = [(name, dset, ()) for name, dset in zip(names, datasets)]
+    sources.sort(key=lambda source: source[0])
+
+    def read_band(con_idx, band):
+        _, dset, lead = sources[con_idx]
+        amplitude = dset.amplitude[lead + (band, slice(None))].values.astype(float) / 100.0
+        phase = np.radians(dset.phase[lead + (band, slice(None))].values.astype(float))
+        return amplitude * np.cos(phase), amplitude * np.sin(phase)
+
+    return [source[0] for source in sources], lon, lat, read_band
@@ -7,10 +7,8 @@
 # 3. Aquaveo modules
 
 # 4. Local modules
-from .adcirc_database import AdcircDB
-from .leprovost_database import LeProvostDB
+from .constituent_data import ConstituentData
 from .resource import ResourceManager
-from .tpxo_database import TpxoDB
 
 
 class Constituents:
@@ -39,12 +37,35 @@ class Constituents:
             return self._current_model.data
         return []
 
+    @property
+    def current_model(self):
+        """:obj:`harmonica.tidal_database.TidalDB`: The tidal model currently being used for extraction."""
+        return self._current_model
+
+    @property
+    def results(self):
+        """:obj:`harmonica.constituent_data.ConstituentData`: The constituent data of the last extraction."""
+        if self._current_model:
+            return self._current_model.results
+        return ConstituentData()
+
+    @results.setter
+    def results(self, value):
+        """Set the constituent data of the current model."""
+        if self._current_model:
+            self._current_model.results = value
+
     @data.setter
     def data(self, value):
         """Set the underlying dataframe of the current model."""
         if self._current_model:
             self._current_model.data = value
 
+    def close(self):
+        """Close the current model's open file handles."""
+        if self._current_model:
+            self._current_model.close()
+
     def change_model(self, new_model):
         """Change the current tidal database model.
 
@@ -55,11 +76,15 @@ class Constituents:
         if self._current_model and self._current_model.model == new_model:
             return  # Already have the correct impl and resources for this model, nothing to do.
 
+        # The extractors are imported on first use so only the backend of the requested model is loaded.
         if new_model in ResourceManager.TPXO_MODELS:  # Switch to a TPXO model
+            from .tpxo_database import TpxoDB
             self._current_model = TpxoDB(new_model)
         elif new_model in ResourceManager.LEPROVOST_MODELS:
+            from .leprovost_database import LeProvostDB
             self._current_model = LeProvostDB(new_model)
         elif new_model in ResourceManager.ADCIRC_MODELS:
+            from .adcirc_database import AdcircDB
             self._current_model = AdcircDB()
         else:
             tpxo_models = ", ".join(ResourceManager.TPXO_MODELS) + ", "
@@ -68,29 +93,50 @@ class Constituents:
             supported_models = tpxo_models + leprovost_models + adcirc_models
             raise ValueError(f'Model not supported: "{new_model}". Must be one of: {supported_models.strip()}.')
 
-    def get_components(self, locs, cons=None, positive_ph=False, model=None):
+    def build_plan(self, locs, cons=None, model=None):
+        """Build a reusable interpolation plan for a set of points with the current model.
+
+        Args:
+            locs (:obj:`list` of :obj:`tuple` of :obj:`float`): latitude [-90, 90] and longitude [-180 180] or [0 360]
+                of the points.
+            cons (:obj:`list` of :obj:`str`, optional): Constituents the plan will be used for. If not supplied, the
+                plan can be used for all valid constituents of the model.
+            model (:obj:`str`, optional): Name of the tidal model to build the plan for. If not provided, current
+                model will be used. If a model other than the current is provided, current model is switched.
+
+        Returns:
+            :obj:`harmonica.interpolation_plan.InterpolationPlan`: The plan, pass it to get_components()
+        """
+        if model and model.lower() != self._current_model.model:
+            self.change_model(model.lower())
+        return self._current_model.build_plan(locs, cons)
+
+    def get_components(self, locs, cons=None, positive_ph=False, model=None, plan=None):
         """Abstract method to get amplitude, phase, and speed of specified constituents at specified point locations.
 
         Args:
             locs (:obj:`list` of :obj:`tuple` of :obj:`float`): latitude [-90, 90] and longitude [-180 180] or [0 360]
-                of the requested points.
+                of the requested points. May be None if a plan is given.
             cons (:obj:`list` of :obj:`str`, optional): List of the constituent names to get amplitude and phase for. If
                 not supplied, all valid constituents will be extracted.
             positive_ph (bool, optional): Indicate if the returned phase should be all positive [0 360] (True) or
                 [-180 180] (False, the default).
             model (:obj:`str`, optional): Name of the tidal model to use to query for the data. If not provided, current
                 model will be used. If a model other than the current is provided, current model is switched.
+            plan (:obj:`harmonica.interpolation_plan.InterpolationPlan`, optional): Plan built by build_plan() for
+                locs. The points are not located again, only the values of the model around them are read. Switches to
+                the model of the plan if no model is provided.
 
         Returns:
-           :obj:`list` of :obj:`pandas.DataFrame`: Implementations should return a list of dataframes of constituent
-                information including amplitude (meters), phase (degrees) and speed (degrees/hour, UTC/GMT). The list is
-                parallel with locs, where each element in the return list is the constituent data for the corresponding
-                element in locs. Empty list on error. Note that function uses fluent interface pattern.
+           :obj:`harmonica.constituent_data.ConstituentData`: The constituent information including amplitude
+                (meters), phase (degrees) and speed (degrees/hour, UTC/GMT) as (points x constituents) arrays parallel
+                with locs. Its data attribute is the legacy list of dataframes, one per element in locs. Empty on error.
 
         """
+        model = model if model or plan is None else plan.model
         if model and model.lower() != self._current_model.model:
             self.change_model(model.lower())
-        return self._current_model.get_components(locs, cons, positive_ph)
+        return self._current_model.get_components(locs, cons, positive_ph, plan=plan).results
 
     def get_nodal_factor(self, names, timestamp, timestamp_middle):
         """Get the nodal factor for specified constituents at a specified time.
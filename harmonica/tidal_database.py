@@ -3,6 +3,8 @@
 # 1. Standard Python modules
 from abc import ABCMeta, abstractmethod
 import math
+import os
+import threading
 
 # 2. Third party modules
 import numpy
@@ -11,54 +13,26 @@ import pandas as pd
 # 3. Aquaveo modules
 
 # 4. Local modules
-from .resource import ResourceManager
+from harmonica import config
+from .astronomy import equilibrium_arguments, nodal_terms, orbit_variables
+from .constituent_data import ConstituentData
+from .constituent_registry import AMPLITUDE, ETRF, FREQUENCY, ids, NAMES, NUM_CONSTITUENTS, SPEED, take
+from .interpolation_plan import InterpolationPlan
+from .profiling import count, timer
+from .resource import DatasetPool, ResourceManager
 
 
 NCNST = 37
+READ_MODES = ('auto', 'window', 'cells', 'full')
+WINDOW_MAX_CELLS = 4194304  # Largest bounding box window (number of grid cells) read in 'auto' mode
+READ_TILE_SIZE = 64  # Size of the tiles points are grouped into when the bounding box window is too large
 
-# Dictionary of NOAA constituent speed constants (deg/hr)
-# Source: https://tidesandcurrents.noaa.gov
-# The speed is the rate change in the phase of a constituent, and is equal to 360 degrees divided by the
-# constituent period expressed in hours
+# Dictionary of NOAA constituent speed constants (deg/hr), kept for compatibility. See constituent_registry for the
+# array-backed metadata indexed by constituent id.
 # name: (speed, amplitude, frequency, ETRF)
 NOAA_SPEEDS = {
-    'OO1': (16.139101, 0.0, 0.00007824457305, 0.069),
-    '2Q1': (12.854286, 0.0, 0.000062319338107, 0.069),
-    '2MK3': (42.92714, 0.0, 0.000208116646659, 0.069),
-    '2N2': (27.895355, 0.0, 0.000135240496464, 0.069),
-    '2SM2': (31.015896, 0.0, 0.000150369306157, 0.069),
-    'K1': (15.041069, 0.141565, 0.000072921158358, 0.736),
-    'K2': (30.082138, 0.030704, 0.000145842317201, 0.693),
-    'J1': (15.5854435, 0.0, 0.00007556036138, 0.069),
-    'L2': (29.528479, 0.0, 0.000143158105531, 0.069),
-    'LAM2': (29.455626, 0.0, 0.000142804901311, 0.069),
-    'M1': (14.496694, 0.0, 0.000070281955336, 0.069),
-    'M2': (28.984104, 0.242334, 0.000140518902509, 0.693),
-    'M3': (43.47616, 0.0, 0.000210778353763, 0.069),
-    'M4': (57.96821, 0.0, 0.000281037805017, 0.069),
-    'M6': (86.95232, 0.0, 0.000421556708011, 0.069),
-    'M8': (115.93642, 0.0, 0.000562075610519, 0.069),
-    'MF': (1.0980331, 0.0, 0.000005323414692, 0.069),
-    'MK3': (44.025173, 0.0, 0.000213440061351, 0.069),
-    'MM': (0.5443747, 0.0, 0.000002639203022, 0.069),
-    'MN4': (57.423832, 0.0, 0.000278398601995, 0.069),
-    'MS4': (58.984104, 0.0, 0.000285963006842, 0.069),
-    'MSF': (1.0158958, 0.0, 0.000004925201824, 0.069),
-    'MU2': (27.968208, 0.0, 0.000135593700684, 0.069),
-    'N2': (28.43973, 0.046398, 0.000137879699487, 0.693),
-    'NU2': (28.512583, 0.0, 0.000138232903707, 0.069),
-    'O1': (13.943035, 0.100514, 0.000067597744151, 0.695),
-    'P1': (14.958931, 0.046834, 0.000072522945975, 0.706),
-    'Q1': (13.398661, 0.019256, 0.000064958541129, 0.695),
-    'R2': (30.041067, 0.0, 0.000145643201313, 0.069),
-    'RHO': (13.471515, 0.0, 0.000065311745349, 0.069),
-    'S1': (15.0, 0.0, 0.000072722052166, 0.069),
-    'S2': (30.0, 0.112841, 0.000145444104333, 0.693),
-    'S4': (60.0, 0.0, 0.000290888208666, 0.069),
-    'S6': (90.0, 0.0, 0.000436332312999, 0.069),
-    'SA': (0.0410686, 0.0, 0.000000199106191, 0.069),
-    'SSA': (0.0821373, 0.0, 0.000000398212868, 0.069),
-    'T2': (29.958933, 0.0, 0.000145245007353, 0.069),
+    name: (float(SPEED[con_id]), float(AMPLITUDE[con_id]), float(FREQUENCY[con_id]), float(ETRF[con_id]))
+    for con_id, name in enumerate(NAMES)
 }
 
 
@@ -115,20 +89,176 @@ def convert_coords(coords, zero_to_360=False):
     return coords
 
 
+def read_cells(var, idx0, idx1, lead=(), read_mode=None):
+    """Gather the values of a gridded variable at cell indices, reading only the part of the file that is needed.
+
+    Args:
+        var (:obj:`xarray.DataArray`): The lazily loaded variable to read. The last two dimensions are the grid.
+        idx0 (:obj:`numpy.ndarray`): Indices into the second to last dimension of var (points x corners)
+        idx1 (:obj:`numpy.ndarray`): Indices into the last dimension of var, parallel with idx0
+        lead (:obj:`tuple` of :obj:`int`, optional): Indices into the leading dimensions of var, if any (e.g. the
+            constituent of a file with all the constituents stacked in one variable)
+        read_mode (:obj:`str`, optional): 'window' reads one bounding box window around all the points. 'cells'
+            reads only the cell corners each point needs. 'full' reads the entire grid. 'auto' reads one window if it
+            is no larger than WINDOW_MAX_CELLS, otherwise one window per READ_TILE_SIZE tile of clustered points.
+            Defaults to config['read_mode'].
+
+    Returns:
+        :obj:`numpy.ndarray`: The values of var at the indices, same shape as idx0
+    """
+    read_mode = read_mode if read_mode else config['read_mode']
+    if read_mode not in READ_MODES:
+        raise ValueError(f'Read mode not supported: "{read_mode}". Must be one of: {", ".join(READ_MODES)}.')
+    idx0 = numpy.asarray(idx0)
+    idx1 = numpy.asarray(idx1)
+    if idx0.size == 0:
+        return numpy.empty(idx0.shape, dtype=var.dtype)
+    if read_mode == 'full':
+        count('read_cells.windows')
+        with timer('read_cells'):
+            return var[lead + (slice(None), slice(None))].values[idx0, idx1]
+
+    # Group the points by the window they will be read from.
+    tile = 1 if read_mode == 'cells' else None
+    if read_mode == 'auto':
+        bbox = (idx0.max() - idx0.min() + 1) * (idx1.max() - idx1.min() + 1)
+        tile = READ_TILE_SIZE if bbox > WINDOW_MAX_CELLS else None
+    pt_idx0 = idx0.reshape(len(idx0), -1)
+    pt_idx1 = idx1.reshape(len(idx1), -1)
+    if tile is None:
+        groups = [numpy.arange(len(idx0))]
+    else:
+        keys = (pt_idx0.min(axis=1) // tile) * (idx1.max() // tile + 1) + pt_idx1.min(axis=1) // tile
+        _, inverse = numpy.unique(keys, return_inverse=True)
+        order = numpy.argsort(inverse.ravel(), kind='stable')
+        groups = numpy.split(order, numpy.flatnonzero(numpy.diff(inverse.ravel()[order])) + 1)
+
+    count('read_cells.windows', len(groups))
+    values = numpy.empty(pt_idx0.shape, dtype=var.dtype)
+    with timer('read_cells'):
+        for group in groups:
+            grp_idx0 = pt_idx0[group]
+            grp_idx1 = pt_idx1[group]
+            lo0 = grp_idx0.min()
+            lo1 = grp_idx1.min()
+            window = var[lead + (slice(lo0, grp_idx0.max() + 1), slice(lo1, grp_idx1.max() + 1))].values
+            values[group] = window[grp_idx0 - lo0, grp_idx1 - lo1]
+    return values.reshape(idx0.shape)
+
+
+_read_executor = None  # (number of workers, executor) of read_files(), started on first use
+_read_executor_lock = threading.Lock()
+_worker_pool = None  # Open files of a read_files() worker process, with the modification time of each
+
+
+def read_files(reads, workers=None):
+    """Gather the values of gridded variables in several files, in parallel worker processes if enabled.
+
+    xarray serializes the netCDF4/HDF5 calls of a process with a global lock, so threads can not overlap the reads of
+    different files. Each worker process keeps its own open files and HDF5 library instead. The reads are split into
+    one batch per worker, so the index arrays shared by the reads are sent to each worker once per call.
+
+    The workers are spawned, they import the __main__ module of the program. Scripts that enable them must guard their
+    entry point with if __name__ == '__main__'.
+
+    Args:
+        reads (:obj:`list` of :obj:`tuple`): The (dataset, path, variable names, idx0, idx1, lead) of each read, see
+            read_cells(). The open dataset is read when the reads are not parallel, the workers open the file path.
+        workers (:obj:`int`, optional): Number of worker processes. Defaults to config['read_workers']. The reads are
+            made in this process, one after another, if fewer than two workers are enabled or there is only one read.
+
+    Returns:
+        :obj:`list` of :obj:`list` of :obj:`numpy.ndarray`: The values of the variables of each read, parallel with
+            reads and their variable names
+    """
+    global _read_executor
+    workers = workers if workers is not None else config['read_workers']
+    if workers < 2 or len(reads) < 2:
+        return [
+            [read_cells(dset[name], idx0, idx1, lead) for name in names] for dset, _, names, idx0, idx1, lead in reads
+        ]
+
+    count('read_files.parallel', len(reads))
+    with timer('read_files'):
+        batches = [list(range(len(reads)))[i::workers] for i in range(min(workers, len(reads)))]
+        with _read_executor_lock:
+            if _read_executor is None or _read_executor[0] != workers:
+                import atexit
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                if _read_executor is None:
+                    atexit.register(shutdown_read_workers)
+                else:
+                    _read_executor[1].shutdown()
+                # Spawn the workers, a forked copy of this process' HDF5 library state is not safe to use.
+                context = multiprocessing.get_context('spawn')
+                _read_executor = (workers, ProcessPoolExecutor(workers, mp_context=context))
+            futures = [
+                _read_executor[1].submit(_read_in_worker, [reads[i][1:] for i in batch], config['read_mode'])
+                for batch in batches
+            ]
+        values = [None] * len(reads)
+        for batch, future in zip(batches, futures):
+            for i, read_values in zip(batch, future.result()):
+                values[i] = read_values
+        return values
+
+
+def shutdown_read_workers():
+    """Stop the worker processes of read_files(), after their pending reads. They are started again when needed."""
+    global _read_executor
+    with _read_executor_lock:
+        if _read_executor is not None:
+            _read_executor[1].shutdown()
+            _read_executor = None
+
+
+def _read_in_worker(reads, read_mode):
+    """Gather the values of variables in files, in a read_files() worker process.
+
+    The files stay open for the next reads of the worker, unless they have been modified since they were opened.
+
+    Args:
+        reads (:obj:`list` of :obj:`tuple`): The (path, variable names, idx0, idx1, lead) of each read. idx0 and idx1
+            index the second to last and last dimensions of the variables, lead the leading dimensions, if any.
+        read_mode (str): The read mode of the calling process, see read_cells()
+
+    Returns:
+        :obj:`list` of :obj:`list` of :obj:`numpy.ndarray`: The values of the variables of each read at the indices
+    """
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = (DatasetPool(), {})
+    pool, mtimes = _worker_pool
+    values = []
+    for path, names, idx0, idx1, lead in reads:
+        mtime = os.path.getmtime(path)
+        if mtimes.get(path, mtime) != mtime:  # Replaced, e.g. by ResourceManager.optimize_model()
+            pool.close(path)
+        mtimes[path] = mtime
+        dset = pool.acquire([path])[0]
+        values.append([read_cells(dset[name], idx0, idx1, lead, read_mode) for name in names])
+    return values
+
+
 class OrbitVariables(object):
     """Container for variables used in astronomical equations.
 
     Attributes:
-        astro (:obj:`pytides.astro.astro`): Orbit variables obtained from pytides.
+        astro (:obj:`dict` of :obj:`float`): Orbit variables, see harmonica.astronomy.orbit_variables()
         grterm (:obj:`dict` of :obj:`float`): Dictionary of equilibrium arguments where the key is constituent name
         nodfac (:obj:`dict` of :obj:`float`): Dictionary of nodal factors where the key is constituent name
+        eq_args (:obj:`numpy.ndarray`): The equilibrium arguments indexed by constituent registry id
+        factors (:obj:`numpy.ndarray`): The nodal factors indexed by constituent registry id
 
     """
     def __init__(self):
         """Construct the container."""
         self.astro = {}
-        self.grterm = {con: 0.0 for con in NOAA_SPEEDS}
-        self.nodfac = {con: 0.0 for con in NOAA_SPEEDS}
+        self.eq_args = numpy.zeros(NUM_CONSTITUENTS)
+        self.factors = numpy.zeros(NUM_CONSTITUENTS)
+        self.grterm = dict.fromkeys(NAMES, 0.0)
+        self.nodfac = dict.fromkeys(NAMES, 0.0)
 
 
 class TidalDB(object):
@@ -136,8 +266,10 @@ class TidalDB(object):
 
     Attributes:
         orbit (:obj:`OrbitVariables`): The orbit variables.
+        results (:obj:`harmonica.constituent_data.ConstituentData`): The constituent data of the point locations
+            requested from get_components(). Intended return value of get_components().
         data (:obj:`list` of :obj:`pandas.DataFrame`): List of the constituent component DataFrames with one
-            per point location requested from get_components(). Intended return value of get_components().
+            per point location requested from get_components(). Legacy view of results.
         resources (:obj:`harmonica.resource.ResourceManager`): Manages fetching of tidal data
 
     """
@@ -155,32 +287,97 @@ class TidalDB(object):
         #   amplitude (meters)
         #   phase (degrees)
         #   speed (degrees/hour, UTC/GMT)
-        self.data = []
+        self.results = ConstituentData()
         self.model = model
         self.resources = ResourceManager(self.model)
 
     __metaclass__ = ABCMeta
 
     @abstractmethod
-    def get_components(self, locs, cons, positive_ph):
+    def get_components(self, locs, cons, positive_ph, plan=None):
         """Abstract method to get amplitude, phase, and speed of specified constituents at specified point locations.
 
         Args:
             locs (:obj:`list` of :obj:`tuple` of :obj:`float`): latitude [-90, 90] and longitude [-180 180] or [0 360]
-                of the requested points.
+                of the requested points. May be None if a plan is given.
             cons (:obj:`list` of :obj:`str`, optional): List of the constituent names to get amplitude and phase for. If
                 not supplied, all valid constituents will be extracted.
             positive_ph (bool, optional): Indicate if the returned phase should be all positive [0 360] (True) or
                 [-180 180] (False, the default).
+            plan (:obj:`harmonica.interpolation_plan.InterpolationPlan`, optional): Plan built by build_plan() for
+                locs, the points are not located again
 
         Returns:
-           :obj:`list` of :obj:`pandas.DataFrame`: Implementations should return a list of dataframes of constituent
-                information including amplitude (meters), phase (degrees) and speed (degrees/hour, UTC/GMT). The list is
-                parallel with locs, where each element in the return list is the constituent data for the corresponding
-                element in locs. Empty list on error. Note that function uses fluent interface pattern.
+            :obj:`harmonica.tidal_database.TidalDB`: Implementations should return the extractor, using the fluent
+                interface pattern. Its results attribute is a :obj:`harmonica.constituent_data.ConstituentData` of the
+                amplitude (meters), phase (degrees) and speed (degrees/hour, UTC/GMT) as (points x constituents) arrays
+                parallel with locs, empty on error. Its data attribute is the legacy list of dataframes, one per element
+                in locs, built when first accessed.
         """
         pass
 
+    @abstractmethod
+    def locate(self, plan, cons=None):
+        """Abstract method to locate the points of a plan in the grids of the model and compute their weights.
+
+        Grids that are already in the plan are not located again.
+
+        Args:
+            plan (:obj:`harmonica.interpolation_plan.InterpolationPlan`): The plan to fill
+            cons (:obj:`list` of :obj:`str`, optional): Locate the points in the grids of these constituents. If not
+                supplied, the grids of all valid constituents.
+        """
+        pass
+
+    def build_plan(self, locs, cons=None):
+        """Build a reusable interpolation plan for a set of points.
+
+        Args:
+            locs (:obj:`list` of :obj:`tuple` of :obj:`float`): latitude [-90, 90] and longitude [-180 180] or [0 360]
+                of the points.
+            cons (:obj:`list` of :obj:`str`, optional): Constituents the plan will be used for. If not supplied, the
+                plan can be used for all valid constituents.
+
+        Returns:
+            :obj:`harmonica.interpolation_plan.InterpolationPlan`: The plan, pass it to get_components() with the same
+                points
+        """
+        plan = InterpolationPlan(self.model, locs)
+        self.locate(plan, cons)
+        return plan
+
+    def get_plan(self, locs, plan=None):
+        """Get the plan to extract points with, checking that it was built for them.
+
+        Args:
+            locs (:obj:`list` of :obj:`tuple` of :obj:`float`): The requested points. May be None if a plan is given.
+            plan (:obj:`harmonica.interpolation_plan.InterpolationPlan`, optional): The plan given by the caller
+
+        Returns:
+            :obj:`harmonica.interpolation_plan.InterpolationPlan`: The plan, a new empty one for locs if none was
+                given
+        """
+        if plan is None:
+            return InterpolationPlan(self.model, locs)
+        if locs is not None and not plan.matches(self.model, locs):
+            raise ValueError(f'The interpolation plan was not built for these points and the "{self.model}" model.')
+        return plan
+
+    @property
+    def data(self):
+        """:obj:`list` of :obj:`pandas.DataFrame`: The constituent DataFrames of the requested points."""
+        return self.results.data
+
+    @data.setter
+    def data(self, value):
+        """Set the constituent data from a list of per point DataFrames."""
+        self.results = ConstituentData.from_frames(value)
+
+    def close(self):
+        """Close the model's open file handles and read workers. They are reopened as needed by the next query."""
+        self.resources.close()
+        shutdown_read_workers()
+
     def have_constituent(self, name):
         """Determine if a constituent is valid for this tidal extractor.
 
@@ -205,23 +402,17 @@ class TidalDB(object):
                 amplitude, nodal factor, and equilibrium argument for one of the specified constituents. Rows labeled by
                 constituent name.
         """
-        con_data = pd.DataFrame(columns=['amplitude', 'frequency', 'speed', 'earth_tide_reduction_factor',
-                                         'equilibrium_argument', 'nodal_factor'])
         self.get_eq_args(timestamp, timestamp_middle)
-        for name in names:
-            name = name.upper()
-            if name not in NOAA_SPEEDS:
-                con_data.loc[name] = [numpy.nan, numpy.nan, numpy.nan, numpy.nan, numpy.nan, numpy.nan]
-            else:
-                equilibrium_arg = 0.0
-                nodal_factor = self.orbit.nodfac[name]
-                if nodal_factor != 0.0:
-                    equilibrium_arg = self.orbit.grterm[name]
-                con_data.loc[name] = [
-                    NOAA_SPEEDS[name][1], NOAA_SPEEDS[name][2], NOAA_SPEEDS[name][0], NOAA_SPEEDS[name][3],
-                    equilibrium_arg, nodal_factor
-                ]
-        return con_data
+        con_ids = ids(names, aliases=False)
+        nodal_factor = take(self.orbit.factors, con_ids)
+        return pd.DataFrame({
+            'amplitude': take(AMPLITUDE, con_ids),
+            'frequency': take(FREQUENCY, con_ids),
+            'speed': take(SPEED, con_ids),
+            'earth_tide_reduction_factor': take(ETRF, con_ids),
+            'equilibrium_argument': numpy.where(nodal_factor != 0.0, take(self.orbit.eq_args, con_ids), 0.0),
+            'nodal_factor': nodal_factor,
+        }, index=[name.upper() for name in names])
 
     def get_eq_args(self, timestamp, timestamp_middle):
         """Get equilibrium arguments at a starting time.
@@ -251,58 +442,9 @@ class TidalDB(object):
         Args:
            timestamp (datetime.datetime): Date and time to extract constituent arguments at.
         """
-        # We used to rely on pytides for astronomical computations, but it was giving was different results from
-        # the tide_fac Fortran utility.
-        # from pytides.astro import astro
-        # self.orbit.astro = astro(timestamp)
-
-        # Ported code from tide_fac.f
-        dayj = timestamp.timetuple().tm_yday  # ordinal day number
-        # pi180 = 3.14159265 / 180.0
-        x = int((timestamp.year - 1901.) / 4.0)
-        dyr = timestamp.year - 1900.0
-        dday = dayj + x - 1.0
-        # DN IS THE MOON'S NODE (CAPITAL N, TABLE 1, SCHUREMAN)
-        dn = 259.1560564 - 19.328185764 * dyr - 0.0529539336 * dday - 0.0022064139 * timestamp.hour
-        dn = self.angle(dn)
-        n = math.radians(dn)
-        # DP IS THE LUNAR PERIGEE (SMALL P, TABLE 1)
-        dp = 334.3837214 + 40.66246584 * dyr + 0.111404016 * dday + 0.004641834 * timestamp.hour
-        dp = self.angle(dp)
-        i = math.acos(0.9136949 - 0.0356926 * math.cos(n))
-        di = self.angle(math.degrees(i))
-        nu = math.asin(0.0897056 * math.sin(n) / math.sin(i))
-        dnu = math.degrees(nu)
-        xi = n - 2.0 * math.atan(0.64412 * math.tan(n / 2.0)) - nu
-        dxi = math.degrees(xi)
-        dpc = self.angle(dp - dxi)
-        # DH IS THE MEAN LONGITUDE OF THE SUN (SMALL H, TABLE 1)
-        dh = 280.1895014 - 0.238724988 * dyr + 0.9856473288 * dday + 0.0410686387 * timestamp.hour
-        dh = self.angle(dh)
-        # DP1 IS THE SOLAR PERIGEE (SMALL P1, TABLE 1)
-        dp1 = 281.2208569 + 0.01717836 * dyr + 0.000047064 * dday + 0.000001961 * timestamp.hour
-        dp1 = self.angle(dp1)
-        # DS IS THE MEAN LONGITUDE OF THE MOON (SMALL S, TABLE 1)
-        ds = 277.0256206 + 129.38482032 * dyr + 13.176396768 * dday + 0.549016532 * timestamp.hour
-        ds = self.angle(ds)
-        nup = math.atan(math.sin(nu) / (math.cos(nu) + 0.334766 / math.sin(2.0 * i)))
-        dnup = math.degrees(nup)
-        nup2 = math.atan(math.sin(2.0 * nu) / (math.cos(2.0 * nu) + 0.0726184 / math.sin(i) ** 2)) / 2.0
-        dnup2 = math.degrees(nup2)
-
-        self.orbit.astro = {
-            'ds': ds,
-            'dp': dp,
-            'dh': dh,
-            'dp1': dp1,
-            'dn': dn,
-            'di': di,
-            'dnu': dnu,
-            'dxi': dxi,
-            'dnup': dnup,
-            'dnup2': dnup2,
-            'dpc': dpc,
-        }
+        # The orbit variables of the tide_fac Fortran utility, see astronomy.py for the port of tide_fac.f.
+        astro = orbit_variables([timestamp])
+        self.orbit.astro = {key: float(value[0]) for key, value in astro.items() if key != 'hour'}
 
     def nfacs(self, timestamp):
         """Calculates node factors for constituent tidal signal.
@@ -313,77 +455,9 @@ class TidalDB(object):
         Returns:
             The same values as found in table 14 of Schureman.
         """
-        # Ported code from tide_fac.f
         self.set_orbit(timestamp)
-        # n = math.radians(self.orbit.astro['dn'])
-        i = math.radians(self.orbit.astro['di'])
-        nu = math.radians(self.orbit.astro['dnu'])
-        # xi = math.radians(self.orbit.astro['dxi'])
-        # p = math.radians(self.orbit.astro['dp'])
-        # pc = math.radians(self.orbit.astro['dpc'])
-        sini = math.sin(i)
-        sini2 = math.sin(i / 2.0)
-        sin2i = math.sin(2.0 * i)
-        cosi2 = math.cos(i / 2.0)
-        # tani2 = math.tan(i / 2.0)
-        # EQUATION 197, SCHUREMAN
-        # qainv = math.sqrt(2.310 + 1.435 * math.cos(2.0 * pc))
-        # EQUATION 213, SCHUREMAN
-        # rainv = math.sqrt(1.0 - 12.0 * tani2 ** 2 * math.cos(2.0 * pc) + 36.0 * tani2 ** 4)
-        # VARIABLE NAMES REFER TO EQUATION NUMBERS IN SCHUREMAN
-        eq73 = (2.0 / 3.0 - sini ** 2) / 0.5021
-        eq74 = sini ** 2 / 0.1578
-        eq75 = sini * cosi2 ** 2 / 0.37988
-        eq76 = math.sin(2 * i) / 0.7214
-        eq77 = sini * sini2 ** 2 / 0.0164
-        eq78 = cosi2 ** 4 / 0.91544
-        eq149 = cosi2 ** 6 / 0.8758
-        # eq207 = eq75 * qainv
-        # eq215 = eq78 * rainv
-        eq227 = math.sqrt(0.8965 * sin2i ** 2 + 0.6001 * sin2i * math.cos(nu) + 0.1006)
-        eq235 = 0.001 + math.sqrt(19.0444 * sini ** 4 + 2.7702 * sini ** 2 * math.cos(2.0 * nu) + 0.0981)
-        # NODE FACTORS FOR 37 CONSTITUENTS:
-        self.orbit.nodfac['M2'] = eq78
-        self.orbit.nodfac['S2'] = 1.0
-        self.orbit.nodfac['N2'] = eq78
-        self.orbit.nodfac['K1'] = eq227
-        self.orbit.nodfac['M4'] = self.orbit.nodfac['M2'] ** 2
-        self.orbit.nodfac['O1'] = eq75
-        self.orbit.nodfac['M6'] = self.orbit.nodfac['M2'] ** 3
-        self.orbit.nodfac['MK3'] = self.orbit.nodfac['M2'] * self.orbit.nodfac['K1']
-        self.orbit.nodfac['S4'] = 1.0
-        self.orbit.nodfac['MN4'] = self.orbit.nodfac['M2'] ** 2
-        self.orbit.nodfac['NU2'] = eq78
-        self.orbit.nodfac['S6'] = 1.0
-        self.orbit.nodfac['MU2'] = eq78
-        self.orbit.nodfac['2N2'] = eq78
-        self.orbit.nodfac['OO1'] = eq77
-        self.orbit.nodfac['LAM2'] = eq78
-        self.orbit.nodfac['S1'] = 1.0
-        # EQUATION 207 NOT PRODUCING CORRECT ANSWER FOR M1
-        # SET NODE FACTOR FOR M1 = 0 UNTIL CAN FURTHER RESEARCH
-        self.orbit.nodfac['M1'] = 0.0  # = eq207
-        self.orbit.nodfac['J1'] = eq76
-        self.orbit.nodfac['MM'] = eq73
-        self.orbit.nodfac['SSA'] = 1.0
-        self.orbit.nodfac['SA'] = 1.0
-        self.orbit.nodfac['MSF'] = eq78
-        self.orbit.nodfac['MF'] = eq74
-        self.orbit.nodfac['RHO'] = eq75
-        self.orbit.nodfac['Q1'] = eq75
-        self.orbit.nodfac['T2'] = 1.0
-        self.orbit.nodfac['R2'] = 1.0
-        self.orbit.nodfac['2Q1'] = eq75
-        self.orbit.nodfac['P1'] = 1.0
-        self.orbit.nodfac['2SM2'] = eq78
-        self.orbit.nodfac['M3'] = eq149
-        # EQUATION 215 NOT PRODUCING CORRECT ANSWER FOR L2
-        # SET NODE FACTOR FOR L2 = 0 UNTIL CAN FURTHER RESEARCH
-        self.orbit.nodfac['L2'] = 0.0  # = eq215
-        self.orbit.nodfac['2MK3'] = self.orbit.nodfac['M2'] ** 2 * self.orbit.nodfac['K1']
-        self.orbit.nodfac['K2'] = eq235
-        self.orbit.nodfac['M8'] = self.orbit.nodfac['M2'] ** 4
-        self.orbit.nodfac['MS4'] = eq78
+        self.orbit.factors = nodal_terms(numpy.arange(NUM_CONSTITUENTS), [timestamp])[0][0]
+        self.orbit.nodfac = dict(zip(NAMES, self.orbit.factors.tolist()))
 
     def gterms(self, timestamp, timestamp_middle):
         """Determines the Greenwich equilibrium terms.
@@ -394,66 +468,6 @@ class TidalDB(object):
         Returns:
             The same values as found in table 15 of Schureman.
         """
-        # Ported code from tide_fac.f
-        # OBTAINING ORBITAL VALUES AT BEGINNING OF SERIES FOR V0
-        self.set_orbit(timestamp)
-        s = self.orbit.astro['ds']
-        p = self.orbit.astro['dp']
-        h = self.orbit.astro['dh']
-        p1 = self.orbit.astro['dp1']
-        t = self.angle(180.0 + timestamp.hour * (360.0 / 24.0))
-
-        # OBTAINING ORBITAL VALUES AT MIDDLE OF SERIES FOR U
         self.set_orbit(timestamp_middle)
-        nu = self.orbit.astro['dnu']
-        xi = self.orbit.astro['dxi']
-        nup = self.orbit.astro['dnup']
-        nup2 = self.orbit.astro['dnup2']
-
-        # SUMMING TERMS TO OBTAIN EQUILIBRIUM ARGUMENTS
-        self.orbit.grterm['M2'] = 2.0 * (t - s + h) + 2.0 * (xi - nu)
-        self.orbit.grterm['S2'] = 2.0 * t
-        self.orbit.grterm['N2'] = 2.0 * (t + h) - 3.0 * s + p + 2.0 * (xi - nu)
-        self.orbit.grterm['K1'] = t + h - 90.0 - nup
-        self.orbit.grterm['M4'] = 4.0 * (t - s + h) + 4.0 * (xi - nu)
-        self.orbit.grterm['O1'] = t - 2.0 * s + h + 90.0 + 2.0 * xi - nu
-        self.orbit.grterm['M6'] = 6.0 * (t - s + h) + 6.0 * (xi - nu)
-        self.orbit.grterm['MK3'] = 3.0 * (t + h) - 2.0 * s - 90.0 + 2.0 * (xi - nu) - nup
-        self.orbit.grterm['S4'] = 4.0 * t
-        self.orbit.grterm['MN4'] = 4.0 * (t + h) - 5.0 * s + p + 4.0 * (xi - nu)
-        self.orbit.grterm['NU2'] = 2.0 * t - 3.0 * s + 4.0 * h - p + 2.0 * (xi - nu)
-        self.orbit.grterm['S6'] = 6.0 * t
-        self.orbit.grterm['MU2'] = 2.0 * (t + 2.0 * (h - s)) + 2.0 * (xi - nu)
-        self.orbit.grterm['2N2'] = 2.0 * (t - 2.0 * s + h + p) + 2.0 * (xi - nu)
-        self.orbit.grterm['OO1'] = t + 2.0 * s + h - 90.0 - 2.0 * xi - nu
-        self.orbit.grterm['LAM2'] = 2.0 * t - s + p + 180.0 + 2.0 * (xi - nu)
-        self.orbit.grterm['S1'] = t
-        i = math.radians(self.orbit.astro['di'])
-        pc = math.radians(self.orbit.astro['dpc'])
-        top = (5.0 * math.cos(i) - 1.0) * math.sin(pc)
-        bottom = (7.0 * math.cos(i) + 1.0) * math.cos(pc)
-        q = self.angle(math.degrees(math.atan2(top, bottom)))
-        self.orbit.grterm['M1'] = t - s + h - 90.0 + xi - nu + q
-        self.orbit.grterm['J1'] = t + s + h - p - 90.0 - nu
-        self.orbit.grterm['MM'] = s - p
-        self.orbit.grterm['SSA'] = 2.0 * h
-        self.orbit.grterm['SA'] = h
-        self.orbit.grterm['MSF'] = 2.0 * (s - h)
-        self.orbit.grterm['MF'] = 2.0 * s - 2.0 * xi
-        self.orbit.grterm['RHO'] = t + 3.0 * (h - s) - p + 90.0 + 2.0 * xi - nu
-        self.orbit.grterm['Q1'] = t - 3.0 * s + h + p + 90.0 + 2.0 * xi - nu
-        self.orbit.grterm['T2'] = 2.0 * t - h + p1
-        self.orbit.grterm['R2'] = 2.0 * t + h - p1 + 180.0
-        self.orbit.grterm['2Q1'] = t - 4.0 * s + h + 2.0 * p + 90.0 + 2.0 * xi - nu
-        self.orbit.grterm['P1'] = t - h + 90.0
-        self.orbit.grterm['2SM2'] = 2.0 * (t + s - h) + 2.0 * (nu - xi)
-        self.orbit.grterm['M3'] = 3.0 * (t - s + h) + 3.0 * (xi - nu)
-        r = math.sin(2.0 * pc) / ((1.0 / 6.0) * (1.0 / math.tan(0.5 * i)) ** 2 - math.cos(2.0 * pc))
-        r = math.degrees(math.atan(r))
-        self.orbit.grterm['L2'] = 2.0 * (t + h) - s - p + 180.0 + 2.0 * (xi - nu) - r
-        self.orbit.grterm['2MK3'] = 3.0 * (t + h) - 4.0 * s + 90.0 + 4.0 * (xi - nu) + nup
-        self.orbit.grterm['K2'] = 2.0 * (t + h) - 2.0 * nup2
-        self.orbit.grterm['M8'] = 8.0 * (t - s + h) + 8.0 * (xi - nu)
-        self.orbit.grterm['MS4'] = 2.0 * (2.0 * t - s + h) + 2.0 * (xi - nu)
-        for con, value in self.orbit.grterm.items():
-            self.orbit.grterm[con] = self.angle(value)
+        self.orbit.eq_args = equilibrium_arguments(numpy.arange(NUM_CONSTITUENTS), [timestamp], [timestamp_middle])[0]
+        self.orbit.grterm = dict(zip(NAMES, self.orbit.eq_args.tolist()))
@@ -1,17 +1,19 @@
 """Class to manage the TPXO tidal database models."""
 
 # 1. Standard Python modules
-from bisect import bisect
 
 # 2. Third party modules
 import numpy as np
-import pandas as pd
 
 # 3. Aquaveo modules
 
 # 4. Local modules
+from .constituent_data import ConstituentData
+from .constituent_registry import ids, SPEED, take
+from .profiling import count, timer
 from .resource import ResourceManager
-from .tidal_database import NOAA_SPEEDS, TidalDB
+from .store import is_store, store_names
+from .tidal_database import read_files, TidalDB
 
 
 DEFAULT_TPXO_RESOURCE = 'tpxo9'
@@ -34,90 +36,175 @@ class TpxoDB(TidalDB):
             ))
         super().__init__(model)
 
-    def get_components(self, locs, cons=None, positive_ph=False):
+    def get_components(self, locs, cons=None, positive_ph=False, plan=None):
         """Get the amplitude, phase, and speed of specified constituents at specified point locations.
 
         Args:
             locs (:obj:`list` of :obj:`tuple` of :obj:`float`): latitude [-90, 90] and longitude [-180 180] or [0 360]
-                of the requested points.
+                of the requested points. May be None if a plan is given.
             cons (:obj:`list` of :obj:`str`, optional): List of the constituent names to get amplitude and phase for. If
                 not supplied, all valid constituents will be extracted.
             positive_ph (bool, optional): Indicate if the returned phase should be all positive [0 360] (True) or
                 [-180 180] (False, the default).
+            plan (:obj:`harmonica.interpolation_plan.InterpolationPlan`, optional): Plan built by build_plan() for
+                locs, the points are not located again
 
         Returns:
-           :obj:`list` of :obj:`pandas.DataFrame`: A list of dataframes of constituent information including
-                amplitude (meters), phase (degrees) and speed (degrees/hour, UTC/GMT). The list is parallel with locs,
-                where each element in the return list is the constituent data for the corresponding element in locs.
-                Empty list on error. Note that function uses fluent interface pattern.
+            :obj:`harmonica.tpxo_database.TpxoDB`: This extractor, using the fluent interface pattern. Its results
+                attribute is a :obj:`harmonica.constituent_data.ConstituentData` of the amplitude (meters), phase
+                (degrees) and speed (degrees/hour, UTC/GMT) as (points x constituents) arrays parallel with locs, empty
+                on error. Its data attribute is the legacy list of dataframes, one per element in locs, built when first
+                accessed.
 
         """
-        self.data = [pd.DataFrame(columns=['amplitude', 'phase', 'speed']) for _ in range(len(locs))]
-
         # if no constituents were requested, return all available
         if cons is None or not len(cons):
             cons = list(self.resources.available_constituents())
+        plan = self.get_plan(locs, plan)
+        num_pts = len(plan)
+
         # open the netcdf database(s)
+        count('points', num_pts)
         single_file = self.model == 'tpxo9'
-        for d in self.resources.get_datasets(cons):
+        reads = []  # (dataset, path, variables, x or lat indices, y or lon indices, lead) of each constituent
+        read_cons = []  # (constituent, grid, sign of the imaginary components, units multiplier) of each read
+        read_names = set()
+        filenames = []
+        datasets = self.resources.get_datasets(cons, filenames)
+        for d, paths in zip(datasets, filenames):
+            for dset, path in zip(d, paths):
+                stored = is_store(dset)
+                with timer('tpxo.decode_names'):
+                    # get the dataset constituent name array from data cube
+                    if stored:
+                        nc_names = store_names(dset)
+                    elif single_file:
+                        nc_names = [x.tobytes().decode('utf-8').strip().upper() for x in dset.con.values]
+                    else:
+                        nc_names = [dset.con.item().decode('utf-8').strip().upper()]
+                dset_cons = [c for c in cons if c in nc_names and c not in read_names]
+                if not dset_cons:
+                    continue
+
+                # locate every point in the grid at once, unless the plan already has the grid
+                grid = self._locate_grid(plan, dset)
+                read_names.update(dset_cons)
+                for c in dset_cons:
+                    count('constituents')
+                    lead = (nc_names.index(c),) if single_file or stored else ()
+                    if stored:  # (con, lat, lon) in meters with the imaginary components already negated
+                        reads.append((dset, path, ['re', 'im'], grid['y_idx'], grid['x_idx'], lead))
+                        read_cons.append((c, grid, 1.0, 1.0))
+                    else:
+                        reads.append((dset, path, ['hRe', 'hIm'], grid['x_idx'], grid['y_idx'], lead))
+                        read_cons.append((c, grid, -1.0, self.resources.get_units_multiplier()))
+
+        # read the surrounding values of every point, the files of TPXO8 in parallel if enabled, and calculate the
+        # weighted tide from real and imaginary components
+        results = {}
+        for (c, grid, sign, multiplier), (h_re, h_im) in zip(read_cons, read_files(reads)):
+            weights, valid = grid['weights'], grid['valid']
+            with timer('tpxo.interpolate'):
+                h = np.empty(len(weights), dtype=complex)
+                h.real = (h_re * weights).sum(axis=-1)
+                h.imag = sign * (h_im * weights).sum(axis=-1)
+                # get the phase and amplitude, points outside the grid are left NaN
+                ph = np.angle(h, deg=True)
+                amp = np.full(num_pts, np.nan)
+                phase = np.full(num_pts, np.nan)
+                amp[valid] = np.absolute(h) * multiplier
+                phase[valid] = ph + np.where(positive_ph & (ph < 0), 360., 0.)
+            results[c] = (amp, phase)
+
+        # place info into data tables
+        with timer('tpxo.assemble'):
+            names = [c for c in cons if c in results]
+            amps = np.array([results[c][0] for c in names]).reshape(len(names), num_pts)
+            phases = np.array([results[c][1] for c in names]).reshape(len(names), num_pts)
+            speeds = take(SPEED, ids(names, aliases=False))
+            self.results = ConstituentData(names, amps.T, phases.T, speeds)
+        return self
+
+    def locate(self, plan, cons=None):
+        """Locate the points of a plan in the grids of the model and compute their bilinear weights.
+
+        TPXO8 has a 1/30 degree and a 1/6 degree grid, the plan gets one entry per grid size.
+
+        Args:
+            plan (:obj:`harmonica.interpolation_plan.InterpolationPlan`): The plan to fill
+            cons (:obj:`list` of :obj:`str`, optional): Locate the points in the grids of these constituents. If not
+                supplied, the grids of all valid constituents.
+        """
+        cons = cons if cons else list(self.resources.available_constituents())
+        for d in self.resources.get_datasets([con.upper() for con in cons]):
             for dset in d:
-                # remove unnecessary data array dimensions if present (e.g. tpxo9)
-                if 'nx' in dset.lat_z.dims:
-                    dset['lat_z'] = dset.lat_z.sel(nx=0, drop=True)
-                if 'ny' in dset.lon_z.dims:
-                    dset['lon_z'] = dset.lon_z.sel(ny=0, drop=True)
-                # get the dataset constituent name array from data cube
-                if single_file:
-                    nc_names = [x.tostring().decode('utf-8').strip().upper() for x in dset.con.values]
-                else:
-                    nc_names = [dset.con.item().decode('utf-8').strip().upper()]
-                for c in set(cons) & set(nc_names):
-                    for i, loc in enumerate(locs):
-                        lat, lon = loc
-                        # check the phase of the longitude
-                        if lon < 0:
-                            lon = lon + 360.
-
-                        # get constituent and bounding indices within the data cube
-                        idx = {
-                            'con': nc_names.index(c) if single_file else 0,
-                            'top': bisect(dset.lat_z, lat),
-                            'right': bisect(dset.lon_z, lon),
-                        }
-                        idx['bottom'] = idx['top'] - 1
-                        idx['left'] = idx['right'] - 1
-                        # get distance from the bottom left to the requested point
-                        dx = (lon - dset.lon_z.values[idx['left']]) / \
-                             (dset.lon_z.values[idx['right']] - dset.lon_z.values[idx['left']])
-                        dy = (lat - dset.lat_z.values[idx['bottom']]) / \
-                             (dset.lat_z.values[idx['top']] - dset.lat_z.values[idx['bottom']])
-                        # calculate weights for bilinear spline
-                        weights = np.array([
-                            (1. - dx) * (1. - dy),  # w00 :: bottom left
-                            (1. - dx) * dy,         # w01 :: bottom right
-                            dx * (1. - dy),         # w10 :: top left
-                            dx * dy                 # w11 :: top right
-                        ]).reshape((2, 2))
-                        weights = weights / weights.sum()
-                        # devise the slice to subset surrounding values
-                        if single_file:
-                            query = np.s_[idx['con'], idx['left']:idx['right'] + 1, idx['bottom']:idx['top'] + 1]
-                        else:
-                            query = np.s_[idx['left']:idx['right'] + 1, idx['bottom']:idx['top'] + 1]
-                        # calculate the weighted tide from real and imaginary components
-                        h = complex(
-                            (dset.hRe.values[query] * weights).sum(), -(dset.hIm.values[query] * weights).sum()
-                        )
-                        # get the phase and amplitude
-                        ph = np.angle(h, deg=True)
-                        # place info into data table
-                        self.data[i].loc[c] = [
-                            # amplitude
-                            np.absolute(h) * self.resources.get_units_multiplier(),
-                            # phase
-                            ph + (360. if positive_ph and ph < 0 else 0),
-                            # speed
-                            NOAA_SPEEDS[c][0]
-                        ]
+                self._locate_grid(plan, dset)
 
-        return self
+    @staticmethod
+    def _locate_grid(plan, dset):
+        """Get the cell indices and weights of the points of a plan in the grid of a dataset.
+
+        Args:
+            plan (:obj:`harmonica.interpolation_plan.InterpolationPlan`): The plan, the grid is added if missing
+            dset (:obj:`xarray.Dataset`): The open model file
+
+        Returns:
+            dict: The valid points' x and y grid indices and weights of the cell corners (valid points x 4), and the
+                mask of the valid points (points)
+        """
+        if is_store(dset):  # stores have the same grid under other names
+            lon_z, lat_z = dset.lon, dset.lat
+        else:
+            # remove unnecessary data array dimensions if present (e.g. tpxo9)
+            if 'nx' in dset.lat_z.dims:
+                dset['lat_z'] = dset.lat_z.sel(nx=0, drop=True)
+            if 'ny' in dset.lon_z.dims:
+                dset['lon_z'] = dset.lon_z.sel(ny=0, drop=True)
+            lon_z, lat_z = dset.lon_z, dset.lat_z
+        key = f'{lon_z.size}x{lat_z.size}'
+        if key not in plan.grids:
+            with timer('tpxo.locate'):
+                # check the phase of the longitude
+                lons = np.where(plan.lons < 0., plan.lons + 360., plan.lons)
+                x_idx, y_idx, weights, valid = TpxoDB._bilinear_weights(lon_z.values, lat_z.values, lons, plan.lats)
+                plan.grids[key] = {'x_idx': x_idx[valid], 'y_idx': y_idx[valid], 'weights': weights[valid],
+                                   'valid': valid}
+        return plan.grids[key]
+
+    @staticmethod
+    def _bilinear_weights(lon_z, lat_z, lons, lats):
+        """Locate points in a TPXO grid and compute their bilinear interpolation weights.
+
+        Args:
+            lon_z (:obj:`numpy.ndarray`): Sorted longitudes of the grid columns (nx)
+            lat_z (:obj:`numpy.ndarray`): Sorted latitudes of the grid rows (ny)
+            lons (:obj:`numpy.ndarray`): Longitudes of the requested points [0 360]
+            lats (:obj:`numpy.ndarray`): Latitudes of the requested points
+
+        Returns:
+            tuple: The x and y grid indices of the bottom left, top left, bottom right, and top right cell corners
+                of each point (points x 4), the normalized weights of those corners (points x 4), and a mask of the
+                points that are inside the grid (points).
+        """
+        # get bounding indices within the data cube
+        top = np.searchsorted(lat_z, lats, side='right')
+        right = np.searchsorted(lon_z, lons, side='right')
+        valid = (top > 0) & (top < len(lat_z)) & (right > 0) & (right < len(lon_z))
+        top = np.clip(top, 1, len(lat_z) - 1)
+        right = np.clip(right, 1, len(lon_z) - 1)
+        bottom = top - 1
+        left = right - 1
+        # get distance from the bottom left to the requested point
+        dx = (lons - lon_z[left]) / (lon_z[right] - lon_z[left])
+        dy = (lats - lat_z[bottom]) / (lat_z[top] - lat_z[bottom])
+        # calculate weights for bilinear spline
+        weights = np.stack([
+            (1. - dx) * (1. - dy),  # w00 :: bottom left
+            (1. - dx) * dy,         # w01 :: top left
+            dx * (1. - dy),         # w10 :: bottom right
+            dx * dy                 # w11 :: top right
+        ], axis=-1)
+        weights = weights / weights.sum(axis=-1, keepdims=True)
+        x_idx = np.stack([left, left, right, right], axis=-1)
+        y_idx = np.stack([bottom, top, bottom, top], axis=-1)
+        return x_idx, y_idx, weights, valid
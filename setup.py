@@ -19,7 +19,6 @@ install_requires = [
     'netCDF4',
     'numpy',
     'pandas',
-    'pytides>=1.0.0',  # ERDC fork packaged by Aquaveo
     'toolz',
     'xarray',
     'xmsgrid>=6.0.0',
@@ -29,6 +28,9 @@ extras_require = {
     'build': [
         'setuptools',
     ],
+    'parquet': [
+        'pyarrow',
+    ],
     'tests': [],
 }
 
@@ -38,8 +40,10 @@ entry_points = [
     'harmonica = harmonica.cli.main:main',
     'harmonica-constituents = harmonica.cli.main_constituents:main',
     'harmonica-deconstruct = harmonica.cli.main_deconstruct:main',
+    'harmonica-download = harmonica.cli.main_download:main',
     'harmonica-reconstruct = harmonica.cli.main_reconstruct:main',
     'harmonica-resources = harmonica.cli.main_resources:main',
+    'harmonica-serve = harmonica.cli.main_serve:main',
 ]
 
 
@@ -60,7 +64,6 @@ setup(
     packages=['harmonica', 'harmonica.cli'],
     dependency_links=[
         'https://public.aquapi.aquaveo.com/aquaveo/stable'
-        'https://public.aquapi.aquaveo.com/aquaveo/stable/pytides',
         'https://public.aquapi.aquaveo.com/aquaveo/stable/xmsgrid',
     ],
     entry_points={
@@ -0,0 +1,21 @@
+"""Shared fixtures of the tests."""
+
+# 1. Standard Python modules
+
+# 2. Third party modules
+import pytest
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from .synthetic_models import write_models
+
+
+@pytest.fixture(scope='session')
+def synthetic_models():
+    """Get the writer of small synthetic models, for tests that need model files without the licensed data.
+
+    Returns:
+        callable: tests.synthetic_models.write_models, called with the data directory, the models, and the scale
+    """
+    return write_models
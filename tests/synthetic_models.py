@@ -0,0 +1,269 @@
+"""Synthetic tidal model files in the layouts that harmonica.resource.ResourceManager expects.
+
+The files have the same names, dimensions, variables, and types as the licensed and downloaded models, filled with
+smooth synthetic amplitude and phase fields. The TPXO grids and the ADCIRC mesh are the size of the real models
+scaled by a factor, small for the tests and larger for the benchmarks. The LeProvost and FES2014 extractors expect the
+grid sizes of the real models (see their ResourceManager dataset attributes), so those grids are always full size and
+the FES2014 files are compressed like the distributed ones.
+"""
+
+# 1. Standard Python modules
+import os
+
+# 2. Third party modules
+import numpy as np
+import xarray as xr
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica.resource import Adcirc2015Resources, FES2014Resources, LeProvostResources, Tpxo8Resources
+from harmonica.resource import Tpxo9Resources
+
+
+MODELS = ('tpxo9', 'tpxo8', 'leprovost', 'fes2014', 'adcirc2015')
+# Sizes of the scaled models at scale 1: (longitudes, latitudes) of the TPXO grids, nodes of the ADCIRC mesh
+FULL_SIZES = {
+    'tpxo9': (2160, 1081),  # 1/6 degree
+    'tpxo8': ((10800, 5401), (2160, 1081)),  # 1/30 degree and 1/6 degree constituent groups
+    'adcirc2015': 2000000,
+}
+# Compression of the FES2014 variables, quantized to 0.01 centimeters and degrees
+NETCDF_COMPRESSION = {'zlib': True, 'complevel': 1, 'least_significant_digit': 2}
+ADCIRC_DOMAIN = ((-100.0, -55.0), (5.0, 50.0))  # (longitude, latitude) extents of the synthetic ADCIRC mesh
+
+
+def grid_size(size, scale):
+    """Scale a grid size.
+
+    Args:
+        size (tuple(int, int)): Number of longitudes and latitudes at scale 1
+        scale (float): The scale factor
+
+    Returns:
+        tuple(int, int): The number of longitudes and latitudes, at least 8 x 5
+    """
+    return max(int(size[0] * scale), 8), max(int(size[1] * scale) | 1, 5)  # Odd latitudes include the equator
+
+
+def harmonic_field(lon, lat, k, land=True):
+    """Get smooth synthetic real and imaginary tide components.
+
+    The field is a sum of products of functions of longitude and latitude, so the trigonometric functions are only
+    evaluated on the coordinates given. Pass a row of longitudes and a column of latitudes for a grid.
+
+    Args:
+        lon (:obj:`numpy.ndarray`): Longitudes in degrees
+        lat (:obj:`numpy.ndarray`): Latitudes in degrees, broadcastable with lon
+        k (int): Index of the constituent, each constituent gets a different field
+        land (bool, optional): If True, some cells are NaN like the land cells of the models
+
+    Returns:
+        tuple(numpy.ndarray, numpy.ndarray): The real and imaginary components in meters
+    """
+    lon = np.radians(lon)
+    lat = np.radians(lat)
+    cos_lat = np.cos(lat)
+    re = ((k + 1) * 0.1 * np.cos(lon * (k % 3 + 1))) * cos_lat + 0.05 * np.sin(2.0 * lat + k)
+    # sin(a * lon + lat) * cos(lat)
+    im = ((k + 1) * 0.07 * np.sin(lon * (k % 2 + 1))) * (cos_lat * cos_lat)
+    im = im + ((k + 1) * 0.07 * np.cos(lon * (k % 2 + 1))) * (np.sin(lat) * cos_lat)
+    if land:
+        mask = np.sin(lon * 3.0) * np.cos(lat * 4.0) > 0.6
+        re[mask] = np.nan
+        im[mask] = np.nan
+    return re, im
+
+
+def amplitude_phase(re, im):
+    """Convert real and imaginary components to amplitude and phase.
+
+    Args:
+        re (:obj:`numpy.ndarray`): The real components
+        im (:obj:`numpy.ndarray`): The imaginary components
+
+    Returns:
+        tuple(numpy.ndarray, numpy.ndarray): The amplitudes and the phases in degrees [0 360]
+    """
+    return np.hypot(re, im), np.mod(np.degrees(np.arctan2(im, re)), 360.0)
+
+
+def tpxo_con(name):
+    """Get a constituent name as it is stored in the TPXO files.
+
+    Args:
+        name (str): Name of the constituent
+
+    Returns:
+        :obj:`numpy.ndarray`: The lower case, blank padded, 4 character name
+    """
+    return np.array(name.lower().ljust(4).encode(), dtype='S4')
+
+
+def write_tpxo9(model_dir, scale):
+    """Write a synthetic TPXO9 model, all the constituents in one file with (constituent, lon, lat) variables.
+
+    Args:
+        model_dir (str): Directory of the model
+        scale (float): Size of the grid relative to the real model
+    """
+    nx, ny = grid_size(FULL_SIZES['tpxo9'], scale)
+    lon, lat = np.meshgrid((np.arange(nx) + 0.5) * 360.0 / nx, np.linspace(-90.0, 90.0, ny), indexing='ij')
+    cons = sorted(Tpxo9Resources.TPXO9_CONS)
+    h_re = np.empty((len(cons), nx, ny), dtype=np.float32)
+    h_im = np.empty_like(h_re)
+    for k in range(len(cons)):
+        h_re[k], h_im[k] = harmonic_field(lon, lat, k, land=False)
+    dataset = xr.Dataset({
+        'con': ('nc', np.stack([tpxo_con(con) for con in cons])),
+        'lon_z': (('nx', 'ny'), lon),
+        'lat_z': (('nx', 'ny'), lat),
+        'hRe': (('nc', 'nx', 'ny'), h_re),
+        'hIm': (('nc', 'nx', 'ny'), h_im),
+    })
+    path = os.path.join(model_dir, Tpxo9Resources.DEFAULT_RESOURCE_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    dataset.to_netcdf(path)
+
+
+def write_tpxo8(model_dir, scale):
+    """Write a synthetic TPXO8 model, a file per constituent with integer millimeter (lon, lat) variables.
+
+    Args:
+        model_dir (str): Directory of the model
+        scale (float): Size of the grids relative to the real model
+    """
+    for group_idx, (group, size) in enumerate(zip(Tpxo8Resources.TPXO8_CONS, FULL_SIZES['tpxo8'])):
+        nx, ny = grid_size(size, scale)
+        lon = (np.arange(nx) + 0.5) * 360.0 / nx
+        lat = np.linspace(-90.0, 90.0, ny)
+        lon_grid, lat_grid = np.meshgrid(lon, lat, indexing='ij')
+        for k, (con, filename) in enumerate(group.items()):
+            h_re, h_im = harmonic_field(lon_grid, lat_grid, k + group_idx, land=False)
+            xr.Dataset({
+                'con': ((), tpxo_con(con)),
+                'lon_z': ('nx', lon),
+                'lat_z': ('ny', lat),
+                'hRe': (('nx', 'ny'), np.round(h_re * 1000.0).astype(np.int32)),
+                'hIm': (('nx', 'ny'), np.round(h_im * 1000.0).astype(np.int32)),
+            }).to_netcdf(os.path.join(model_dir, filename))
+
+
+def fixed_grid_size(resources):
+    """Get the grid size of a model that the extractor expects.
+
+    Args:
+        resources (:obj:`harmonica.resource.Resources`): The resources of the model
+
+    Returns:
+        tuple(int, int): The number of longitudes and latitudes
+    """
+    atts = resources.dataset_attributes()
+    return atts['num_lons'], atts['num_lats']
+
+
+def write_leprovost(model_dir, scale):
+    """Write a synthetic LeProvost model, all the constituents in one file with centimeter (lat, lon) variables.
+
+    Args:
+        model_dir (str): Directory of the model
+        scale (float): Ignored, the grid is the size of the real model
+    """
+    nx, ny = fixed_grid_size(LeProvostResources())
+    lat = np.linspace(-90.0, 90.0, ny)[:, np.newaxis]
+    lon = -180.0 + np.arange(nx) * 360.0 / nx
+    cons = sorted(LeProvostResources.LEPROVOST_CONS)
+    amplitude = np.empty((len(cons), ny, nx), dtype=np.float32)
+    phase = np.empty_like(amplitude)
+    for k in range(len(cons)):
+        amp, phase[k] = amplitude_phase(*harmonic_field(lon, lat, k))
+        amplitude[k] = amp * 100.0
+    xr.Dataset({
+        'spectrum': ('nc', np.array([con.lower() + '  ' for con in cons], dtype=object)),
+        'amplitude': (('nc', 'lat', 'lon'), amplitude),
+        'phase': (('nc', 'lat', 'lon'), phase),
+    }).to_netcdf(os.path.join(model_dir, LeProvostResources.DEFAULT_RESOURCE_FILE))
+
+
+def write_fes2014(model_dir, scale):
+    """Write a synthetic FES2014 model, a file per constituent with centimeter (lat, lon) variables.
+
+    Args:
+        model_dir (str): Directory of the model
+        scale (float): Ignored, the grids are the size of the real model
+    """
+    nx, ny = fixed_grid_size(FES2014Resources())
+    lon = np.arange(nx) * 360.0 / nx
+    lat = np.linspace(-90.0, 90.0, ny)
+    for k, (_, filename) in enumerate(FES2014Resources.FES2014_CONS.items()):
+        amplitude, phase = amplitude_phase(*harmonic_field(lon, lat[:, np.newaxis], k))
+        xr.Dataset({
+            'amplitude': (('lat', 'lon'), (amplitude * 100.0).astype(np.float32)),
+            'phase': (('lat', 'lon'), phase.astype(np.float32)),
+        }, coords={'lat': lat, 'lon': lon}).to_netcdf(
+            os.path.join(model_dir, filename), encoding={'amplitude': NETCDF_COMPRESSION, 'phase': NETCDF_COMPRESSION}
+        )
+
+
+def write_adcirc2015(model_dir, scale):
+    """Write a synthetic ADCIRC model, a jittered triangulated grid with amplitude and phase node variables.
+
+    Args:
+        model_dir (str): Directory of the model
+        scale (float): Number of mesh nodes relative to the real model
+    """
+    nodes = max(int(FULL_SIZES['adcirc2015'] * scale), 16)
+    (x0, x1), (y0, y1) = ADCIRC_DOMAIN
+    ny = max(int(np.sqrt(nodes * (y1 - y0) / (x1 - x0))), 2)
+    nx = max(nodes // ny, 2)
+    x, y = np.meshgrid(np.linspace(x0, x1, nx), np.linspace(y0, y1, ny), indexing='ij')
+    jitter = 0.2 * min((x1 - x0) / nx, (y1 - y0) / ny)
+    rng = np.random.default_rng(0)
+    x = (x + rng.uniform(-jitter, jitter, x.shape)).ravel()
+    y = (y + rng.uniform(-jitter, jitter, y.shape)).ravel()
+    # Two triangles per grid cell
+    corner = (np.arange(nx - 1)[:, np.newaxis] * ny + np.arange(ny - 1)).ravel()
+    quads = np.stack([corner, corner + ny, corner + ny + 1, corner + 1], axis=-1)
+    tris = np.concatenate([quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]]).astype(np.int32)
+    data = {
+        'x': ('node', x),
+        'y': ('node', y),
+        'element': (('nele', 'nvertex'), tris),
+    }
+    for k, con in enumerate(sorted(Adcirc2015Resources.ADCIRC_CONS)):
+        amplitude, phase = amplitude_phase(*harmonic_field(x, y, k, land=False))
+        data[f'{con}_amplitude'] = ('node', amplitude)
+        data[f'{con}_phase'] = ('node', phase)
+    xr.Dataset(data).to_netcdf(os.path.join(model_dir, Adcirc2015Resources.DEFAULT_RESOURCE_FILE))
+
+
+WRITERS = {
+    'tpxo9': write_tpxo9,
+    'tpxo8': write_tpxo8,
+    'leprovost': write_leprovost,
+    'fes2014': write_fes2014,
+    'adcirc2015': write_adcirc2015,
+}
+
+
+def write_models(data_dir, models=MODELS, scale=0.01, overwrite=False):
+    """Write synthetic models to a data directory, laid out like harmonica.config['data_dir'].
+
+    Args:
+        data_dir (str): The data directory, each model is written to a subdirectory named after the model
+        models (:obj:`list` of :obj:`str`, optional): The models to write
+        scale (float, optional): Size of the grids relative to the real models
+        overwrite (bool, optional): If False, models that already have a directory are left as they are
+
+    Returns:
+        :obj:`list` of :obj:`str`: The models that were written
+    """
+    written = []
+    for model in models:
+        model_dir = os.path.join(data_dir, model)
+        if os.path.isdir(model_dir) and not overwrite:
+            continue
+        os.makedirs(model_dir, exist_ok=True)
+        WRITERS[model](model_dir, scale)
+        written.append(model)
+    return written
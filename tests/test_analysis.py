@@ -0,0 +1,63 @@
+"""Tests the least squares harmonic analysis."""
+
+# 1. Standard Python modules
+
+# 2. Third party modules
+import numpy as np
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica.analysis import harmonic_analysis
+from harmonica.harmonica import Tide
+from harmonica.reconstruction import reconstruct
+
+
+class TestHarmonicAnalysis:
+    """Test the least squares harmonic analysis."""
+
+    NAMES = ['M2', 'S2', 'N2', 'K1', 'O1']
+    AMPLITUDE = np.array([0.8, 0.3, 0.15, 0.25, 0.2])
+    PHASE = np.array([20.0, 95.0, 310.0, 170.0, 250.0])
+
+    def _signal(self, times, offset=0.0):
+        """Reconstruct the water levels of the test constituents.
+
+        Args:
+            times (np.ndarray): The datetime64 times
+            offset (float): The mean water level
+
+        Returns:
+            np.ndarray: The water levels
+        """
+        return reconstruct(self.NAMES, [self.AMPLITUDE], [self.PHASE], times, offset)[:, 0]
+
+    def test_round_trip(self):
+        """Test that analysis recovers the constituents of a reconstructed signal, ignoring missing values."""
+        times = np.arange('2015-01-01', '2015-03-01', np.timedelta64(30, 'm'), dtype='datetime64[m]')
+        water_level = self._signal(times, 0.4)
+        water_level[::13] = np.nan
+        names, amplitude, phase, speed, mean = harmonic_analysis(water_level, times, self.NAMES + ['XX9'])
+        assert names == self.NAMES
+        assert np.allclose(amplitude, self.AMPLITUDE)
+        assert np.allclose(phase, self.PHASE)
+        assert np.allclose(speed, [28.984104, 30.0, 28.43973, 15.041069, 13.943035])
+        assert np.isclose(mean, 0.4)
+
+    def test_num_periods(self):
+        """Test that constituents completing too few periods are not fit."""
+        times = np.arange('2015-01-01', '2015-01-05', np.timedelta64(1, 'h'), dtype='datetime64[h]')
+        names = harmonic_analysis(self._signal(times), times, self.NAMES, n_period=6)[0]
+        assert names == ['M2', 'S2', 'N2']  # 95 hours is less than 6 diurnal periods
+
+    def test_deconstruct_tide(self):
+        """Test the Tide interface to the analysis."""
+        tide = Tide()
+        times = np.arange('2015-01-01', '2015-02-01', np.timedelta64(1, 'h'), dtype='datetime64[h]')
+        water_level = self._signal(times)
+        data = tide.deconstruct_tide(water_level, times.astype(object), cons=self.NAMES).constituents.data
+        assert len(data) == 1
+        assert list(data[0].index) == self.NAMES
+        assert list(data[0].columns) == ['amplitude', 'phase', 'speed']
+        assert np.allclose(data[0].amplitude.values, self.AMPLITUDE)
+        assert np.allclose(data[0].phase.values, np.where(self.PHASE > 180.0, self.PHASE - 360.0, self.PHASE))
@@ -0,0 +1,116 @@
+"""Tests the vectorized astronomical arguments."""
+
+# 1. Standard Python modules
+import datetime
+import os
+
+# 2. Third party modules
+import numpy as np
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import config
+from harmonica.astronomy import (equilibrium_arguments, nodal_corrections, nodal_factors, NODAL_TABLE_FILE, NodalTable,
+                                 V_COEFFICIENTS)
+from harmonica.tidal_database import NOAA_SPEEDS
+
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestAstronomy:
+    """Test the vectorized astronomical arguments."""
+
+    # tide_fac.f output files and the start and length in days of their runs
+    TIDE_FAC_CASES = [
+        ('2015040700_10day', datetime.datetime(2015, 4, 7, 0), 10),
+        ('2015040700_5day', datetime.datetime(2015, 4, 7, 0), 5),
+        ('1980072005_20day', datetime.datetime(1980, 7, 20, 5), 20),
+        # tide_fac.f incorrectly assumes 2100 is a leap year, so that case is not compared.
+        ('2101123020_2day', datetime.datetime(2101, 12, 30, 20), 2),
+    ]
+
+    @staticmethod
+    def _read_tide_fac(case_name):
+        """Read the nodal factors and equilibrium arguments written by tide_fac.f.
+
+        Args:
+            case_name (str): Name of the test case
+
+        Returns:
+            tuple(list, np.ndarray, np.ndarray): The constituent names, nodal factors, and equilibrium arguments
+        """
+        names, factors, eq_args = [], [], []
+        with open(os.path.join(TEST_DIR, f'{case_name}.tide_fac.out')) as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) == 3 and fields[0] in NOAA_SPEEDS:
+                    names.append(fields[0])
+                    factors.append(float(fields[1]))
+                    eq_args.append(float(fields[2]))
+        return names, np.array(factors), np.array(eq_args)
+
+    def test_tide_fac(self):
+        """Test all the tide_fac.f cases in one vectorized call."""
+        names = self._read_tide_fac(self.TIDE_FAC_CASES[0][0])[0]
+        starts = [start for _, start, _ in self.TIDE_FAC_CASES]
+        middles = [start + datetime.timedelta(days=days / 2) for _, start, days in self.TIDE_FAC_CASES]
+        factors = nodal_factors(names, middles)
+        eq_args = equilibrium_arguments(names, starts, middles)
+        assert factors.shape == eq_args.shape == (len(self.TIDE_FAC_CASES), len(names))
+        for i, (case_name, _, _) in enumerate(self.TIDE_FAC_CASES):
+            case_names, case_factors, case_eq_args = self._read_tide_fac(case_name)
+            assert case_names == names
+            assert np.allclose(factors[i], case_factors, atol=1.0e-5)
+            eq_arg_diff = (eq_args[i] - case_eq_args + 180.0) % 360.0 - 180.0
+            assert np.all(np.abs(eq_arg_diff) < 0.02)  # tide_fac.f is single precision
+
+    def test_arrays(self):
+        """Test that arrays of times give the same values as one time at a time, with unsupported constituents."""
+        names = ['M2', 'k1', 'XX9', 'L2']
+        times = np.arange('1999-12-31T22', '2000-01-02T03', np.timedelta64(1, 'h'), dtype='datetime64[h]')
+        middles = times + np.timedelta64(5, 'D')
+        factors = nodal_factors(names, times)
+        eq_args = equilibrium_arguments(names, times, middles)
+        assert factors.shape == eq_args.shape == (len(times), 4)
+        assert np.isnan(factors[:, 2]).all() and np.isnan(eq_args[:, 2]).all()
+        assert np.all(factors[:, 3] == 0.0)
+        assert np.all((eq_args[:, [0, 1, 3]] >= 0.0) & (eq_args[:, [0, 1, 3]] < 360.0))
+        for i in (0, 3, len(times) - 1):
+            single = [times[i].astype(datetime.datetime)]
+            assert np.array_equal(nodal_factors(names, single)[0], factors[i], equal_nan=True)
+            single_middle = [middles[i].astype(datetime.datetime)]
+            assert np.array_equal(equilibrium_arguments(names, single, single_middle)[0], eq_args[i], equal_nan=True)
+
+    def test_nodal_table(self, monkeypatch, tmp_path):
+        """Test that the nodal table is built once, saved, and interpolates within its error bound."""
+        monkeypatch.setitem(config, 'data_dir', str(tmp_path))
+        monkeypatch.setitem(config, 'nodal_table', True)
+        monkeypatch.setattr(NodalTable, 'tables', {})
+        table = NodalTable.get()
+        assert (tmp_path / NODAL_TABLE_FILE).is_file()
+        assert NodalTable.get() is table
+        loaded = NodalTable.load(str(tmp_path / NODAL_TABLE_FILE))
+        assert loaded.names == table.names == list(V_COEFFICIENTS)
+        assert np.array_equal(loaded.corrections, table.corrections)
+
+        # Times every 13 hours over a full nodal cycle, plus times before and after the table
+        times = np.arange('1990-01-01', '2010-01-01', np.timedelta64(13, 'h'), dtype='datetime64[h]')
+        times = np.concatenate([np.array(['1850-06-01T05', '2150-06-01T05'], dtype='datetime64[h]'), times])
+        names = list(V_COEFFICIENTS) + ['XX9']
+        factors, corrections = table.lookup(names, times)
+        exact_factors = nodal_factors(names, times)
+        exact_corrections = nodal_corrections(names, times)
+        assert np.isnan(factors[:, -1]).all() and np.isnan(corrections[:, -1]).all()
+        assert np.allclose(factors[:2], exact_factors[:2], atol=0.0, rtol=1.0e-12, equal_nan=True)
+        assert np.nanmax(np.abs(factors - exact_factors)) < 5.0e-6
+        correction_diff = (corrections - exact_corrections + 180.0) % 360.0 - 180.0
+        assert np.nanmax(np.abs(correction_diff[:2])) < 1.0e-9
+        assert np.nanmax(np.abs(correction_diff)) < 0.005
+
+        # The table is used by the equilibrium arguments when enabled
+        eq_args = equilibrium_arguments(names, times, times)
+        monkeypatch.setitem(config, 'nodal_table', False)
+        eq_arg_diff = (eq_args - equilibrium_arguments(names, times, times) + 180.0) % 360.0 - 180.0
+        assert np.nanmax(np.abs(eq_arg_diff)) < 0.005
@@ -0,0 +1,51 @@
+"""Tests the synthetic models and the benchmark runner."""
+
+# 1. Standard Python modules
+
+# 2. Third party modules
+import numpy as np
+import pytest
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import config
+from harmonica.resource import Tpxo9Resources
+from harmonica.tidal_constituents import Constituents
+from .synthetic_models import amplitude_phase, harmonic_field
+
+
+class TestBenchmarks:
+    """Test the synthetic models and the benchmark runner."""
+
+    def test_tpxo9_fixture(self, tmp_path, monkeypatch, synthetic_models):
+        """Test that a synthetic TPXO9 model is extracted like the real one."""
+        assert synthetic_models(str(tmp_path), ['tpxo9'], scale=0.01) == ['tpxo9']
+        assert synthetic_models(str(tmp_path), ['tpxo9'], scale=0.01) == []  # Existing models are kept
+        monkeypatch.setitem(config, 'pre_existing_data_dir', str(tmp_path))
+        monkeypatch.setitem(config, 'data_dir', str(tmp_path))
+        # Grid nodes of the 21 x 11 grid, where the interpolated value is the node value
+        lon = (np.array([3, 10]) + 0.5) * 360.0 / 21
+        lat = np.array([-36.0, 18.0])
+        constituents = Constituents('tpxo9')
+        data = constituents.get_components([(lat[0], lon[0]), (lat[1], lon[1] - 360.0)], ['M2'], positive_ph=True)
+        constituents.close()
+        k = sorted(Tpxo9Resources.TPXO9_CONS).index('M2')
+        h_re, h_im = harmonic_field(lon, lat, k, land=False)
+        amplitude, phase = amplitude_phase(h_re, -h_im)  # TPXO phases are lags, the negated angle of hRe + i hIm
+        np.testing.assert_allclose(data.amplitude[:, 0], amplitude, rtol=1e-5)
+        np.testing.assert_allclose(data.phase[:, 0], phase, atol=1e-3)
+
+    def test_run(self, tmp_path, monkeypatch, synthetic_models):
+        """Test that the benchmarks report their throughput."""
+        run = pytest.importorskip('benchmarks.run')  # The benchmarks are not packaged
+        synthetic_models(str(tmp_path), ['tpxo9'], scale=0.01)
+        monkeypatch.setitem(config, 'pre_existing_data_dir', str(tmp_path))
+        monkeypatch.setitem(config, 'data_dir', str(tmp_path))
+        rows = [run.bench_get_components('tpxo9', 10, 1), run.bench_deconstruct(2, 1)]
+        assert [row['benchmark'] for row in rows] == ['get_components', 'deconstruct_tide']
+        assert rows[0]['unit'] == 'points/s' and rows[0]['throughput'] > 0.0
+        assert rows[1]['times'] == 48
+        report = run.format_report(rows).splitlines()
+        assert len(report) == 4
+        assert report[0].split()[:2] == ['benchmark', 'model']
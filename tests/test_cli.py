@@ -0,0 +1,158 @@
+"""Tests the CLI helpers."""
+
+# 1. Standard Python modules
+import io
+
+# 2. Third party modules
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica.cli import main_constituents, main_deconstruct, main_reconstruct
+from harmonica.cli.common import output_format, read_points, write_netcdf, write_parquet
+
+
+class TestReadPoints:
+    """Test reading batches of point locations."""
+
+    def test_formats(self, tmp_path, monkeypatch):
+        """Test CSV and whitespace delimited files with a header, comments, and stdin."""
+        path = tmp_path / 'points.csv'
+        path.write_text('# points\nlat,lon,name\n38.375789,-74.943915,a\n\n42.32 -70.0\n-10,\t350 c\n')
+        assert read_points(str(path)) == [(38.375789, -74.943915), (42.32, -70.0), (-10.0, 350.0)]
+        monkeypatch.setattr('sys.stdin', io.StringIO('1.5 2.5\n3 4\n'))
+        assert read_points('-') == [(1.5, 2.5), (3.0, 4.0)]
+
+    def test_invalid(self, tmp_path):
+        """Test that a bad line after the header is an error."""
+        path = tmp_path / 'points.txt'
+        path.write_text('lat lon\n1.0 2.0\n3.0\n')
+        with pytest.raises(RuntimeError, match='line 3'):
+            read_points(str(path))
+
+    def test_location_required(self):
+        """Test that the constituents command needs a location or a points file."""
+        args = main_constituents.parse_args(['-C', 'M2'])
+        assert args.lat is None and args.points is None
+        with pytest.raises(RuntimeError):
+            main_constituents.execute(args)
+
+
+class TestReadSignal:
+    """Test reading the signal of the deconstruct command."""
+
+    TIMES = np.arange('2015-01-01T00', '2015-01-01T05', np.timedelta64(1, 'h'), dtype='datetime64[ns]')
+    WATER_LEVEL = [0.5, 0.7, -0.25, 0.0, 1.5]
+
+    def _read(self, tmp_path, text, args):
+        """Write a signal file and read it.
+
+        Args:
+            tmp_path (pathlib.Path): Directory to write the file to
+            text (str): Contents of the file
+            args (list[str]): The command line arguments after the file name
+
+        Returns:
+            tuple(pandas.Series, pandas.Series): The datetimes and the water levels
+        """
+        path = tmp_path / 'signal.csv'
+        path.write_text(text)
+        return main_deconstruct.read_signal(main_deconstruct.parse_args([str(path)] + args))
+
+    def test_format(self, tmp_path):
+        """Test a datetime format, columns by name, and only reading the needed columns."""
+        lines = [f'2015-01-01 0{i}:00,{wl},x' for i, wl in enumerate(self.WATER_LEVEL)]
+        text = 'Date Time,Water Level,Quality\n' + '\n'.join(lines)
+        times, water_level = self._read(tmp_path, text, ['--columns', 'Date Time', 'Water Level',
+                                                         '--datetime_format', '%Y-%m-%d %H:%M'])
+        assert np.array_equal(times.to_numpy(), self.TIMES)
+        assert water_level.dtype == float and water_level.tolist() == self.WATER_LEVEL
+
+    def test_fast_paths(self, tmp_path):
+        """Test the ISO 8601 and epoch seconds formats and split date and time columns by index."""
+        lines = [f'2015-01-01T0{i}:00:00Z,{wl}' for i, wl in enumerate(self.WATER_LEVEL)]
+        times, _ = self._read(tmp_path, 'time,wl\n' + '\n'.join(lines), ['--datetime_format', 'ISO8601'])
+        assert np.array_equal(times.dt.tz_localize(None).to_numpy(), self.TIMES)
+
+        lines = [f'{1420070400 + 3600 * i};{wl}' for i, wl in enumerate(self.WATER_LEVEL)]
+        times, water_level = self._read(tmp_path, '\n'.join(lines), ['--datetime_format', 'epoch', '--header', 'None',
+                                                                     '--sep', ';'])
+        assert np.array_equal(times.to_numpy(), self.TIMES)
+        assert water_level.tolist() == self.WATER_LEVEL
+
+        lines = [f'01/01/2015,0{i}:00,{wl}' for i, wl in enumerate(self.WATER_LEVEL)]
+        args = ['--columns', '0', '1', '2', '--datetime_format', '%m/%d/%Y %H:%M']
+        times, _ = self._read(tmp_path, 'date,time,wl\n' + '\n'.join(lines), args)
+        assert np.array_equal(times.to_numpy(), self.TIMES)
+
+    def test_errors(self, tmp_path):
+        """Test that bad columns and formats are reported."""
+        with pytest.raises(RuntimeError, match='not recognized'):
+            self._read(tmp_path, 'a,b\n2015-01-01 00:00:00,1.0\n', ['--columns', 'a', 'c'])
+        with pytest.raises(RuntimeError, match='does not match'):
+            self._read(tmp_path, 'a,b\n01/01/2015,1.0\n', [])
+
+
+class TestOutputFormat:
+    """Test the binary output formats of the commands."""
+
+    def test_inferred(self):
+        """Test that the format is inferred from the output file extension unless it is given."""
+        def fmt(args):
+            return output_format(main_reconstruct.parse_args(['38.375789', '-74.943915'] + args))
+
+        assert fmt([]) == 'csv'
+        assert fmt(['-O', 'out.txt']) == 'csv'
+        assert fmt(['-O', 'out.NC']) == 'netcdf'
+        assert fmt(['-O', 'out.parquet']) == 'parquet'
+        assert fmt(['-O', 'out.nc', '--format', 'csv']) == 'csv'
+        assert fmt(['-O', 'out.bin', '--format', 'netcdf']) == 'netcdf'
+        with pytest.raises(RuntimeError, match='-O'):
+            fmt(['--format', 'parquet'])
+
+    def test_netcdf(self, tmp_path):
+        """Test that NetCDF output is compressed and keeps the types and coordinates."""
+        times = np.arange('2015-01-01', '2015-01-02', np.timedelta64(1, 'h'), dtype='datetime64[ns]')
+        water_level = xr.DataArray(np.zeros((len(times), 1)), dims=('time', 'node'), name='water_level',
+                                   coords={'time': times, 'lat': ('node', [38.375789])})
+        path = str(tmp_path / 'water_level.nc')
+        write_netcdf(water_level.to_dataset(), path)
+        with xr.open_dataset(path) as dataset:
+            assert dataset.water_level.encoding['zlib']
+            assert np.array_equal(dataset.time.values, times)
+            assert dataset.lat.values.tolist() == [38.375789]
+
+    def test_parquet(self, tmp_path):
+        """Test Parquet output, it needs pyarrow."""
+        frame = pd.DataFrame({'amplitude': [0.5, 0.25], 'phase': [10.0, -20.0]},
+                             index=pd.Index(['M2', 'K1'], name='constituent'))
+        path = str(tmp_path / 'constituents.parquet')
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            with pytest.raises(RuntimeError, match='pyarrow'):
+                write_parquet(frame, path)
+        else:
+            write_parquet(frame, path)
+            assert pd.read_parquet(path).equals(frame)
+
+
+class TestProfile:
+    """Test the --profile option of the commands."""
+
+    def test_report(self, tmp_path, capsys):
+        """Test that the timings of the stages are printed to stderr."""
+        times = np.arange('2015-01-01', '2015-01-11', np.timedelta64(1, 'h'), dtype='datetime64[s]')
+        hours = np.arange(len(times), dtype=float)
+        path = tmp_path / 'signal.csv'
+        signal = pd.DataFrame({'time': times.astype(str), 'wl': np.cos(np.radians(28.9841042 * hours))})
+        signal.to_csv(path, index=False)
+        main_deconstruct.main([str(path), '-C', 'M2', '--datetime_format', 'ISO8601', '--profile'])
+        captured = capsys.readouterr()
+        assert 'tide.analysis' not in captured.out
+        stages = [line.split()[0] for line in captured.err.splitlines()[1:] if line]
+        assert stages == ['tide.analysis', 'total']
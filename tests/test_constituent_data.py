@@ -0,0 +1,80 @@
+"""Tests the columnar constituent data container."""
+
+# 1. Standard Python modules
+
+# 2. Third party modules
+import numpy as np
+import pandas as pd
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica.constituent_data import ConstituentData
+
+
+class TestConstituentData:
+    """Test the columnar constituent data container."""
+
+    NAMES = ['M2', 'S2', 'K1']
+
+    def _make_data(self):
+        """Build a container with three points.
+
+        Returns:
+            ConstituentData: The container
+        """
+        amplitude = np.arange(9, dtype=float).reshape(3, 3)
+        phase = amplitude * 10.0
+        phase[1, 2] = np.nan
+        return ConstituentData(self.NAMES, amplitude, phase, [28.984104, 30.0, 15.041069])
+
+    def test_legacy_frames(self):
+        """Test that the per point DataFrames are built lazily from the arrays."""
+        data = self._make_data()
+        assert data._frames is None
+        assert len(data) == 3
+        frame = data[1]
+        assert list(frame.index) == self.NAMES
+        assert list(frame.columns) == ['amplitude', 'phase', 'speed']
+        assert frame.loc['S2', 'amplitude'] == 4.0
+        assert np.isnan(frame.loc['K1', 'phase'])
+        assert frame.loc['K1', 'speed'] == 15.041069
+        assert data.data is data.data  # Built once and cached
+
+    def test_from_frames(self):
+        """Test round tripping through the legacy DataFrames, including points with different constituents."""
+        data = self._make_data()
+        other = ConstituentData.from_frames(data.data)
+        assert other.names == self.NAMES
+        assert np.array_equal(other.amplitude, data.amplitude)
+        assert np.array_equal(other.phase, data.phase, equal_nan=True)
+        assert np.array_equal(other.speed, data.speed)
+
+        frames = [
+            pd.DataFrame({'amplitude': [1.0], 'phase': [2.0], 'speed': [3.0]}, index=['M2']),
+            pd.DataFrame({'amplitude': [4.0], 'phase': [5.0]}, index=['O1']),
+        ]
+        other = ConstituentData.from_frames(frames)
+        assert other.names == ['M2', 'O1']
+        assert np.array_equal(other.amplitude, [[1.0, np.nan], [np.nan, 4.0]], equal_nan=True)
+        assert np.array_equal(other.speed, [[3.0, np.nan], [np.nan, np.nan]], equal_nan=True)
+        assert other.data[1] is frames[1]
+
+    def test_conversions(self):
+        """Test converting to an xarray Dataset and a long format DataFrame."""
+        data = self._make_data()
+        dset = data.to_xarray()
+        assert dset.amplitude.dims == ('point', 'constituent')
+        assert list(dset.constituent.values) == self.NAMES
+        assert float(dset.amplitude.sel(point=2, constituent='S2')) == 7.0
+        frame = data.to_frame()
+        assert len(frame) == 9
+        assert frame.loc[(2, 'S2'), 'amplitude'] == 7.0
+        assert frame.loc[(0, 'K1'), 'speed'] == 15.041069
+
+    def test_empty(self):
+        """Test the empty container returned on error."""
+        data = ConstituentData()
+        assert len(data) == 0
+        assert data.data == []
+        assert data.to_xarray().amplitude.shape == (0, 0)
@@ -0,0 +1,59 @@
+"""Tests the array-backed constituent registry."""
+
+# 1. Standard Python modules
+
+# 2. Third party modules
+import numpy as np
+import pytest
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import constituent_registry as registry
+from harmonica.astronomy import V_TABLE
+from harmonica.tidal_database import NOAA_SPEEDS
+
+
+class TestConstituentRegistry:
+    """Test the array-backed constituent registry."""
+
+    # Rates of change of the astronomical arguments of the Doodson numbers (degrees/hour): tau, s, h, p, N', p1
+    DOODSON_RATES = np.array([14.4920521, 0.5490165, 0.0410686, 0.0046418, 0.0022064, 0.0000020])
+
+    def test_ids(self):
+        """Test looking up constituent ids by name."""
+        con_ids = registry.ids(['M2', 'k1', 'LAMBDA2', 'XX9', 'RHO'])
+        assert con_ids.tolist() == [0, 3, registry.IDS['LAM2'], -1, registry.IDS['RHO']]
+        assert registry.ids(['LAMBDA2', 'rho1', 'LAM2'], aliases=False).tolist() == [-1, -1, registry.IDS['LAM2']]
+        assert registry.ids(np.array([5, 2])).tolist() == [5, 2]
+        assert registry.ids([]).shape == (0,)
+        assert [registry.NAMES[con_id] for con_id in registry.ids(registry.NAMES)] == list(registry.NAMES)
+
+    def test_take(self):
+        """Test gathering constituent metadata with ids, unknown constituents are NaN."""
+        con_ids = registry.ids(['S2', 'XX9', 'O1'])
+        assert np.array_equal(registry.take(registry.SPEED, con_ids), [30.0, np.nan, 13.943035], equal_nan=True)
+        table = np.arange(2 * registry.NUM_CONSTITUENTS).reshape(2, -1)
+        assert registry.take(table, con_ids, 0.0).tolist() == [[1, 0, 5], [38, 0, 42]]
+        with pytest.raises(ValueError):
+            registry.SPEED[0] = 0.0  # The metadata is shared, it is read-only.
+
+    def test_noaa_speeds(self):
+        """Test that the NOAA_SPEEDS compatibility dictionary matches the registry."""
+        assert set(NOAA_SPEEDS) == set(registry.NAMES)
+        for con_id, name in enumerate(registry.NAMES):
+            assert NOAA_SPEEDS[name] == (registry.SPEED[con_id], registry.AMPLITUDE[con_id],
+                                         registry.FREQUENCY[con_id], registry.ETRF[con_id])
+        assert np.allclose(registry.FREQUENCY, np.radians(registry.SPEED) / 3600.0, rtol=1.0e-6)
+
+    def test_doodson(self):
+        """Test that the Doodson numbers agree with the speeds and the equilibrium argument coefficients."""
+        assert registry.DOODSON.shape == (registry.NUM_CONSTITUENTS, 6)
+        assert np.allclose(registry.DOODSON @ self.DOODSON_RATES, registry.SPEED, atol=2.0e-5)
+        # V is in terms of T = tau + s - h instead of tau. tide_fac.f puts the perigee term of M1 in its nodal
+        # correction.
+        tau, s, h, p, _, p1 = registry.DOODSON.T
+        v_coefs = np.stack([tau, s - tau, h + tau, p, p1], axis=-1)
+        m1 = registry.IDS['M1']
+        expected = np.delete(v_coefs, m1, axis=0)
+        assert np.array_equal(np.delete(V_TABLE[:5].T, m1, axis=0), expected)
@@ -0,0 +1,252 @@
+"""Tests the streaming, resumable downloads against a local HTTP server."""
+
+# 1. Standard Python modules
+import hashlib
+import http.client
+import http.server
+import io
+import os
+import tarfile
+import threading
+import time
+import zipfile
+
+# 2. Third party modules
+import pytest
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import config
+from harmonica.cli.main_download import execute, parse_args
+from harmonica.download import ChecksumError, DownloadError, DownloadProgress, fetch
+from harmonica.resource import Adcirc2015Resources, FES2014Resources, LeProvostResources, ResourceManager
+from harmonica.resource import Tpxo9Resources
+
+
+CONTENT = bytes(range(256)) * 4096  # 1 MB
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the files of the server, honoring Range requests and optionally dropping connections early."""
+
+    def do_GET(self):  # noqa: N802
+        """Send a file, or the part of it after the start of a Range request."""
+        self.server.requests.append(self.headers.get('Range'))
+        # Count the request while the client waits for the response, it holds its connection slot until then. The
+        # client may release the slot before this handler returns, once it has read the whole file.
+        with self.server.lock:
+            self.server.active += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.active -= 1
+        self._send()
+
+    def _send(self):
+        """Send the requested file."""
+        data = self.server.files.get(self.path.lstrip('/'))
+        if data is None:
+            self.send_error(404)
+            return
+        start = 0
+        if self.headers.get('Range') and self.server.ranges:
+            start = int(self.headers['Range'].split('=')[1].split('-')[0])
+            if start >= len(data):
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(data) - start))
+        self.end_headers()
+        if self.server.drops:  # Send part of the file and drop the connection
+            self.server.drops -= 1
+            self.wfile.write(data[start:start + self.server.drop_after])
+            self.close_connection = True
+            return
+        self.wfile.write(data[start:])
+
+    def log_message(self, *args):
+        """Do not log the requests."""
+        pass
+
+
+@pytest.fixture
+def server():
+    """Start a local HTTP server.
+
+    Yields:
+        http.server.HTTPServer: The server, add files to its files dict
+    """
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    httpd.files = {}
+    httpd.requests = []
+    httpd.ranges = True
+    httpd.drops = 0
+    httpd.drop_after = 0
+    httpd.delay = 0.0
+    httpd.lock = threading.Lock()
+    httpd.active = 0
+    httpd.max_active = 0
+    httpd.url = f'http://127.0.0.1:{httpd.server_address[1]}/'
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestFetch:
+    """Test downloading single files."""
+
+    def test_stream(self, server, tmp_path):
+        """Test that a file is streamed in chunks with progress and verified."""
+        server.files['a.nc'] = CONTENT
+        events = []
+        path = fetch(server.url + 'a.nc', str(tmp_path / 'a.nc'), hashlib.sha256(CONTENT).hexdigest(),
+                     progress=lambda done, total: events.append((done, total)), chunk_size=100000)
+        assert open(path, 'rb').read() == CONTENT
+        assert len(events) == 11
+        assert events[-1] == (len(CONTENT), len(CONTENT))
+        assert os.listdir(str(tmp_path)) == ['a.nc']
+
+    def test_resume(self, server, tmp_path):
+        """Test that dropped connections are resumed with Range requests."""
+        server.files['a.nc'] = CONTENT
+        server.drops = 2
+        server.drop_after = 300000
+        path = fetch(server.url + 'a.nc', str(tmp_path / 'a.nc'))
+        assert open(path, 'rb').read() == CONTENT
+        assert server.requests == [None, 'bytes=300000-', 'bytes=600000-']
+
+    def test_resume_next_call(self, server, tmp_path):
+        """Test that a partial file left by an earlier call is resumed, or restarted if ranges are not supported."""
+        server.files['a.nc'] = CONTENT
+        path = str(tmp_path / 'a.nc')
+        with open(path + '.part', 'wb') as f:
+            f.write(CONTENT[:1000])
+        fetch(server.url + 'a.nc', path)
+        assert open(path, 'rb').read() == CONTENT
+        assert server.requests == ['bytes=1000-']
+
+        server.ranges = False
+        with open(path + '.part', 'wb') as f:
+            f.write(b'x' * 1000)
+        fetch(server.url + 'a.nc', path)
+        assert open(path, 'rb').read() == CONTENT
+
+    def test_failures(self, server, tmp_path):
+        """Test checksum mismatches and connections that keep dropping."""
+        server.files['a.nc'] = CONTENT
+        path = str(tmp_path / 'a.nc')
+        with pytest.raises(ChecksumError):
+            fetch(server.url + 'a.nc', path, sha256='0' * 64)
+        assert os.listdir(str(tmp_path)) == []
+
+        server.drops = 3
+        server.drop_after = 1000
+        with pytest.raises(http.client.IncompleteRead):
+            fetch(server.url + 'a.nc', path, retries=2)
+        assert not os.path.exists(path)
+        assert os.path.getsize(path + '.part') == 3000  # Resumed by the next call
+        fetch(server.url + 'a.nc', path)
+        assert open(path, 'rb').read() == CONTENT
+
+
+class TestDownloadModel:
+    """Test downloading the resources of the models."""
+
+    def test_uncompressed(self, server, tmp_path, monkeypatch):
+        """Test a model whose resources are downloaded as they are."""
+        server.files['all_adcirc.nc'] = CONTENT
+        atts = {'url': server.url, 'archive': None, 'checksums': {'all_adcirc.nc': hashlib.sha256(CONTENT).hexdigest()}}
+        monkeypatch.setattr(Adcirc2015Resources, 'resource_attributes', lambda self: atts)
+        events = []
+        resource_dir = ResourceManager('adcirc2015').download_model(str(tmp_path), progress=lambda *e: events.append(e))
+        assert open(os.path.join(resource_dir, 'all_adcirc.nc'), 'rb').read() == CONTENT
+        assert events[-1] == ('all_adcirc.nc', len(CONTENT), len(CONTENT))
+
+    def test_archives(self, server, tmp_path, monkeypatch):
+        """Test models whose resources are downloaded in zip and gzipped tar archives."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('leprovost_tidal_db.nc', CONTENT)
+        server.files['leprovost_tidal_db.zip'] = buffer.getvalue()
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+            for name in ('tpxo9_netcdf/h_tpxo9.v1.nc', 'tpxo9_netcdf/u_tpxo9.v1.nc'):
+                info = tarfile.TarInfo(name)
+                info.size = len(CONTENT)
+                archive.addfile(info, io.BytesIO(CONTENT))
+        server.files['tpxo9.tar.gz'] = buffer.getvalue()
+        monkeypatch.setattr(LeProvostResources, 'resource_attributes',
+                            lambda self: {'url': server.url + 'leprovost_tidal_db.zip', 'archive': 'zip'})
+        monkeypatch.setattr(Tpxo9Resources, 'resource_attributes',
+                            lambda self: {'url': server.url + 'tpxo9.tar.gz', 'archive': 'gz'})
+
+        resource_dir = ResourceManager('leprovost').download_model(str(tmp_path / 'leprovost'))
+        assert os.listdir(resource_dir) == ['leprovost_tidal_db.nc']
+        assert open(os.path.join(resource_dir, 'leprovost_tidal_db.nc'), 'rb').read() == CONTENT
+
+        resource_dir = ResourceManager('tpxo9').download_model(str(tmp_path / 'tpxo9'))
+        # Only the elevation file is extracted
+        assert os.listdir(resource_dir) == ['tpxo9_netcdf']
+        assert os.listdir(os.path.join(resource_dir, 'tpxo9_netcdf')) == ['h_tpxo9.v1.nc']
+
+
+class TestConcurrentDownloads:
+    """Test downloading the resources of a model at the same time."""
+
+    @pytest.fixture
+    def fes2014(self, server, monkeypatch):
+        """Serve the FES2014 resources.
+
+        Returns:
+            dict: The content of each resource
+        """
+        files = {name: name.encode() * 10000 for name in FES2014Resources.FES2014_CONS.values()}
+        server.files.update(files)
+        server.delay = 0.02
+        monkeypatch.setattr(FES2014Resources, 'resource_attributes', lambda self: {'url': server.url, 'archive': None})
+        monkeypatch.setitem(config, 'max_host_connections', 2)
+        return files
+
+    def test_jobs(self, fes2014, server, tmp_path):
+        """Test that the resources are downloaded concurrently within the connection limit of the host."""
+        progress = DownloadProgress()
+        resource_dir = ResourceManager('fes2014').download_model(str(tmp_path), progress=progress, jobs=8)
+        assert sorted(os.listdir(resource_dir)) == sorted(fes2014)
+        assert server.max_active == 2
+        assert len(progress.resources) == len(fes2014)
+        assert progress.done == progress.total == sum(len(data) for data in fes2014.values())
+        assert progress.report() == f'{len(fes2014)} resource(s), {progress.total / 1.0e6:.1f} of ' \
+                                    f'{progress.total / 1.0e6:.1f} MB'
+
+    def test_errors(self, fes2014, server, tmp_path):
+        """Test that all the failures are reported after the other resources are downloaded."""
+        del server.files['m2.nc']
+        del server.files['k1.nc']
+        with pytest.raises(DownloadError) as error:
+            ResourceManager('fes2014').download_model(str(tmp_path), jobs=4)
+        assert sorted(error.value.errors) == ['k1.nc', 'm2.nc']
+        assert len(os.listdir(str(tmp_path))) == len(fes2014) - 2
+
+    def test_get_datasets(self, fes2014, server, tmp_path, monkeypatch):
+        """Test that the missing resources of a query are downloaded together."""
+        monkeypatch.setitem(config, 'pre_existing_data_dir', '')
+        monkeypatch.setitem(config, 'data_dir', str(tmp_path))
+        manager = ResourceManager('fes2014')
+        monkeypatch.setattr(manager.pool, 'acquire', lambda paths: [None] * len(paths))
+        manager.get_datasets(['M2', 'K1', 'S2'])
+        assert sorted(os.listdir(str(tmp_path / 'fes2014'))) == ['k1.nc', 'm2.nc', 's2.nc']
+
+    def test_cli(self, fes2014, tmp_path, monkeypatch, capsys):
+        """Test the download command's --jobs option."""
+        monkeypatch.setitem(config, 'data_dir', str(tmp_path))
+        args = parse_args(['fes2014', '--jobs', '3'])
+        assert args.jobs == 3
+        execute(args)
+        assert len(os.listdir(str(tmp_path / 'fes2014'))) == len(fes2014)
+        assert f'{len(fes2014)} resource(s)' in capsys.readouterr().err
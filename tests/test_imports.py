@@ -0,0 +1,80 @@
+"""Tests that heavy dependencies and model backends are only imported when they are used."""
+
+# 1. Standard Python modules
+import json
+import os
+import subprocess
+import sys
+
+# 2. Third party modules
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+import harmonica
+
+
+HEAVY_MODULES = ['numpy', 'pandas', 'xarray', 'xms.grid', 'urllib.request', 'harmonica.adcirc_database',
+                 'harmonica.leprovost_database', 'harmonica.tpxo_database', 'harmonica.mesh_index']
+# Seconds spent running the modules of harmonica imported by the CLI, about 0.015 seconds. The ceiling is generous so
+# a loaded test runner does not fail the test, a heavy dependency imported at the top of a module still exceeds it.
+CLI_IMPORT_BUDGET = 0.25
+
+
+def _run(args):
+    """Run a new interpreter that imports the harmonica package being tested.
+
+    Args:
+        args (list[str]): The interpreter arguments
+
+    Returns:
+        subprocess.CompletedProcess: The finished process
+    """
+    env = dict(os.environ)
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(harmonica.__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_dir, env.get('PYTHONPATH')]))
+    return subprocess.run([sys.executable] + args, capture_output=True, text=True, check=True, env=env)
+
+
+def _loaded_modules(code):
+    """Run code in a new interpreter and get the heavy modules it imported.
+
+    Args:
+        code (str): The Python code to run
+
+    Returns:
+        list[str]: The modules of HEAVY_MODULES that were imported
+    """
+    script = f'{code}\nimport json, sys\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))'
+    output = _run(['-c', script]).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+class TestImports:
+    """Test that heavy dependencies and model backends are only imported when they are used."""
+
+    def test_cli_import_budget(self):
+        """Test the import time of the CLI, measured by the interpreter's import profiler."""
+        stderr = _run(['-X', 'importtime', '-c', 'import harmonica.cli.main\nimport xarray']).stderr
+        # Lines are "import time: self [us] | cumulative [us] | module", indented by the depth of the import.
+        times = {}
+        for line in stderr.splitlines():
+            if line.startswith('import time:') and '|' in line and 'self' not in line:
+                self_us, cumulative_us, module = line[len('import time:'):].split('|')
+                times[module.strip()] = (int(self_us), int(cumulative_us))
+        own = sum(self_us for module, (self_us, _) in times.items() if module.split('.')[0] == 'harmonica')
+        assert own / 1.0e6 < CLI_IMPORT_BUDGET
+        # Measured in the same run, the whole CLI imports in a fraction of the time of one of its heavy dependencies.
+        assert times['harmonica.cli.main'][1] < times['xarray'][1] / 2
+
+    def test_cli(self):
+        """Test that the CLI and the resources command load no heavy dependencies."""
+        assert _loaded_modules('import harmonica.cli.main') == []
+        assert _loaded_modules('import harmonica.resource') == []
+
+    def test_single_model(self):
+        """Test that a model only loads its own backend."""
+        code = 'from harmonica.tidal_constituents import Constituents\nConstituents("{}")'
+        assert _loaded_modules(code.format('tpxo8')) == ['numpy', 'pandas', 'harmonica.tpxo_database']
+        assert 'xms.grid' not in _loaded_modules(code.format('leprovost'))
+        assert 'harmonica.mesh_index' in _loaded_modules(code.format('adcirc2015'))
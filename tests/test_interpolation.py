@@ -0,0 +1,163 @@
+"""Tests the vectorized interpolation of the extractors against hand computed values."""
+
+# 1. Standard Python modules
+import os
+
+# 2. Third party modules
+import numpy as np
+import pytest
+import xarray as xr
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import config
+from harmonica.resource import Adcirc2015Resources, LeProvostResources, Tpxo9Resources
+from harmonica.tidal_constituents import Constituents
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Use a fresh data directory.
+
+    Returns:
+        str: The data directory
+    """
+    path = str(tmp_path)
+    monkeypatch.setitem(config, 'pre_existing_data_dir', path)
+    monkeypatch.setitem(config, 'data_dir', path)
+    return path
+
+
+def _extract(model, locs, con):
+    """Extract a constituent at points.
+
+    Args:
+        model (str): The model
+        locs (list[tuple(float, float)]): The latitude and longitude of the points
+        con (str): The constituent
+
+    Returns:
+        tuple(numpy.ndarray, numpy.ndarray): The amplitudes and phases of the points
+    """
+    constituents = Constituents(model)
+    results = constituents.get_components(locs, [con], positive_ph=True)
+    constituents.close()
+    return results.amplitude[:, 0], results.phase[:, 0]
+
+
+class TestTpxoInterpolation:
+    """Test the bilinear interpolation of the TPXO grids."""
+
+    def test_bilinear(self, data_dir, synthetic_models):
+        """Test an interior point, a point with a NaN corner, and points past the first and last columns and rows."""
+        synthetic_models(data_dir, ['tpxo9'], scale=0.0)  # 8 x 5 grid, lon 22.5 to 337.5 by 45, lat -90 to 90 by 45
+        path = os.path.join(data_dir, 'tpxo9', Tpxo9Resources.DEFAULT_RESOURCE_FILE)
+        k = sorted(Tpxo9Resources.TPXO9_CONS).index('M2')
+        dset = xr.load_dataset(path)
+        dset.hRe[k, 1, 3] = np.nan  # Corner of the cell between lon 22.5 and 67.5, lat 0 and 45
+        dset.to_netcdf(path)
+        h = dset.hRe.values[k] - 1j * dset.hIm.values[k]  # TPXO phases are lags
+
+        # The cell between lon 157.5 and 202.5 (columns 3 and 4), lat -45 and 0 (rows 1 and 2)
+        dx = (200.0 - 157.5) / 45.0
+        dy = (-30.0 + 45.0) / 45.0
+        weights = [(1.0 - dx) * (1.0 - dy), (1.0 - dx) * dy, dx * (1.0 - dy), dx * dy]
+        expected = np.dot(weights, [h[3, 1], h[3, 2], h[4, 1], h[4, 2]])
+        locs = [(-30.0, 200.0), (10.0, 50.0), (10.0, 350.0), (10.0, -5.0), (10.0, 10.0), (90.0, 200.0)]
+        amplitude, phase = _extract('tpxo9', locs, 'M2')
+        np.testing.assert_allclose(amplitude[0], np.abs(expected), rtol=1e-6)
+        np.testing.assert_allclose(phase[0], np.degrees(np.angle(expected)) % 360.0, atol=1e-4)
+        # A NaN corner, longitudes past the last and before the first column (TPXO does not wrap), the north pole row
+        assert np.isnan(amplitude[1:]).all() and np.isnan(phase[1:]).all()
+
+
+class TestLeProvostInterpolation:
+    """Test the bilinear interpolation of the LeProvost grid, which skips the NaN (land) corners."""
+
+    @staticmethod
+    def _interpolate(amplitude, phase, corners, xratio, yratio):
+        """Interpolate the complex values of the active corners of a cell.
+
+        Args:
+            amplitude (:obj:`numpy.ndarray`): Amplitudes of the grid in centimeters (lat, lon)
+            phase (:obj:`numpy.ndarray`): Phases of the grid in degrees (lat, lon)
+            corners (list[tuple(int, int)]): The (row, column) of the bottom left, bottom right, top left, and top
+                right corners of the cell
+            xratio (float): Position of the point in the cell from the left column [0 1]
+            yratio (float): Position of the point in the cell from the bottom row [0 1]
+
+        Returns:
+            tuple(float, float): The amplitude in meters and the phase in degrees [0 360]
+        """
+        weights = np.array([(1.0 - xratio) * (1.0 - yratio), xratio * (1.0 - yratio), (1.0 - xratio) * yratio,
+                            xratio * yratio])
+        values = np.array([amplitude[c] * np.exp(1j * np.radians(phase[c])) for c in corners])
+        active = ~np.isnan(values)
+        value = np.sum(weights[active] * values[active]) / weights[active].sum()
+        return np.abs(value) / 100.0, np.degrees(np.angle(value)) % 360.0
+
+    def test_bilinear(self, data_dir, synthetic_models):
+        """Test an interior point, a NaN corner, the longitude wrap column, a land cell, and a point past the pole."""
+        synthetic_models(data_dir, ['leprovost'])  # 720 x 361 grid, lon -180 to 179.5 and lat -90 to 90 by 0.5
+        path = os.path.join(data_dir, 'leprovost', LeProvostResources.DEFAULT_RESOURCE_FILE)
+        k = sorted(LeProvostResources.LEPROVOST_CONS).index('M2')
+        dset = xr.load_dataset(path)
+        amplitude = dset.amplitude.values[k].astype(float)
+        phase = dset.phase.values[k].astype(float)
+        rng = np.random.default_rng(0)
+        cells = {
+            'interior': [(200, 400), (200, 401), (201, 400), (201, 401)],  # lat 10 to 10.5, lon 20 to 20.5
+            'nan_corner': [(139, 560), (139, 561), (140, 560), (140, 561)],  # lat -20.5 to -20, lon 100 to 100.5
+            'wrap': [(240, 719), (240, 0), (241, 719), (241, 0)],  # lat 30 to 30.5, lon 179.5 to -180
+            'land': [(260, 480), (260, 481), (261, 480), (261, 481)],  # lat 40 to 40.5, lon 60 to 60.5
+        }
+        for corners in cells.values():
+            for corner in corners:
+                amplitude[corner] = rng.uniform(10.0, 100.0)
+                phase[corner] = rng.uniform(0.0, 360.0)
+        amplitude[140, 561] = np.nan
+        for corner in cells['land']:
+            amplitude[corner] = np.nan
+        dset.amplitude[k] = amplitude
+        dset.phase[k] = phase
+        dset.to_netcdf(path)
+
+        locs = [(10.2, 20.3), (-20.1, 100.4), (30.25, 179.8), (40.1, 60.1), (90.0, 0.0)]
+        results = _extract('leprovost', locs, 'M2')
+        expected = [
+            self._interpolate(amplitude, phase, cells['interior'], 0.6, 0.4),
+            self._interpolate(amplitude, phase, cells['nan_corner'], 0.8, 0.8),
+            self._interpolate(amplitude, phase, cells['wrap'], 0.6, 0.5),
+        ]
+        np.testing.assert_allclose(results[0][:3], [amp for amp, _ in expected], rtol=1e-6)
+        np.testing.assert_allclose(results[1][:3], [ph for _, ph in expected], atol=1e-4)
+        # Every corner of the land cell is NaN, and the cell above the north pole row is outside the grid
+        assert np.isnan(results[0][3:]).all() and np.isnan(results[1][3:]).all()
+
+
+class TestAdcircInterpolation:
+    """Test the barycentric interpolation of the ADCIRC mesh."""
+
+    def test_barycentric(self, data_dir, synthetic_models, monkeypatch):
+        """Test a point inside a triangle, a point on a node, and a point outside the mesh."""
+        monkeypatch.setitem(config, 'mesh_index_sidecar', True)  # The pure NumPy index
+        synthetic_models(data_dir, ['adcirc2015'], scale=0.0)  # 16 nodes
+        path = os.path.join(data_dir, 'adcirc2015', Adcirc2015Resources.DEFAULT_RESOURCE_FILE)
+        with xr.open_dataset(path) as dset:
+            x, y, tris = dset.x.values, dset.y.values, dset.element.values
+            amplitude, phase = dset.M2_amplitude.values, dset.M2_phase.values
+        nodes = tris[0]
+        weights = np.array([0.2, 0.3, 0.5])
+        inside = (np.dot(weights, y[nodes]), np.dot(weights, x[nodes]))
+        value = np.dot(weights, amplitude[nodes] * np.exp(1j * np.radians(phase[nodes])))
+
+        locs = [inside, (y[nodes[1]], x[nodes[1]])]
+        results_amp, results_phase = _extract('adcirc2015', locs, 'M2')
+        np.testing.assert_allclose(results_amp[:2], [np.abs(value), amplitude[nodes[1]]], rtol=1e-9)
+        np.testing.assert_allclose(results_phase[:2], [np.degrees(np.angle(value)) % 360.0, phase[nodes[1]]],
+                                   atol=1e-6)
+        constituents = Constituents('adcirc2015')
+        row = constituents.get_components([(60.0, -80.0)])  # North of the mesh, every constituent is NaN
+        constituents.close()
+        assert len(row.names) > 1 and np.isnan(row.amplitude).all() and np.isnan(row.phase).all()
@@ -0,0 +1,76 @@
+"""Tests the reusable interpolation plans."""
+
+# 1. Standard Python modules
+
+# 2. Third party modules
+import numpy as np
+import pytest
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import config
+from harmonica.interpolation_plan import InterpolationPlan
+from harmonica.profiling import Profile
+from harmonica.tidal_constituents import Constituents
+
+
+LOCS = [(10.0, 20.0), (-30.0, -40.0), (45.5, 170.25), (95.0, 0.0)]
+
+
+@pytest.fixture(scope='module')
+def data_dir(tmp_path_factory, synthetic_models):
+    """Write small synthetic TPXO8 and LeProvost models.
+
+    Returns:
+        str: The data directory
+    """
+    path = str(tmp_path_factory.mktemp('models'))
+    synthetic_models(path, ['tpxo8', 'leprovost'], scale=0.01)
+    return path
+
+
+class TestInterpolationPlan:
+    """Test building, reusing, and saving interpolation plans."""
+
+    @pytest.mark.parametrize('model, cons', [('tpxo8', ['M2', 'MF']), ('leprovost', ['M2', 'K1'])])
+    def test_reuse(self, model, cons, data_dir, monkeypatch, tmp_path):
+        """Test that extracting with a plan gives the same values without locating the points."""
+        monkeypatch.setitem(config, 'pre_existing_data_dir', data_dir)
+        monkeypatch.setitem(config, 'data_dir', data_dir)
+        constituents = Constituents(model)
+        locs = LOCS[:-1] if model == 'leprovost' else LOCS  # The latitude out of range fails all LeProvost points
+        expected = constituents.get_components(list(locs), cons)
+        plan = constituents.build_plan(locs)
+        assert len(plan) == len(locs)
+        # TPXO8 has a grid for each resolution
+        assert len(plan.grids) == (2 if model == 'tpxo8' else 1)
+
+        path = str(tmp_path / 'plan.npz')
+        plan.save(path)
+        loaded = InterpolationPlan.load(path)
+        assert loaded.model == model
+        assert loaded.locs == plan.locs
+        for reused in (plan, loaded):
+            with Profile() as profile:
+                results = Constituents('tpxo9').get_components(None, cons, plan=reused)
+            assert not any(stage.endswith('.locate') for stage in profile.timings)
+            assert results.names == expected.names
+            np.testing.assert_array_equal(results.amplitude, expected.amplitude)
+            np.testing.assert_array_equal(results.phase, expected.phase)
+        constituents.close()
+
+    def test_mismatch(self, data_dir, monkeypatch):
+        """Test that a plan can not be used for other points or another model."""
+        monkeypatch.setitem(config, 'pre_existing_data_dir', data_dir)
+        monkeypatch.setitem(config, 'data_dir', data_dir)
+        constituents = Constituents('leprovost')
+        plan = constituents.build_plan(LOCS[:2])
+        assert plan.matches('LeProvost', [(10, 20), (-30, -40)])
+        with pytest.raises(ValueError, match='not built'):
+            constituents.get_components(LOCS[1:3], plan=plan)
+        # Invalid coordinates give empty results, with or without a plan
+        assert len(constituents.get_components(None, plan=constituents.build_plan(LOCS))) == 0
+        with pytest.raises(ValueError, match='not built'):
+            constituents.get_components(LOCS[:2], model='tpxo8', plan=plan)
+        constituents.close()
@@ -0,0 +1,112 @@
+"""Tests the point location indexes of unstructured meshes."""
+
+# 1. Standard Python modules
+import os
+
+# 2. Third party modules
+import numpy as np
+import xarray as xr
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import config
+from harmonica.adcirc_database import AdcircDB
+from harmonica.mesh_index import BucketMeshIndex
+
+
+class TestBucketMeshIndex:
+    """Test the NumPy point location index."""
+
+    @staticmethod
+    def _make_mesh(nx=12, ny=8):
+        """Build a small structured triangle mesh with slightly perturbed nodes.
+
+        Args:
+            nx (int): Number of node columns
+            ny (int): Number of node rows
+
+        Returns:
+            tuple: The node x coordinates, node y coordinates, and triangles (triangles x 3)
+        """
+        rng = np.random.default_rng(0)
+        x, y = np.meshgrid(np.linspace(-80.0, -60.0, nx), np.linspace(20.0, 40.0, ny), indexing='ij')
+        x = x + rng.uniform(-0.2, 0.2, x.shape)
+        y = y + rng.uniform(-0.2, 0.2, y.shape)
+        tris = []
+        for i in range(nx - 1):
+            for j in range(ny - 1):
+                n00, n10, n11, n01 = i * ny + j, (i + 1) * ny + j, (i + 1) * ny + j + 1, i * ny + j + 1
+                tris.extend([(n00, n10, n11), (n00, n11, n01)])
+        return x.ravel(), y.ravel(), np.array(tris)
+
+    @staticmethod
+    def _contains(x, y, tris, tri_id, px, py):
+        """Check if a triangle contains a point.
+
+        Args:
+            x (np.ndarray): Node x coordinates
+            y (np.ndarray): Node y coordinates
+            tris (np.ndarray): The triangles
+            tri_id (int): Index of the triangle to check
+            px (float): x coordinate of the point
+            py (float): y coordinate of the point
+
+        Returns:
+            bool: True if the point is inside or on the edge of the triangle
+        """
+        (x1, x2, x3), (y1, y2, y3) = x[tris[tri_id]], y[tris[tri_id]]
+        det = (y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3)
+        l1 = ((y2 - y3) * (px - x3) + (x3 - x2) * (py - y3)) / det
+        l2 = ((y3 - y1) * (px - x3) + (x1 - x3) * (py - y3)) / det
+        return min(l1, l2, 1.0 - l1 - l2) >= -1.0e-9
+
+    def test_locate(self):
+        """Test locating points inside, outside, and on the nodes of the mesh."""
+        x, y, tris = self._make_mesh()
+        index = BucketMeshIndex.build(x, y, tris)
+        rng = np.random.default_rng(1)
+        px = np.concatenate([rng.uniform(-79.0, -61.0, 200), x, [-90.0, -50.0]])
+        py = np.concatenate([rng.uniform(21.0, 39.0, 200), y, [30.0, 30.0]])
+        tri_ids = index.locate(px, py)
+        assert np.all(tri_ids[:-2] >= 0)
+        assert np.all(tri_ids[-2:] == -1)
+        for tri_id, pt_x, pt_y in zip(tri_ids[:-2], px, py):
+            assert self._contains(x, y, tris, tri_id, pt_x, pt_y)
+
+    def test_save_load(self, tmp_path):
+        """Test that a saved index locates points the same as the one it was built from."""
+        x, y, tris = self._make_mesh()
+        index = BucketMeshIndex.build(x, y, tris)
+        path = os.path.join(str(tmp_path), 'mesh.index.npz')
+        index.save(path)
+        loaded = BucketMeshIndex.load(path)
+        px = np.linspace(-81.0, -59.0, 57)
+        py = np.linspace(19.0, 41.0, 57)
+        assert np.array_equal(index.locate(px, py), loaded.locate(px, py))
+        assert np.array_equal(loaded.tris, tris)
+
+
+class TestMeshIndexCache:
+    """Test the mesh indexes shared by the ADCIRC extractors."""
+
+    def test_replaced_file(self, tmp_path, monkeypatch, synthetic_models):
+        """Test that an index is rebuilt when the model file is replaced and kept when an extractor is closed."""
+        monkeypatch.setitem(config, 'mesh_index_sidecar', True)  # The pure NumPy index
+        synthetic_models(str(tmp_path), ['adcirc2015'], scale=0.0001)
+        path = os.path.join(str(tmp_path), 'adcirc2015', 'all_adcirc.nc')
+        with xr.open_dataset(path) as dset:
+            index = AdcircDB.get_mesh_index(dset, path)
+            assert AdcircDB.get_mesh_index(dset, path) is index
+
+        synthetic_models(str(tmp_path), ['adcirc2015'], scale=0.0002, overwrite=True)
+        os.utime(path, (os.path.getatime(path), os.path.getmtime(path) + 10.0))
+        with xr.open_dataset(path) as dset:
+            rebuilt = AdcircDB.get_mesh_index(dset, path)
+        assert rebuilt is not index
+        assert len(rebuilt.x) > len(index.x)
+        assert len([key for key in AdcircDB.mesh_indexes if key[0] == os.path.normpath(path)]) == 1
+
+        AdcircDB().close()  # Only closes the files, other extractors of the model keep using the index
+        with xr.open_dataset(path) as dset:
+            assert AdcircDB.get_mesh_index(dset, path) is rebuilt
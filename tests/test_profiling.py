@@ -0,0 +1,59 @@
+"""Tests the pipeline timers and counters."""
+
+# 1. Standard Python modules
+
+# 2. Third party modules
+import numpy as np
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import config
+from harmonica.harmonica import Tide
+from harmonica.profiling import count, Profile, timer
+
+
+class TestProfile:
+    """Test collecting the timings of the pipeline stages."""
+
+    def test_disabled(self):
+        """Test that the stages are not timed without an active profile."""
+        assert timer('a') is timer('b')
+        profile = Profile()
+        with timer('a'):
+            count('b')
+        assert profile.timings == {} and profile.counters == {}
+
+    def test_collect(self):
+        """Test the timings, counters, and callback of a profile."""
+        events = []
+        with Profile(callback=lambda *event: events.append(event)) as profile:
+            for _ in range(2):
+                with timer('stage'):
+                    count('points', 3)
+        with timer('stage'):  # After the profile was stopped
+            count('points')
+        assert profile.timings['stage'][1] == 2
+        assert profile.counters == {'points': 6}
+        assert [(name, amount) for name, _, amount in events] == [('points', 3), ('stage', None)] * 2
+        report = profile.report().splitlines()
+        assert report[0].split() == ['stage', 'seconds', 'calls']
+        assert report[1].split()[::2] == ['stage', '2']
+        assert report[-1].split() == ['points', '6']
+
+    def test_extraction_stages(self, tmp_path, monkeypatch, synthetic_models):
+        """Test that the stages of a reconstruction are reported."""
+        synthetic_models(str(tmp_path), ['tpxo9'], scale=0.01)
+        monkeypatch.setitem(config, 'pre_existing_data_dir', str(tmp_path))
+        monkeypatch.setitem(config, 'data_dir', str(tmp_path))
+        tide = Tide(model='tpxo9')
+        times = np.datetime64('2020-01-01T00:00:00') + np.arange(24) * np.timedelta64(1, 'h')
+        with Profile() as profile:
+            tide.reconstruct_tides([(10.0, 20.0), (-30.0, -40.0)], times, cons=['M2', 'K1'])
+        tide.constituents.close()
+        for stage in ['resources.get_datasets', 'tpxo.decode_names', 'tpxo.locate', 'read_cells', 'tpxo.interpolate',
+                      'tpxo.assemble', 'tide.get_components', 'tide.reconstruct', 'tide.assemble']:
+            assert profile.timings[stage][1] >= 1
+        assert profile.counters['points'] == 2
+        assert profile.counters['constituents'] == 2
+        assert profile.counters['datasets.opened'] == 1
@@ -0,0 +1,59 @@
+"""Tests reading the files of the multi-file models in parallel worker processes."""
+
+# 1. Standard Python modules
+
+# 2. Third party modules
+import numpy as np
+import pytest
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import config, tidal_database
+from harmonica.profiling import Profile
+from harmonica.resource import FES2014Resources
+from harmonica.tidal_constituents import Constituents
+
+
+LOCS = [(10.0, 20.0), (-30.0, -40.0), (45.5, 170.25), (60.0, 300.0)]
+FES2014_GRID = {'units_multiplier': 1.0, 'num_lats': 181, 'num_lons': 360, 'min_lon': 0.0}  # 1 degree
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch, synthetic_models):
+    """Write small synthetic TPXO8 and FES2014 models, FES2014 on a smaller grid than the real model.
+
+    Returns:
+        str: The data directory
+    """
+    monkeypatch.setattr(FES2014Resources, 'dataset_attributes', lambda self: dict(FES2014_GRID))
+    path = str(tmp_path)
+    synthetic_models(path, ['tpxo8', 'fes2014'], scale=0.002)
+    monkeypatch.setitem(config, 'pre_existing_data_dir', path)
+    monkeypatch.setitem(config, 'data_dir', path)
+    return path
+
+
+class TestReadFiles:
+    """Test that parallel reads give the same results as sequential reads."""
+
+    @pytest.mark.parametrize('model, cons', [
+        ('tpxo8', ['M2', 'K1', 'MF', 'MM', 'S2']),
+        ('fes2014', ['M2', 'K1', 'S2', 'MF', 'O1', 'SA']),
+    ])
+    def test_parallel(self, model, cons, data_dir, monkeypatch):
+        """Test extracting with the files read in worker processes."""
+        constituents = Constituents(model)
+        expected = constituents.get_components(list(LOCS), cons)
+        monkeypatch.setitem(config, 'read_workers', 2)
+        with Profile() as profile:
+            results = constituents.get_components(list(LOCS), cons)
+        assert tidal_database._read_executor is not None
+        constituents.close()
+        assert tidal_database._read_executor is None  # The workers are stopped with the files
+        assert profile.counters['read_files.parallel'] == len(cons)
+        assert 'read_cells' not in profile.timings  # Read by the workers
+        assert results.names == expected.names
+        np.testing.assert_array_equal(results.amplitude, expected.amplitude)
+        np.testing.assert_array_equal(results.phase, expected.phase)
+        np.testing.assert_array_equal(results.speed, expected.speed)
@@ -0,0 +1,58 @@
+"""Tests the vectorized tide reconstruction engine."""
+
+# 1. Standard Python modules
+import datetime
+
+# 2. Third party modules
+import numpy as np
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import reconstruction
+from harmonica.astronomy import equilibrium_arguments
+
+
+class TestReconstruction:
+    """Test the vectorized tide reconstruction engine."""
+
+    START = datetime.datetime(2015, 4, 7, 0)
+
+    def test_single_constituent(self):
+        """Test reconstructing one constituent against the equilibrium argument of the series start."""
+        times = [self.START + datetime.timedelta(minutes=30 * i) for i in range(96)]
+        water_level = reconstruction.reconstruct(['S2'], [[0.5]], [[40.0]], times, offset=1.5)
+        eq_arg = equilibrium_arguments(['S2'], [self.START], [self.START + datetime.timedelta(days=1)])[0, 0]
+        hours = np.arange(96) * 0.5
+        expected = 1.5 + 0.5 * np.cos(np.radians(30.0 * hours + eq_arg - 40.0))
+        assert water_level.shape == (96, 1)
+        assert np.allclose(water_level[:, 0], expected)
+
+    def test_locations(self, monkeypatch):
+        """Test reconstructing several locations in small chunks, with unknown constituents and missing data."""
+        monkeypatch.setattr(reconstruction, 'TIME_CHUNK_SIZE', 7)
+        times = np.arange('2015-04-07', '2015-04-09', np.timedelta64(1, 'h'), dtype='datetime64[h]')
+        names = ['S2', 'XX9', 'S4']
+        amplitude = [[1.0, 5.0, 0.1], [0.5, 5.0, 0.2], [np.nan, 5.0, 0.0]]
+        phase = [[10.0, 0.0, 20.0], [90.0, 0.0, 180.0], [0.0, 0.0, 0.0]]
+        water_level = reconstruction.reconstruct(names, amplitude, phase, times)
+        assert water_level.shape == (48, 3)
+        assert np.isnan(water_level[:, 2]).all()
+        for i in range(2):
+            single = reconstruction.reconstruct(['S2', 'S4'], [amplitude[i][::2]], [phase[i][::2]], times)
+            assert np.allclose(water_level[:, i], single[:, 0])
+        # S2 and S4 have no nodal modulation, so the chunking cannot change the result.
+        monkeypatch.setattr(reconstruction, 'TIME_CHUNK_SIZE', 65536)
+        assert np.allclose(water_level, reconstruction.reconstruct(names, amplitude, phase, times),
+                           equal_nan=True)
+
+    def test_time_chunks(self, monkeypatch):
+        """Test that time chunks respect both the size and the span limits."""
+        monkeypatch.setattr(reconstruction, 'TIME_CHUNK_SIZE', 100)
+        times = np.arange('2015-01-01', '2015-03-01', np.timedelta64(6, 'h'), dtype='datetime64[ns]')
+        chunks = reconstruction.time_chunks(times)
+        assert chunks[0] == slice(0, 100)
+        assert chunks[1] == slice(100, 124)  # The first 31 days
+        assert sum(chunk.stop - chunk.start for chunk in chunks) == len(times)
+        for chunk in chunks:
+            assert times[chunk.stop - 1] - times[chunk.start] < reconstruction.TIME_CHUNK_SPAN
@@ -0,0 +1,78 @@
+"""Tests the model resource management."""
+
+# 1. Standard Python modules
+import os
+
+# 2. Third party modules
+import numpy as np
+import xarray as xr
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica.resource import DatasetPool, ResourceManager
+
+
+class TestDatasetPool:
+    """Test the pool of open model files."""
+
+    @staticmethod
+    def _make_files(directory, count):
+        """Write small NetCDF files to a directory.
+
+        Args:
+            directory (str): Directory to write the files to
+            count (int): Number of files to write
+
+        Returns:
+            list[str]: Paths to the files
+        """
+        paths = []
+        for i in range(count):
+            path = os.path.join(directory, f'{i}.nc')
+            xr.Dataset({'amplitude': (('lat', 'lon'), np.full((2, 3), float(i)))}).to_netcdf(path)
+            paths.append(path)
+        return paths
+
+    def test_reuse(self, tmp_path):
+        """Test that files already in the pool are not reopened."""
+        paths = self._make_files(str(tmp_path), 2)
+        with DatasetPool(max_open=2) as pool:
+            first = pool.acquire(paths)
+            second = pool.acquire(paths[::-1])
+            assert first[0] is second[1]
+            assert first[1] is second[0]
+            assert len(pool) == 2
+        assert len(pool) == 0
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used files are closed when the pool is full."""
+        paths = self._make_files(str(tmp_path), 3)
+        pool = DatasetPool(max_open=2)
+        pool.acquire([paths[0]])
+        pool.acquire([paths[1]])
+        pool.acquire([paths[0]])  # paths[1] is now the least recently used
+        pool.acquire([paths[2]])
+        assert paths[0] in pool
+        assert paths[1] not in pool
+        assert paths[2] in pool
+        # Files needed by a single request are never evicted, even if there are too many of them.
+        dsets = pool.acquire(paths)
+        assert len(pool) == 3
+        assert [float(dset.amplitude[0, 0]) for dset in dsets] == [0.0, 1.0, 2.0]
+        pool.close(paths[0])
+        assert paths[0] not in pool
+        pool.close()
+        assert len(pool) == 0
+
+    def test_shared_pool(self, tmp_path):
+        """Test that a manager does not close a pool it does not own."""
+        paths = self._make_files(str(tmp_path), 1)
+        pool = DatasetPool()
+        pool.acquire(paths)
+        with ResourceManager('tpxo9', pool=pool) as manager:
+            assert manager.pool is pool
+        assert paths[0] in pool
+        with ResourceManager('tpxo9') as manager:
+            manager.pool.acquire(paths)
+        assert len(manager.pool) == 0
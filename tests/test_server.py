@@ -0,0 +1,116 @@
+"""Tests the HTTP/JSON server."""
+
+# 1. Standard Python modules
+import json
+import threading
+import urllib.error
+import urllib.request
+
+# 2. Third party modules
+import numpy as np
+import pytest
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import server as server_module
+from harmonica.astronomy import equilibrium_arguments, nodal_terms, to_datetime64
+from harmonica.download import DownloadError
+from harmonica.server import TideServer, TideService
+
+
+@pytest.fixture
+def server():
+    """Serve on a free port in a background thread.
+
+    Yields:
+        str: The URL of the server
+    """
+    with TideServer(TideService(models=[]), port=0, quiet=True) as tide_server:
+        thread = threading.Thread(target=tide_server.serve_forever, daemon=True)
+        thread.start()
+        yield f'http://127.0.0.1:{tide_server.server_address[1]}'
+        tide_server.shutdown()
+        thread.join()
+
+
+def _request(url, body=None):
+    """Send a request to the server.
+
+    Args:
+        url (str): The URL
+        body (dict, optional): The JSON body of a POST request, GET if None
+
+    Returns:
+        tuple(int, dict): The status code and the JSON response
+    """
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestServer:
+    """Test the HTTP/JSON server."""
+
+    def test_nodal_factors(self, server):
+        """Test that the nodal factors match the astronomy module, for listed times and a series."""
+        request = {'cons': ['M2', 'k1', 'XX9'], 'times': ['2015-04-07T00:00:00', '2020-01-01T12:00:00']}
+        status, response = _request(f'{server}/nodal_factors', request)
+        assert status == 200
+        assert response['constituents'] == ['M2', 'K1', 'XX9']
+        assert response['times'] == request['times']
+        times = to_datetime64(request['times'])
+        factor = np.array(response['factor'], dtype=float)
+        assert np.allclose(factor, nodal_terms(['M2', 'K1', 'XX9'], times)[0], equal_nan=True)
+        assert response['factor'][0][2] is None  # Unknown constituents are null
+        eq_args = np.array(response['equilibrium_argument'], dtype=float)
+        assert np.allclose(eq_args, equilibrium_arguments(['M2', 'K1', 'XX9'], times, times), equal_nan=True)
+
+        status, response = _request(f'{server}/nodal_factors',
+                                    {'cons': ['S2'], 'start': '2015-04-07', 'length': 0.5, 'interval': 7200})
+        assert status == 200
+        assert len(response['times']) == 6 and response['times'][1] == '2015-04-07T02:00:00'
+
+    def test_errors(self, server):
+        """Test that bad requests are reported as JSON errors."""
+        status, response = _request(f'{server}/constituents', {'model': 'xx', 'points': [[0.0, 0.0]]})
+        assert status == 400 and 'Model not supported' in response['error']
+        status, response = _request(f'{server}/constituents', {'points': [[0.0]]})
+        assert status == 400 and 'points' in response['error']
+        status, response = _request(f'{server}/reconstruct', {'points': [[0.0, 0.0]]})
+        assert status == 400 and 'start' in response['error']
+        status, response = _request(f'{server}/unknown', {})
+        assert status == 404
+
+    def test_server_errors(self, server, monkeypatch):
+        """Test that unavailable models and unexpected errors are reported as JSON errors."""
+        def fail(error):
+            def raise_error(self, request):
+                raise error
+            return raise_error
+
+        monkeypatch.setattr(TideService, 'constituents', fail(DownloadError({'m2.nc': OSError('Not found')})))
+        status, response = _request(f'{server}/constituents', {'points': [[0.0, 0.0]]})
+        assert status == 503 and 'm2.nc' in response['error']
+        monkeypatch.setattr(TideService, 'constituents', fail(IndexError('index 9 is out of bounds')))
+        status, response = _request(f'{server}/constituents', {'points': [[0.0, 0.0]]})
+        assert status == 500 and response['error'] == 'IndexError: index 9 is out of bounds'
+
+    def test_warm_errors(self, monkeypatch):
+        """Test that a model whose Tide can not be created is dropped without stopping the others."""
+        def tide(model):
+            raise ImportError(f'No backend for {model}')
+
+        monkeypatch.setattr(server_module, 'Tide', tide)
+        service = TideService(models=['tpxo9', 'leprovost'])
+        assert service.warm() == {'tpxo9': 'No backend for tpxo9', 'leprovost': 'No backend for leprovost'}
+        assert service.models == []
+
+    def test_status(self, server):
+        """Test the status of the server before any model is loaded."""
+        status, response = _request(server)
+        assert status == 200
+        assert response['loaded'] == [] and 'tpxo9' in response['models']
@@ -0,0 +1,103 @@
+"""Tests the query optimized model stores."""
+
+# 1. Standard Python modules
+import os
+
+# 2. Third party modules
+import numpy as np
+import pytest
+
+# 3. Aquaveo modules
+
+# 4. Local modules
+from harmonica import config
+from harmonica.cli.main_resources import execute, parse_args
+from harmonica.resource import ResourceManager
+from harmonica.store import is_store, store_names
+from harmonica.tidal_constituents import Constituents
+
+
+LOCS = [(10.0, 20.0), (-30.0, -40.0), (45.5, 170.25), (60.0, -179.9)]
+ADCIRC_LOCS = [(20.0, -80.0), (35.5, -70.25), (10.0, -95.0)]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch, synthetic_models):
+    """Write small synthetic models to a fresh data directory.
+
+    Returns:
+        str: The data directory
+    """
+    path = str(tmp_path)
+    synthetic_models(path, ['tpxo8', 'tpxo9', 'leprovost', 'adcirc2015'], scale=0.002)
+    monkeypatch.setitem(config, 'pre_existing_data_dir', path)
+    monkeypatch.setitem(config, 'data_dir', path)
+    monkeypatch.setitem(config, 'mesh_index_sidecar', True)  # The pure NumPy index
+    return path
+
+
+class TestStore:
+    """Test optimizing models and extracting from the optimized stores."""
+
+    @pytest.mark.parametrize('model, cons', [
+        ('tpxo8', ['M2', 'MF', 'K1']),
+        ('tpxo9', ['M2', 'S1']),
+        ('leprovost', ['M2', 'K1', 'NU2']),
+        ('adcirc2015', ['M2', 'K1', 'SA']),
+    ])
+    def test_extract(self, model, cons, data_dir, monkeypatch):
+        """Test that the stores are preferred and give the values of the model resources."""
+        locs = ADCIRC_LOCS if model == 'adcirc2015' else LOCS
+        constituents = Constituents(model)
+        expected = constituents.get_components(locs, cons)
+        constituents.close()
+        manager = ResourceManager(model)
+        store_dir = manager.optimize_model()
+        assert store_dir == os.path.join(data_dir, model, 'optimized')
+        datasets = manager.get_datasets(cons)
+        assert len(datasets) == len(manager.store_paths(cons))
+        assert all(is_store(dset) for group in datasets for dset in group)
+        manager.close()
+
+        results = constituents.get_components(locs, cons)
+        constituents.close()
+        assert results.names == expected.names
+        np.testing.assert_allclose(results.amplitude, expected.amplitude, rtol=1e-5, atol=1e-6)
+        # Compare phases on the circle, the values are float32 in the store
+        np.testing.assert_allclose(np.cos(np.radians(results.phase)), np.cos(np.radians(expected.phase)), atol=1e-4)
+        np.testing.assert_allclose(np.sin(np.radians(results.phase)), np.sin(np.radians(expected.phase)), atol=1e-4)
+
+        monkeypatch.setitem(config, 'optimized_store', False)
+        manager = ResourceManager(model)
+        assert not any(is_store(dset) for group in manager.get_datasets(cons) for dset in group)
+        manager.close()
+
+    def test_layout(self, data_dir):
+        """Test the constituents, grid, and chunks of a store."""
+        manager = ResourceManager('tpxo8')
+        manager.optimize_model()
+        small, large = manager.get_datasets(['MF', 'M2'])
+        if 'M2' in store_names(small[0]):
+            small, large = large, small
+        assert store_names(small[0]) == ['MF', 'MM', 'MN4', 'MS4']
+        assert store_names(large[0]) == ['K1', 'K2', 'M2', 'M4', 'N2', 'O1', 'P1', 'Q1', 'S2']
+        assert large[0].re.dims == ('con', 'lat', 'lon')
+        assert large[0].re.dtype == np.float32
+        assert large[0].re.encoding['chunksizes'][0] == 9  # Every constituent in each tile
+        manager.close()
+
+    def test_missing_group(self, data_dir):
+        """Test that the resources are read unless every requested group has a store."""
+        manager = ResourceManager('adcirc2015')
+        assert manager.store_paths(['M2']) is None
+        manager.close()
+        os.makedirs(os.path.join(data_dir, 'adcirc2015', 'optimized'))
+        assert ResourceManager('adcirc2015').store_paths(['M2']) is None
+
+    def test_cli(self, data_dir):
+        """Test the resources optimize command."""
+        execute(parse_args(['optimize', 'leprovost']))
+        assert os.path.isfile(os.path.join(data_dir, 'leprovost', 'optimized', 'group0.nc'))
+        assert ResourceManager('leprovost').store_paths(['M2']) == [
+            [os.path.join(data_dir, 'leprovost', 'optimized', 'group0.nc')]
+        ]